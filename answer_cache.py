@@ -0,0 +1,112 @@
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+from basho_config import BASHO_HOME
+
+
+class AnswerCache:
+    """
+    Persistent on-disk cache of quick-question answers with TTL and LRU eviction.
+
+    Attributes:
+        path: Path to the SQLite file holding cached answers
+        ttl: Seconds an answer stays valid (0 disables expiry)
+        max_entries: Maximum number of answers kept before evicting the least recently used
+    """
+
+    def __init__(self, path: Optional[Path] = None, ttl: int = 86400, max_entries: int = 500) -> None:
+        """
+        Open (and create if needed) the cache database.
+
+        Args:
+            path: Location of the cache file, defaults to answer_cache.db in BASHO_HOME
+            ttl: Seconds an answer stays valid (0 disables expiry)
+            max_entries: Maximum number of cached answers
+        """
+        self.path: Path = path or BASHO_HOME / "answer_cache.db"
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._db = sqlite3.connect(str(self.path), timeout=5)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            " key TEXT PRIMARY KEY,"
+            " answer TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS answers_last_used ON answers (last_used)")
+        self._db.commit()
+
+    @staticmethod
+    def make_key(model: str, prompt: str) -> str:
+        """
+        Build the cache key for a model/prompt pair.
+
+        The prompt is normalized (case and whitespace) so trivially different
+        spellings of the same question share an entry.
+
+        Args:
+            model: Name of the model answering the prompt
+            prompt: Full prompt including the system context prefix
+
+        Returns:
+            str: Hex digest identifying the entry
+        """
+        normalized = " ".join(prompt.split()).casefold()
+        return hashlib.sha256(f"{model}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, model: str, prompt: str) -> Optional[str]:
+        """
+        Look up a cached answer and mark it as recently used.
+
+        Args:
+            model: Name of the model answering the prompt
+            prompt: Full prompt including the system context prefix
+
+        Returns:
+            Optional[str]: Cached answer, or None when missing or expired
+        """
+        key = self.make_key(model, prompt)
+        row = self._db.execute("SELECT answer, created FROM answers WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        now = time.time()
+        if self.ttl > 0 and now - row[1] > self.ttl:
+            self._db.execute("DELETE FROM answers WHERE key = ?", (key,))
+            self._db.commit()
+            return None
+
+        self._db.execute("UPDATE answers SET last_used = ? WHERE key = ?", (now, key))
+        self._db.commit()
+        return row[0]
+
+    def put(self, model: str, prompt: str, answer: str) -> None:
+        """
+        Store an answer and evict the least recently used entries over the size cap.
+
+        Args:
+            model: Name of the model that produced the answer
+            prompt: Full prompt including the system context prefix
+            answer: Answer text to cache
+        """
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO answers (key, answer, created, last_used) VALUES (?, ?, ?, ?)",
+            (self.make_key(model, prompt), answer, now, now)
+        )
+        self._db.execute(
+            "DELETE FROM answers WHERE key NOT IN "
+            "(SELECT key FROM answers ORDER BY last_used DESC LIMIT ?)",
+            (max(self.max_entries, 0),)
+        )
+        self._db.commit()
+
+    def close(self) -> None:
+        """
+        Close the underlying database connection.
+        """
+        self._db.close()
@@ -0,0 +1,340 @@
+import hashlib
+import json
+import time
+from typing import Any, Dict, Iterator, List
+
+import timings
+
+# Chat and search providers that can be selected in the "backend" block of config.json
+BACKENDS = ("ddgs", "openai", "fake")
+
+# The OpenAI API only answers chat, these can also search
+SEARCH_BACKENDS = ("ddgs", "fake")
+
+
+class OpenAIBackend:
+    """
+    Chat backend for any OpenAI-compatible HTTP endpoint (llama.cpp server,
+    Ollama, vLLM, LM Studio...), so BASHō can run against local inference.
+
+    Attributes:
+        base_url: API root, e.g. http://localhost:11434/v1
+        api_key: Bearer token sent with every request (empty for none)
+        model: Model name sent instead of BASHō's model (empty to keep it)
+        timeout: Request timeout in seconds
+    """
+
+    def __init__(self, base_url: str = "http://localhost:11434/v1", api_key: str = "",
+                 model: str = "", timeout: float = 60) -> None:
+        """
+        Initialize the backend.
+
+        Args:
+            base_url: API root, e.g. http://localhost:11434/v1
+            api_key: Bearer token sent with every request (empty for none)
+            model: Model name sent instead of BASHō's model (empty to keep it)
+            timeout: Request timeout in seconds
+        """
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+
+    def _post(self, keywords: str, model: str, stream: bool):
+        """
+        Send a chat completion request.
+
+        Args:
+            keywords: Prompt to send
+            model: Name of the model to use
+            stream: Ask for a server-sent event stream
+
+        Returns:
+            http.client.HTTPResponse: Open response
+        """
+        import urllib.request
+
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        payload = {
+            "model": self.model or model,
+            "messages": [{"role": "user", "content": keywords}],
+            "stream": stream
+        }
+        request = urllib.request.Request(
+            f"{self.base_url}/chat/completions",
+            data=json.dumps(payload).encode("utf-8"),
+            headers=headers
+        )
+        return urllib.request.urlopen(request, timeout=self.timeout)
+
+    def chat(self, keywords: str, model: str = "gpt-4o-mini") -> str:
+        """
+        Send a chat message.
+
+        Args:
+            keywords: Prompt to send
+            model: Name of the model to use
+
+        Returns:
+            str: The model's answer
+        """
+        with self._post(keywords, model, stream=False) as response:
+            data = json.load(response)
+        return data["choices"][0]["message"]["content"]
+
+    def chat_yield(self, keywords: str, model: str = "gpt-4o-mini") -> Iterator[str]:
+        """
+        Stream a chat answer.
+
+        Args:
+            keywords: Prompt to send
+            model: Name of the model to use
+
+        Yields:
+            str: Chunks of the answer
+        """
+        with self._post(keywords, model, stream=True) as response:
+            for raw_line in response:
+                line = raw_line.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                content = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                if content:
+                    yield content
+
+
+class FakeBackend:
+    """
+    Deterministic in-process stand-in for chat and search. The same prompt
+    always gets the same answer after a configurable delay, which makes
+    BASHō's own overhead measurable without network access.
+
+    Attributes:
+        latency: Seconds before the first answer chunk
+        tokens_per_second: Speed at which the answer is streamed
+        search_latency: Seconds a search takes
+    """
+
+    def __init__(self, latency: float = 0.05, tokens_per_second: float = 200.0,
+                 search_latency: float = 0.05) -> None:
+        """
+        Initialize the backend.
+
+        Args:
+            latency: Seconds before the first answer chunk
+            tokens_per_second: Speed at which the answer is streamed
+            search_latency: Seconds a search takes
+        """
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.search_latency = search_latency
+
+    @staticmethod
+    def _answer(keywords: str, model: str) -> List[str]:
+        """
+        Build the deterministic answer for a prompt.
+
+        Args:
+            keywords: Prompt to answer
+            model: Name of the model to use
+
+        Returns:
+            List[str]: Answer split into chunks
+        """
+        digest = hashlib.sha256(f"{model}\0{keywords}".encode("utf-8")).hexdigest()[:8]
+        question = " ".join(keywords.split()[-8:])
+        words = f"[{model} {digest}] This is a fake answer to: {question}".split(" ")
+        return [word + " " for word in words[:-1]] + words[-1:]
+
+    def chat(self, keywords: str, model: str = "gpt-4o-mini") -> str:
+        """
+        Answer a chat message.
+
+        Args:
+            keywords: Prompt to answer
+            model: Name of the model to use
+
+        Returns:
+            str: The fake answer
+        """
+        return "".join(self.chat_yield(keywords, model))
+
+    def chat_yield(self, keywords: str, model: str = "gpt-4o-mini") -> Iterator[str]:
+        """
+        Stream a chat answer word by word.
+
+        Args:
+            keywords: Prompt to answer
+            model: Name of the model to use
+
+        Yields:
+            str: Chunks of the fake answer
+        """
+        time.sleep(self.latency)
+        for chunk in self._answer(keywords, model):
+            if self.tokens_per_second > 0:
+                time.sleep(1 / self.tokens_per_second)
+            yield chunk
+
+    def _results(self, vertical: str, keywords: str, max_results: int) -> List[Dict[str, Any]]:
+        """
+        Build deterministic search results shaped like the DDGS ones.
+
+        Args:
+            vertical: One of "text", "news" or "videos"
+            keywords: Search query
+            max_results: Number of results to return
+
+        Returns:
+            List[Dict[str, Any]]: Fake search results
+        """
+        time.sleep(self.search_latency)
+        results = []
+        for i in range(1, (max_results or 5) + 1):
+            url = f"https://example.com/{vertical}/{i}"
+            title = f"{keywords} ({vertical} result {i})"
+            if vertical == "videos":
+                results.append({"title": title, "duration": "1:00", "content": url,
+                                "statistics": {"viewCount": i * 100}})
+            elif vertical == "news":
+                results.append({"title": title, "date": "2025-01-01T00:00:00+00:00", "body": title,
+                                "url": url, "source": "example.com"})
+            else:
+                results.append({"title": title, "href": url, "body": title})
+        return results
+
+    def text(self, keywords: str, max_results: int = 5, **kwargs) -> List[Dict[str, Any]]:
+        """Text search, see DDGS.text."""
+        return self._results("text", keywords, max_results)
+
+    def news(self, keywords: str, max_results: int = 5, **kwargs) -> List[Dict[str, Any]]:
+        """News search, see DDGS.news."""
+        return self._results("news", keywords, max_results)
+
+    def videos(self, keywords: str, max_results: int = 5, **kwargs) -> List[Dict[str, Any]]:
+        """Video search, see DDGS.videos."""
+        return self._results("videos", keywords, max_results)
+
+
+class Client:
+    """
+    Chat and search client made of two different backends.
+
+    Attributes:
+        chat_backend: Backend answering chat requests
+        search_backend: Backend running searches
+    """
+
+    def __init__(self, chat_backend, search_backend) -> None:
+        """
+        Combine two backends.
+
+        Args:
+            chat_backend: Backend answering chat requests
+            search_backend: Backend running searches
+        """
+        self.chat_backend = chat_backend
+        self.search_backend = search_backend
+
+    @property
+    def last_attempts(self) -> int:
+        """Number of attempts made by the last chat request."""
+        return getattr(self.chat_backend, "last_attempts", 1)
+
+    def reset_chat(self) -> None:
+        """Start a fresh chat session on the chat backend."""
+        from streaming import reset_chat
+        reset_chat(self.chat_backend)
+
+    def chat(self, keywords: str, model: str = "gpt-4o-mini") -> str:
+        """Send a chat message, see DDGS.chat."""
+        return self.chat_backend.chat(keywords, model=model)
+
+    def chat_yield(self, keywords: str, model: str = "gpt-4o-mini") -> Iterator[str]:
+        """Stream a chat answer, see DDGS.chat_yield."""
+        from streaming import iter_chat
+        return iter_chat(self.chat_backend, keywords, model)
+
+    def text(self, **kwargs) -> List[Dict[str, Any]]:
+        """Text search, see DDGS.text."""
+        return self.search_backend.text(**kwargs)
+
+    def news(self, **kwargs) -> List[Dict[str, Any]]:
+        """News search, see DDGS.news."""
+        return self.search_backend.news(**kwargs)
+
+    def videos(self, **kwargs) -> List[Dict[str, Any]]:
+        """Video search, see DDGS.videos."""
+        return self.search_backend.videos(**kwargs)
+
+
+def create_backend(name: str, config: Dict[str, Any]):
+    """
+    Create one backend by name.
+
+    Args:
+        name: One of BACKENDS
+        config: Loaded configuration (defaults already applied)
+
+    Returns:
+        Backend instance
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    if name == "ddgs":
+        with timings.phase("import.ddgs"):
+            from duckduckgo_search import DDGS
+            from ddgs_client import RateLimitedDDGS
+        with timings.phase("client"):
+            return RateLimitedDDGS(DDGS(), config["rate_limit"])
+    if name == "openai":
+        with timings.phase("client"):
+            return OpenAIBackend(**config["backend"]["openai"])
+    if name == "fake":
+        with timings.phase("client"):
+            return FakeBackend(**config["backend"]["fake"])
+    raise ValueError(f"Unknown backend '{name}', choose one of: {', '.join(BACKENDS)}")
+
+
+def create_client(config: Dict[str, Any]):
+    """
+    Create the chat and search client selected in the "backend" config block.
+
+    Args:
+        config: Loaded configuration (defaults already applied)
+
+    Returns:
+        Client (or a single backend when chat and search use the same one)
+
+    Raises:
+        ValueError: If a backend name is unknown or the search backend can't search
+    """
+    chat_name = config["backend"]["chat"]
+    search_name = config["backend"]["search"]
+    if search_name in BACKENDS and search_name not in SEARCH_BACKENDS:
+        raise ValueError(f"The {search_name} backend can't search, choose one of: {', '.join(SEARCH_BACKENDS)}")
+    chat_backend = create_backend(chat_name, config)
+    if search_name == chat_name:
+        return chat_backend
+    return Client(chat_backend, create_backend(search_name, config))
+
+
+def cache_scope(config: Dict[str, Any], kind: str) -> str:
+    """
+    Prefix that keeps cached answers or results of different backends apart.
+
+    Args:
+        config: Loaded configuration (defaults already applied)
+        kind: "chat" or "search"
+
+    Returns:
+        str: Empty for the default DDGS backend, "<backend>:" otherwise
+    """
+    name = config["backend"][kind]
+    return "" if name == "ddgs" else f"{name}:"
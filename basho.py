@@ -1,132 +1,285 @@
 #!/usr/bin/env python3
 
-import json
-from pathlib import Path
-from typing import Dict, List, Optional, Union
-from duckduckgo_search import DDGS
+import asyncio
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from basho_config import default_config, get_model, load_config
 from conversation_history import ConversationHandler
+from streaming import iter_chat, reset_chat
+from backends import create_client
+from context_window import ContextWindow, get_budget
+from prompts import get_prompt
 
-CONFIG = Path(__file__).parent / "config.json"
-MODELS: Dict[str, str] = {
-    "1": "gpt-4o-mini",
-    "2": "llama-3.3-70b", 
-    "3": "claude-3-haiku",
-    "4": "o3-mini",
-    "5": "mixtral-8x7b"
-}
-
-def load_config() -> Optional[Dict[str, str]]:
-    """
-    Load configuration from JSON file.
-    
-    Returns:
-        Optional[Dict[str, str]]: Configuration dict if valid, None otherwise
+def start_reader(loop: asyncio.AbstractEventLoop, lines: asyncio.Queue) -> None:
     """
-    if CONFIG.exists():
-        try:
-            with CONFIG.open("r") as file:
-                config = json.load(file)
-                if config.get("model") in MODELS.values():
-                    return config
-        except (json.JSONDecodeError, KeyError):
-            pass
-    return None
+    Read stdin in a background thread so the user can type while an answer
+    is being generated. Every line is put on the queue, None marks the end of input.
 
-def save_config(model: str) -> None:
-    """
-    Save model configuration to JSON file.
-    
     Args:
-        model: Name of the model to save
+        loop: Event loop owning the queue
+        lines: Queue receiving the lines
     """
-    CONFIG.parent.mkdir(parents=True, exist_ok=True)
-    with CONFIG.open("w") as file:
-        json.dump({"model": model}, file)
+    def read() -> None:
+        for line in iter(sys.stdin.readline, ""):
+            loop.call_soon_threadsafe(lines.put_nowait, line.rstrip("\n"))
+        loop.call_soon_threadsafe(lines.put_nowait, None)
+
+    threading.Thread(target=read, daemon=True).start()
 
-def get_model() -> str:
+async def ask(client_future: Future, build_prompt: Callable[[], str], model: str,
+              stream: bool, lock: threading.Lock) -> str:
     """
-    Get the model choice from config or user input.
-    
+    Send one request in a worker thread and print the answer as it arrives.
+
+    Cancelling the task stops printing right away. The worker thread stops
+    at the next chunk and the answer is dropped, so the conversation stays
+    as it was before the question.
+
+    Args:
+        client_future: Future resolving to the chat client
+        build_prompt: Builds the full prompt (may summarize, so it runs in the worker)
+        model: Name of the model to use
+        stream: Print chunks as they arrive instead of the whole answer at once
+        lock: Serializes requests on the shared client
+
     Returns:
-        str: Selected model name
+        str: The complete answer
     """
-    config = load_config()
+    loop = asyncio.get_running_loop()
+    chunks: asyncio.Queue = asyncio.Queue()
+    cancelled = threading.Event()
+    client = await asyncio.wrap_future(client_future)
+
+    def put(item) -> None:
+        try:
+            loop.call_soon_threadsafe(chunks.put_nowait, item)
+        except RuntimeError:
+            # The loop is already closed, nobody is waiting for the answer anymore
+            pass
 
-    if config:
-        return config["model"]
+    def produce() -> None:
+        try:
+            with lock:
+                if cancelled.is_set():
+                    return
+                prompt = build_prompt()
+                # The context is sent explicitly, DDGS must not resend its own history
+                reset_chat(client)
+                answer = iter_chat(client, prompt, model) if stream else iter([client.chat(prompt, model=model)])
+                for chunk in answer:
+                    if cancelled.is_set():
+                        break
+                    put(chunk)
+        except Exception as error:
+            put(error)
+        finally:
+            put(None)
 
-    print("Choose a model: ")
-    for key, model in MODELS.items():
-        print(f"{key}: {model}")
+    # A daemon thread, so a request that is still winding down never blocks exiting
+    threading.Thread(target=produce, daemon=True).start()
 
-    while True:
-        choice = input("Enter number: ").strip()
-        if choice in MODELS:
-            save_config(MODELS[choice])
-            return MODELS[choice]
-        print("Invalid choice, try again.")
+    start = time.perf_counter()
+    first_chunk = None
+    parts: List[str] = []
+    print("BASHō: ", end="", flush=True)
+    try:
+        while True:
+            chunk = await chunks.get()
+            if chunk is None:
+                break
+            if isinstance(chunk, Exception):
+                print()
+                raise chunk
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - start
+            parts.append(chunk)
+            print(chunk, end="", flush=True)
+    except asyncio.CancelledError:
+        cancelled.set()
+        print("\n[cancelled]", flush=True)
+        raise
+    print()
 
-def main() -> None:
+    if stream:
+        total = time.perf_counter() - start
+        print(f"[first token {first_chunk or total:.2f}s, total {total:.2f}s]", file=sys.stderr, flush=True)
+    return "".join(parts)
+
+async def run() -> None:
     """
-    Main function that runs the BASHō assistant interface.
-    Handles user interaction, conversation history, and model responses.
+    Run the BASHō assistant interface as an asyncio REPL.
+
+    Requests run as tasks while stdin keeps being read, Ctrl-C cancels the
+    request in flight (or quits when idle), conversations are loaded in the
+    background and one client is reused for the whole session.
     """
+    loop = asyncio.get_running_loop()
     model = get_model()
-    conversation_handler = ConversationHandler()
+    config = load_config() or default_config()
+    stream = config.get("stream", True)
+    conversation_handler = ConversationHandler(
+        max_conversations=config.get("max_conversations", 5),
+        compress=config["history"]["compress"]
+    )
     current_exchanges: List[Dict[str, str]] = []
 
+    # SQLite connections belong to the thread that opened them, so the history
+    # always runs on the same single worker thread
+    history = ThreadPoolExecutor(max_workers=1)
+    stored_future = loop.run_in_executor(history, conversation_handler.count)
+    # Importing duckduckgo_search and creating the client happens while the user types
+    client_pool = ThreadPoolExecutor(max_workers=1)
+    client_future = client_pool.submit(create_client, config)
+    request_lock = threading.Lock()
+
     print("Welcome to BASHō - Your Linux Terminal Assistant!")
     print("Type 'exit' to quit or 'load X' to load conversation X (1-5)")
-    
-    ddgs = DDGS()
-    
-    linux_context = "You are a Linux terminal assistant called BASHō. Your responses should be concise and directly answer the user's question. Only provide Linux command examples or explanations when specifically asked. Don't list commands unless requested. Try to make the responses short. Treat this as a system prompt and respond naturally to: "
-
-    conversation_context = ""
-    prev_conversations = conversation_handler.get_conversations()
-    
-    while True:
-        visible_input = input("You: ")
-        
-        if visible_input.lower() == 'exit':
-            if current_exchanges:
-                conversation_handler.save_conversation(model, current_exchanges)
-            print("Jaa, mata ne! See you later!")
-            break
-            
-        # Handle load command
-        if visible_input.lower().startswith('load '):
-            try:
-                convo_num = int(visible_input.split()[1])
-                if 1 <= convo_num <= len(prev_conversations):
-                    selected_convo = prev_conversations[convo_num - 1]
-                    conversation_context = "Previous conversation:\n"
-                    for exchange in selected_convo["exchanges"]:
-                        conversation_context += f"User: {exchange['user']}\nBASHō: {exchange['basho']}\n"
-                    print(f"Loaded conversation {convo_num}")
-                    continue
-                else:
-                    print(f"Please select a conversation between 1 and {len(prev_conversations)}")
+    print("Press Ctrl-C to cancel an answer")
+
+    # Parsed and validated once for the whole session
+    chat_prompt = get_prompt(config, "chat")
+    history_prompt = get_prompt(config, "history")
+    summary_prompt = get_prompt(config, "summary")
+
+    context_config = config.get("context", {})
+
+    def new_window(loaded: Optional[Dict] = None) -> ContextWindow:
+        """Context window over a loaded conversation (if any) and this session."""
+        loaded = loaded or {"exchanges": []}
+        return ContextWindow(
+            budget_tokens=get_budget(context_config, model),
+            keep_recent=context_config.get("keep_recent", 4),
+            summarize=summarize,
+            exchanges=loaded["exchanges"] + current_exchanges,
+            summary=loaded.get("summary", ""),
+            summarized=loaded.get("summarized", 0)
+        )
+
+    def summarize(text: str) -> str:
+        """Condense older exchanges with the chat model."""
+        client = client_future.result()
+        reset_chat(client)
+        return client.chat(summary_prompt.render(conversation=text), model=model)
+
+    def prepare_load(convo_num: int) -> ContextWindow:
+        """Read a conversation and build its context ahead of the next question."""
+        window = new_window(conversation_handler.get_conversation(convo_num))
+        with request_lock:
+            # Folds older exchanges into the summary now instead of on the next question
+            window.render()
+        return window
+
+    window = new_window()
+    loaded_convo = False
+    pending_load: Optional[Tuple[int, asyncio.Future]] = None
+    request: Optional[asyncio.Task] = None
+    lines: asyncio.Queue = asyncio.Queue()
+
+    def on_interrupt() -> None:
+        """Ctrl-C cancels the answer in flight, or quits when there is none."""
+        if request is not None and not request.done():
+            request.cancel()
+        else:
+            lines.put_nowait(None)
+
+    async def apply_load() -> None:
+        """Switch to a conversation loaded in the background."""
+        nonlocal window, loaded_convo, pending_load
+        if pending_load is None:
+            return
+        convo_num, future = pending_load
+        pending_load = None
+        try:
+            window = await future
+            loaded_convo = True
+        except Exception as error:
+            print(f"Could not load conversation {convo_num}:", error)
+
+    start_reader(loop, lines)
+    loop.add_signal_handler(signal.SIGINT, on_interrupt)
+    try:
+        while True:
+            print("You: ", end="", flush=True)
+            visible_input = await lines.get()
+            if visible_input is None:
+                # Ctrl-D, or Ctrl-C at the prompt
+                print()
+                visible_input = "exit"
+
+            if visible_input.lower() == 'exit':
+                await apply_load()
+                if current_exchanges:
+                    if loaded_convo:
+                        # The summary also covers the loaded conversation, don't store it with this one
+                        save = lambda: conversation_handler.save_conversation(model, current_exchanges)
+                    else:
+                        save = lambda: conversation_handler.save_conversation(
+                            model, current_exchanges, summary=window.summary, summarized=window.summarized
+                        )
+                    await loop.run_in_executor(history, save)
+                print("Jaa, mata ne! See you later!")
+                break
+
+            # Handle load command
+            if visible_input.lower().startswith('load '):
+                try:
+                    convo_num = int(visible_input.split()[1])
+                    stored = await stored_future
+                    if 1 <= convo_num <= stored:
+                        # Parsed and compacted in the background while the next question is typed
+                        pending_load = (convo_num, loop.run_in_executor(history, prepare_load, convo_num))
+                        print(f"Loaded conversation {convo_num}")
+                        continue
+                    else:
+                        print(f"Please select a conversation between 1 and {stored}")
+                        continue
+                except (ValueError, IndexError):
+                    print("Invalid load command. Use 'load X' where X is 1-5")
                     continue
-            except (ValueError, IndexError):
-                print("Invalid load command. Use 'load X' where X is 1-5")
+
+            await apply_load()
+            turn_window, question = window, visible_input
+
+            def build_prompt() -> str:
+                # Combine linux context, conversation history and current input
+                conversation_context = turn_window.render()
+                if conversation_context:
+                    conversation_context = history_prompt.render(context=conversation_context)
+                return chat_prompt.render(history=conversation_context, question=question)
+
+            request = asyncio.ensure_future(ask(client_future, build_prompt, model, stream, request_lock))
+            try:
+                response = await request
+            except asyncio.CancelledError:
+                # Only the answer was cancelled, the conversation goes on
                 continue
-        
-        # Combine linux context, conversation history and current input
-        actual_query = f"{linux_context}\n{conversation_context}\nCurrent query: {visible_input}"
-        
-        try:
-            response = ddgs.chat(actual_query, model=model)
-            print("BASHō:", response)
-            
+            except Exception as error:
+                print("Error:", error)
+                continue
+            finally:
+                request = None
+
             # Store the exchange
             current_exchanges.append({
                 "user": visible_input,
                 "basho": response
             })
-            
-        except Exception as error:
-            print("Error:", error)
+            window.add(visible_input, response)
+    finally:
+        loop.remove_signal_handler(signal.SIGINT)
+        history.shutdown(wait=True)
+        client_pool.shutdown(wait=False)
+
+def main() -> None:
+    """
+    Main function that runs the BASHō assistant interface.
+    Handles user interaction, conversation history, and model responses.
+    """
+    asyncio.run(run())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
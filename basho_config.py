@@ -0,0 +1,214 @@
+import copy
+import json
+import os
+import timings
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, TypedDict
+
+# Directory holding config.json, the history and the caches. BASHO_HOME
+# points BASHō at another one, e.g. an isolated directory for benchmarks.
+BASHO_HOME = Path(os.environ.get("BASHO_HOME") or Path(__file__).parent)
+CONFIG = BASHO_HOME / "config.json"
+MODELS: Dict[str, str] = {
+    "1": "gpt-4o-mini",
+    "2": "llama-3.3-70b",
+    "3": "claude-3-haiku",
+    "4": "o3-mini",
+    "5": "mixtral-8x7b"
+}
+
+
+class SearchSettings(TypedDict, total=False):
+    max_results: int
+    page_size: int
+    region: str
+    safesearch: str
+    ttl: int
+    stale_while_revalidate: bool
+
+
+class ConfigType(TypedDict, total=False):
+    model: str
+    search: Dict[str, SearchSettings]
+    cache: Dict[str, Any]
+    stream: bool
+    daemon: Dict[str, Any]
+    context: Dict[str, Any]
+    batch: Dict[str, Any]
+    rate_limit: Dict[str, float]
+    backend: Dict[str, Any]
+    metrics: Dict[str, Any]
+    history: Dict[str, Any]
+    similarity: Dict[str, Any]
+    hedge: Dict[str, Any]
+    input: Dict[str, Any]
+    prompts: Dict[str, str]
+    knowledge: Dict[str, Any]
+    max_conversations: int
+    editor: str
+
+
+# Every setting BASHō understands, with its default. Missing keys in
+# config.json (including keys inside nested blocks) fall back to these.
+DEFAULTS: ConfigType = {
+    "search": {
+        "video": {"max_results": 3, "region": "wt-wt", "safesearch": "moderate",
+                  "page_size": 10, "ttl": 86400, "stale_while_revalidate": False},
+        "text": {"max_results": 5, "region": "wt-wt", "safesearch": "moderate",
+                 "page_size": 10, "ttl": 86400, "stale_while_revalidate": False},
+        "news": {"max_results": 3, "region": "wt-wt", "safesearch": "moderate",
+                 "page_size": 10, "ttl": 900, "stale_while_revalidate": False}
+    },
+    "cache": {"enabled": True, "ttl": 86400, "max_entries": 500},
+    "stream": True,
+    "daemon": {"idle_timeout": 3600},
+    "context": {"budget_tokens": {"default": 2000}, "keep_recent": 4},
+    "batch": {"workers": 4, "max_retries": 3},
+    "rate_limit": {
+        "rate": 1.0, "burst": 5, "max_retries": 3, "backoff_base": 1.0,
+        "backoff_max": 30.0, "failure_threshold": 5, "cooldown": 60.0
+    },
+    "backend": {
+        "chat": "ddgs",
+        "search": "ddgs",
+        "openai": {"base_url": "http://localhost:11434/v1", "api_key": "", "model": "", "timeout": 60},
+        "fake": {"latency": 0.05, "tokens_per_second": 200.0, "search_latency": 0.05}
+    },
+    "metrics": {"log": False, "path": ""},
+    "history": {"compress": False},
+    "similarity": {"enabled": True, "threshold": 0.8, "max_entries": 2000},
+    "hedge": {
+        "enabled": False, "models": [], "backups": 1, "auto": True, "delay": 2.0,
+        "min_delay": 0.5, "max_delay": 10.0, "min_samples": 5
+    },
+    "input": {
+        "enabled": True, "budget_tokens": {"default": 3000}, "head_lines": 20, "tail_lines": 50,
+        "error_lines": 60, "max_line_chars": 300
+    },
+    "knowledge": {"enabled": True, "threshold": 0.8, "man_paths": [], "help_commands": []},
+    # Overrides of prompts.DEFAULT_PROMPTS by name
+    "prompts": {},
+    "max_conversations": 5,
+    "editor": "nano"
+}
+
+# (mtime_ns, size) of config.json when it was parsed, and the parsed config
+_cached: Optional[Tuple[Tuple[int, int], Optional[ConfigType]]] = None
+
+
+def _merge(defaults: Dict[str, Any], values: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Recursively fill missing keys of values from defaults.
+
+    Args:
+        defaults: Default values
+        values: Values read from the config file
+
+    Returns:
+        Dict[str, Any]: New dict with defaults applied
+    """
+    merged = dict(values)
+    for key, default in defaults.items():
+        if key not in merged:
+            merged[key] = copy.deepcopy(default)
+        elif isinstance(default, dict) and isinstance(merged[key], dict):
+            merged[key] = _merge(default, merged[key])
+    return merged
+
+
+def default_config(model: str = MODELS["1"]) -> ConfigType:
+    """
+    Build a configuration made only of defaults.
+
+    Args:
+        model: Model to put in the configuration
+
+    Returns:
+        ConfigType: Default configuration
+    """
+    return _merge(DEFAULTS, {"model": model})
+
+
+def load_config() -> Optional[ConfigType]:
+    """
+    Load configuration from JSON file.
+
+    The file is parsed once per process and parsed again only when its
+    modification time or size changes, so long-running sessions pick up
+    edits without re-reading it on every call. Loading never writes.
+
+    Returns:
+        Optional[ConfigType]: Configuration with defaults applied if valid, None otherwise
+    """
+    global _cached
+    try:
+        stat = CONFIG.stat()
+    except OSError:
+        _cached = None
+        return None
+
+    key = (stat.st_mtime_ns, stat.st_size)
+    if _cached is None or _cached[0] != key:
+        config = None
+        with timings.phase("config"):
+            try:
+                with CONFIG.open("r") as file:
+                    values = json.load(file)
+                # Verify model is valid
+                if isinstance(values, dict) and values.get("model") in MODELS.values():
+                    config = _merge(DEFAULTS, values)
+            except (OSError, json.JSONDecodeError):
+                pass
+        _cached = (key, config)
+
+    if _cached[1] is None:
+        return None
+    # Hand out a copy so callers can modify it without touching the cache
+    return copy.deepcopy(_cached[1])
+
+
+def save_config(model: str, config: Optional[ConfigType] = None) -> None:
+    """
+    Save model configuration to JSON file.
+
+    The file is written to a temporary file first and then renamed over
+    config.json, so concurrent readers never see a half-written file.
+
+    Args:
+        model: Name of the model to save
+        config: Existing config to update (optional)
+    """
+    global _cached
+    config = _merge(DEFAULTS, dict(config or {}))
+    config["model"] = model
+
+    CONFIG.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = CONFIG.with_name(f".{CONFIG.name}.{os.getpid()}.tmp")
+    with tmp_path.open("w") as file:
+        json.dump(config, file, indent=2)
+    os.replace(tmp_path, CONFIG)
+    _cached = None
+
+
+def get_model() -> str:
+    """
+    Get the model choice from config or user input.
+
+    Returns:
+        str: Selected model name
+    """
+    config = load_config()
+
+    if config:
+        return config["model"]
+
+    print("Choose a model: ")
+    for key, model in MODELS.items():
+        print(f"{key}: {model}")
+
+    while True:
+        choice = input("Enter number: ").strip()
+        if choice in MODELS:
+            save_config(MODELS[choice])
+            return MODELS[choice]
+        print("Invalid choice, try again.")
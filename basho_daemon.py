@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+
+import io
+import json
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from basho_config import BASHO_HOME, CONFIG
+
+SOCKET_PATH = BASHO_HOME / "basho.sock"
+PID_FILE = BASHO_HOME / "basho.pid"
+
+# Flags whose output doesn't need a terminal and can be answered by the daemon
+FORWARDABLE_FLAGS = ("-t", "-n", "-v", "-a", "--explain", "--suggest")
+
+# Plain-text requests ("<verb> <text>" on one line) understood from the shell
+# integration, which talks to the socket with nc or socat instead of Python
+TEXT_COMMANDS = ("explain", "suggest")
+
+# Seconds a client may take to send its request line, requests are served
+# one at a time so a silent client would block everyone else
+REQUEST_TIMEOUT = 5.0
+
+
+def _connect(timeout: Optional[float] = 2.0) -> socket.socket:
+    """
+    Open a connection to the running daemon.
+
+    Args:
+        timeout: Connect timeout in seconds
+
+    Returns:
+        socket.socket: Connected Unix socket
+
+    Raises:
+        OSError: If no daemon is listening
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+    try:
+        client.connect(str(SOCKET_PATH))
+    except OSError:
+        client.close()
+        raise
+    client.settimeout(None)
+    return client
+
+
+def _send(request: Dict[str, object]) -> Optional[int]:
+    """
+    Send a request to the daemon and copy its output to stdout as it arrives.
+
+    The daemon terminates its output with a NUL byte, the exit code, another
+    NUL byte and whatever the command wrote to stderr, which goes to stderr.
+
+    Args:
+        request: JSON-serializable request
+
+    Returns:
+        Optional[int]: Exit code reported by the daemon, None if it is unreachable
+    """
+    try:
+        client = _connect()
+    except OSError:
+        return None
+
+    with client:
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        out = sys.stdout.buffer
+        finished = False
+        exit_code = b""
+        try:
+            while True:
+                chunk = client.recv(65536)
+                if not chunk:
+                    break
+                if finished:
+                    exit_code += chunk
+                    continue
+                output, marker, exit_code = chunk.partition(b"\0")
+                out.write(output)
+                out.flush()
+                finished = bool(marker)
+        except BrokenPipeError:
+            # The reader of stdout went away, as in: bsho -a --json x | head -1
+            os.dup2(os.open(os.devnull, os.O_WRONLY), out.fileno())
+            return 0
+
+    if not finished:
+        # Daemon went away in the middle of the request
+        return 1
+    exit_code, _, errors = exit_code.partition(b"\0")
+    if errors:
+        sys.stderr.buffer.write(errors)
+        sys.stderr.flush()
+    try:
+        return int(exit_code.decode() or 0)
+    except ValueError:
+        return 1
+
+
+def should_forward(argv: List[str]) -> bool:
+    """
+    Check whether a bsho command line can be answered by the daemon.
+
+    Interactive commands (-c, -dev, first-run model selection) and local
+    bookkeeping (-m, -h) always run in-process.
+
+    Args:
+        argv: Arguments after the program name
+
+    Returns:
+        bool: True if the command can be forwarded
+    """
+    args = [arg for arg in argv if arg != "--no-cache"]
+    if not args or not SOCKET_PATH.exists():
+        return False
+    if not CONFIG.exists():
+        return False
+    return args[0] in FORWARDABLE_FLAGS or not args[0].startswith("-")
+
+
+def forward(argv: List[str], piped_input: Optional[str] = None) -> Optional[int]:
+    """
+    Run a bsho command in the daemon.
+
+    Args:
+        argv: Arguments after the program name
+        piped_input: Digested stdin of the command (the daemon can't read the client's stdin)
+
+    Returns:
+        Optional[int]: Exit code of the command, None if the daemon is not available
+    """
+    return _send({"argv": argv, "input": piped_input})
+
+
+def _run_command(argv: List[str], writer, errors, piped_input: Optional[str] = None) -> int:
+    """
+    Run quick_basho in this process with stdout sent to the client.
+
+    Args:
+        argv: Arguments after the program name
+        writer: Text stream connected to the client
+        errors: Text stream collecting what the command writes to stderr
+        piped_input: Digested stdin sent by the client
+
+    Returns:
+        int: Exit code of the command
+    """
+    from contextlib import redirect_stderr, redirect_stdout
+    import quick_basho
+    import timings
+
+    saved_argv = sys.argv
+    sys.argv = ["bsho", *argv]
+    try:
+        with redirect_stdout(writer), redirect_stderr(errors):
+            timings.reset()
+            # The daemon's own stdin is never the client's, so it is not read
+            quick_basho.main(forward=False, piped_input=piped_input or "")
+        return 0
+    except SystemExit as exit:
+        if exit.code is None:
+            return 0
+        return exit.code if isinstance(exit.code, int) else 1
+    except Exception as error:
+        errors.write(f"Error: {error}\n")
+        return 1
+    finally:
+        sys.argv = saved_argv
+
+
+def serve(idle_timeout: float = 3600) -> None:
+    """
+    Listen on the daemon socket and answer requests one at a time.
+
+    The quick_basho module, its DDGS client and the config stay loaded
+    between requests, so forwarded calls skip interpreter, import and
+    connection setup. The client is only created again when the backend
+    settings in config.json change.
+
+    Args:
+        idle_timeout: Seconds without requests before the daemon exits (0 to never exit)
+    """
+    import quick_basho
+
+    if SOCKET_PATH.exists():
+        SOCKET_PATH.unlink()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(str(SOCKET_PATH))
+    finally:
+        os.umask(old_umask)
+    server.listen(8)
+    server.settimeout(idle_timeout or None)
+    PID_FILE.write_text(str(os.getpid()))
+
+    # Warm up the network stack and config before the first request
+    quick_basho.load_config()
+    quick_basho.get_client()
+
+    started = time.time()
+    served = 0
+    running = True
+    try:
+        while running:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                break
+
+            conn.settimeout(REQUEST_TIMEOUT)
+            reader = conn.makefile("rb")
+            writer = conn.makefile("w", encoding="utf-8", buffering=1)
+            try:
+                line = reader.readline()
+                # The answer itself may take as long as the model needs
+                conn.settimeout(None)
+                if not line:
+                    # Liveness probe from start(), nothing to answer
+                    continue
+                if not line.startswith(b"{"):
+                    # Plain-text protocol: the exit code on the first line, then the
+                    # answer (or the error message), then the connection is closed
+                    verb, _, text = line.decode("utf-8", "replace").strip().partition(" ")
+                    if verb in TEXT_COMMANDS:
+                        output, errors = io.StringIO(), io.StringIO()
+                        code = _run_command([f"--{verb}", text], output, errors)
+                        served += 1
+                        writer.write(f"{code}\n{output.getvalue() if code == 0 else errors.getvalue()}")
+                    else:
+                        writer.write(f"1\nUnknown request '{verb}', use one of: {', '.join(TEXT_COMMANDS)}\n")
+                    writer.flush()
+                    continue
+                request = json.loads(line)
+                command = request.get("command")
+                code = 0
+                errors = io.StringIO()
+                if command == "stop":
+                    writer.write("BASHō daemon stopped.\n")
+                    running = False
+                elif command == "status":
+                    writer.write(
+                        f"BASHō daemon running (pid {os.getpid()}, "
+                        f"up {time.time() - started:.0f}s, {served} requests served)\n"
+                    )
+                else:
+                    code = _run_command(request.get("argv", []), writer, errors, request.get("input"))
+                    served += 1
+                writer.write(f"\0{code}\0{errors.getvalue()}")
+                writer.flush()
+            except (socket.timeout, OSError, ValueError):
+                # Client went away, stayed silent or sent garbage, keep serving others
+                pass
+            finally:
+                # The socket is only really closed once its file objects are
+                for stream in (reader, writer, conn):
+                    try:
+                        stream.close()
+                    except OSError:
+                        pass
+    finally:
+        server.close()
+        for path in (SOCKET_PATH, PID_FILE):
+            if path.exists():
+                path.unlink()
+
+
+def start() -> int:
+    """
+    Start the daemon in the background unless it is already running.
+
+    Returns:
+        int: Exit code for the CLI
+    """
+    if _send({"command": "status"}) is not None:
+        return 0
+
+    import subprocess
+    subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "serve"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+    # Wait for the socket so the next bsho call already hits a warm daemon
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            _connect(timeout=0.5).close()
+            print("BASHō daemon started.")
+            return 0
+        except OSError:
+            time.sleep(0.05)
+    print("BASHō daemon did not start in time.")
+    return 1
+
+
+def stop() -> int:
+    """
+    Ask a running daemon to shut down.
+
+    Returns:
+        int: Exit code for the CLI
+    """
+    if _send({"command": "stop"}) is None:
+        print("BASHō daemon is not running.")
+    return 0
+
+
+def status() -> int:
+    """
+    Print whether the daemon is running.
+
+    Returns:
+        int: Exit code for the CLI (1 if not running)
+    """
+    if _send({"command": "status"}) is None:
+        print("BASHō daemon is not running.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        import quick_basho
+        config = quick_basho.load_config() or {}
+        serve(config.get("daemon", {}).get("idle_timeout", 3600))
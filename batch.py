@@ -0,0 +1,211 @@
+import json
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, Optional, TextIO, Tuple, Union
+
+from prompts import PromptTemplate
+
+ResultType = Dict[str, Union[int, float, str, None]]
+
+
+def read_questions(source: TextIO) -> Iterator[Tuple[int, str]]:
+    """
+    Lazily read questions, one per line, skipping blank lines and # comments.
+
+    Args:
+        source: Open file or stdin
+
+    Yields:
+        Tuple[int, str]: Index of the question and the question text
+    """
+    index = 0
+    for line in source:
+        question = line.strip()
+        if not question or question.startswith("#"):
+            continue
+        yield index, question
+        index += 1
+
+
+class BatchRunner:
+    """
+    Answers many quick questions over a bounded pool of worker threads.
+
+    Every worker keeps its own client (a DDGS chat session can't be
+    shared between threads) and reuses it for all of its questions. DDGS
+    clients go through the shared rate limiter, which also retries
+    rate-limited requests.
+
+    Attributes:
+        model: Name of the model answering the questions
+        prompt: Prompt template the questions are filled into
+        workers: Number of concurrent requests
+        cache_config: The "cache" block of the config, None to skip the answer cache
+        client_factory: Creates the chat client of a worker
+        cache_scope: Prefix keeping cached answers of different backends apart
+    """
+
+    def __init__(self, model: str, prompt: PromptTemplate, workers: int = 4,
+                 cache_config: Optional[Dict] = None,
+                 client_factory: Optional[Callable[[], Any]] = None,
+                 cache_scope: str = "") -> None:
+        """
+        Initialize the batch runner.
+
+        Args:
+            model: Name of the model answering the questions
+            prompt: Prompt template with a $question placeholder
+            workers: Number of concurrent requests
+            cache_config: The "cache" block of the config, None to skip the answer cache
+            client_factory: Creates the chat client of a worker (default: from config.json)
+            cache_scope: Prefix keeping cached answers of different backends apart
+        """
+        self.model = model
+        self.prompt = prompt
+        self.workers = max(workers, 1)
+        self.cache_config = cache_config
+        self.client_factory = client_factory
+        self.cache_scope = cache_scope
+        self._local = threading.local()
+
+    def _worker_state(self):
+        """
+        Get the chat client and answer cache of the current worker thread.
+
+        Returns:
+            Tuple: Chat client and AnswerCache (or None)
+        """
+        if not hasattr(self._local, "ddgs"):
+            if self.client_factory is None:
+                from backends import create_client
+                from basho_config import default_config, load_config
+                self.client_factory = lambda: create_client(load_config() or default_config())
+            self._local.ddgs = self.client_factory()
+            self._local.cache = None
+            if self.cache_config is not None and self.cache_config.get("enabled", True):
+                from answer_cache import AnswerCache
+                self._local.cache = AnswerCache(
+                    ttl=self.cache_config.get("ttl", 86400),
+                    max_entries=self.cache_config.get("max_entries", 500)
+                )
+        return self._local.ddgs, self._local.cache
+
+    def answer(self, index: int, question: str) -> ResultType:
+        """
+        Answer one question. Rate-limit retries happen inside the client.
+
+        Args:
+            index: Position of the question in the input
+            question: Question text
+
+        Returns:
+            ResultType: JSON-serializable result record
+        """
+        from streaming import reset_chat
+
+        ddgs, cache = self._worker_state()
+        prompt = self.prompt.render(question=question)
+        start = time.perf_counter()
+        result: ResultType = {"index": index, "question": question, "answer": None,
+                              "error": None, "attempts": 0, "cached": False}
+
+        cache_model = self.cache_scope + self.model
+        cached = cache.get(cache_model, prompt) if cache is not None else None
+        if cached is not None:
+            result.update(answer=cached, cached=True)
+        else:
+            try:
+                reset_chat(ddgs)
+                result["answer"] = ddgs.chat(prompt, model=self.model)
+            except Exception as error:
+                result["error"] = f"{type(error).__name__}: {error}"
+            result["attempts"] = getattr(ddgs, "last_attempts", 1)
+            if result["answer"] is not None and cache is not None:
+                cache.put(cache_model, prompt, result["answer"])
+
+        result["latency"] = round(time.perf_counter() - start, 3)
+        return result
+
+    def run(self, source: TextIO, out: TextIO, ordered: bool = True) -> Dict[str, float]:
+        """
+        Answer every question from source and write one JSON line per answer.
+
+        At most 2 * workers questions are read ahead, so arbitrarily long
+        inputs are processed in bounded memory.
+
+        Args:
+            source: Questions, one per line
+            out: Stream receiving JSONL results
+            ordered: Emit results in input order instead of completion order
+
+        Returns:
+            Dict[str, float]: Summary with counts, wall time, throughput and latency percentiles
+        """
+        questions = read_questions(source)
+        pending: Dict[Future, int] = {}
+        finished: Dict[int, ResultType] = {}
+        next_index = 0
+        latencies = []
+        failed = 0
+        start = time.perf_counter()
+
+        def emit(result: ResultType) -> None:
+            nonlocal failed
+            latencies.append(result["latency"])
+            failed += result["answer"] is None
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < 2 * self.workers:
+                    item = next(questions, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    pending[pool.submit(self.answer, *item)] = item[0]
+
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del pending[future]
+                    result = future.result()
+                    if not ordered:
+                        emit(result)
+                        continue
+                    finished[result["index"]] = result
+                    while next_index in finished:
+                        emit(finished.pop(next_index))
+                        next_index += 1
+
+        wall = time.perf_counter() - start
+        ordered_latencies = sorted(latencies)
+        return {
+            "questions": len(latencies),
+            "failed": failed,
+            "wall_seconds": round(wall, 3),
+            "questions_per_second": round(len(latencies) / wall, 2) if wall else 0.0,
+            "latency_p50": round(statistics.median(ordered_latencies), 3) if latencies else 0.0,
+            "latency_p95": round(ordered_latencies[int(0.95 * (len(latencies) - 1))], 3) if latencies else 0.0
+        }
+
+
+def print_summary(summary: Dict[str, float], out: TextIO = sys.stderr) -> None:
+    """
+    Print the batch summary in a human-readable form.
+
+    Args:
+        summary: Summary returned by BatchRunner.run
+        out: Stream to print to (stderr keeps stdout pure JSONL)
+    """
+    print(
+        f"Answered {summary['questions'] - summary['failed']}/{summary['questions']} questions "
+        f"in {summary['wall_seconds']:.2f}s ({summary['questions_per_second']:.2f} q/s, "
+        f"p50 {summary['latency_p50']:.2f}s, p95 {summary['latency_p95']:.2f}s)",
+        file=out
+    )
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Minimal OpenAI-compatible chat server for benchmarking the "openai" backend
+without a real model. Answers are deterministic and produced with a fixed
+time to first token and streaming speed.
+
+Point BASHō at it with this backend block in config.json:
+
+    "backend": {"chat": "openai", "openai": {"base_url": "http://127.0.0.1:8765/v1"}}
+
+Usage:
+    python benchmarks/mock_server.py [--port 8765] [--latency 0.05] [--tokens-per-second 200]
+"""
+
+import argparse
+import json
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backends import FakeBackend  # noqa: E402
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """
+    Handles POST /v1/chat/completions with the FakeBackend answer.
+    """
+
+    backend = FakeBackend()
+
+    def log_message(self, format: str, *args) -> None:
+        """Keep benchmark output clean."""
+
+    def do_POST(self) -> None:
+        """
+        Answer a chat completion request, streamed when asked to.
+        """
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        prompt = request.get("messages", [{}])[-1].get("content", "")
+        model = request.get("model", "mock")
+
+        if not request.get("stream"):
+            answer = self.backend.chat(prompt, model)
+            body = json.dumps({
+                "object": "chat.completion",
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": answer},
+                             "finish_reason": "stop"}]
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for chunk in self.backend.chat_yield(prompt, model):
+            event = {"object": "chat.completion.chunk", "model": model,
+                     "choices": [{"index": 0, "delta": {"content": chunk}}]}
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+def main() -> None:
+    """
+    Parse arguments and serve until interrupted.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    args = parser.parse_args()
+
+    MockHandler.backend = FakeBackend(latency=args.latency, tokens_per_second=args.tokens_per_second)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), MockHandler)
+    print(f"Mock OpenAI-compatible server on http://127.0.0.1:{args.port}/v1", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for BASHō's hot paths.
+
+Times bsho cold starts per flag, config loading and saving, conversation
+history operations at growing history sizes, and chat/search round trips
+against the deterministic fake backend, so nothing touches the network.
+Everything runs in a throwaway BASHO_HOME and never sees your real
+config, history or caches.
+
+Results are written as JSON and can be compared with a stored baseline;
+the exit code is 1 when a benchmark got slower than the baseline by more
+than the tolerance.
+
+Usage:
+    python benchmarks/run.py [--quick] [--only startup,config,history,roundtrip]
+                             [--runs N] [--output results.json]
+                             [--baseline benchmarks/baseline.json] [--save-baseline]
+                             [--tolerance 0.25]
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+QUICK_BASHO = ROOT / "quick_basho.py"
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# The fake backend answers instantly, so the numbers are BASHō's own overhead
+BENCH_CONFIG = {
+    "model": "gpt-4o-mini",
+    "backend": {
+        "chat": "fake",
+        "search": "fake",
+        "fake": {"latency": 0.0, "tokens_per_second": 0, "search_latency": 0.0}
+    }
+}
+
+# bsho invocations timed by the startup benchmark
+STARTUP_COMMANDS: Dict[str, List[str]] = {
+    "help": ["-h"],
+    "usage": [],
+    "question": ["--no-cache", "how do I list files"],
+    "text_search": ["--no-cache", "-t", "find large files"],
+    "all_search": ["--no-cache", "-a", "find large files"],
+    "history_search": ["-s", "docker"]
+}
+
+HISTORY_SIZES = [5, 100, 1000, 10000]
+QUICK_HISTORY_SIZES = [5, 100, 1000]
+
+ResultsType = Dict[str, Dict[str, float]]
+
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    """
+    Reduce timings to the statistics stored in the results.
+
+    Args:
+        timings: Wall time of each run in milliseconds
+
+    Returns:
+        Dict[str, float]: Median, p95, minimum and number of runs
+    """
+    ordered = sorted(timings)
+    return {
+        "median_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))], 3),
+        "min_ms": round(ordered[0], 3),
+        "runs": len(ordered)
+    }
+
+
+def measure(function: Callable[[], object], runs: int, warmup: int = 1) -> Dict[str, float]:
+    """
+    Time repeated calls of a function.
+
+    Args:
+        function: Function to time
+        runs: Number of timed calls
+        warmup: Untimed calls made first
+
+    Returns:
+        Dict[str, float]: Statistics of the timed calls
+    """
+    for _ in range(warmup):
+        function()
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarize(timings)
+
+
+def bench_startup(runs: int, quick: bool) -> ResultsType:
+    """
+    Time bsho cold starts, one fresh interpreter per run.
+
+    Args:
+        runs: Number of timed runs per command
+        quick: Fewer runs
+
+    Returns:
+        ResultsType: Results per command, plus the bare interpreter for reference
+    """
+    def run(args: List[str]) -> Callable[[], object]:
+        command = [sys.executable] + args
+        # No stdin, so the question benchmark never waits for piped input
+        return lambda: subprocess.run(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                      stderr=subprocess.DEVNULL)
+
+    runs = max(runs // 2, 5) if quick else runs
+    results = {"startup.bare_interpreter": measure(run(["-c", "pass"]), runs)}
+    for name, args in STARTUP_COMMANDS.items():
+        results[f"startup.{name}"] = measure(run([str(QUICK_BASHO)] + args), runs)
+    return results
+
+
+def bench_config(runs: int, quick: bool) -> ResultsType:
+    """
+    Time config loading (memoized and from disk) and saving.
+
+    Args:
+        runs: Base number of timed runs
+        quick: Fewer runs
+
+    Returns:
+        ResultsType: Results per operation
+    """
+    import basho_config
+
+    config = basho_config.load_config()
+
+    def load_cold() -> None:
+        basho_config._cached = None
+        basho_config.load_config()
+
+    runs = runs * 10 if not quick else runs
+    return {
+        "config.load_cached": measure(basho_config.load_config, runs),
+        "config.load_cold": measure(load_cold, runs),
+        "config.save": measure(lambda: basho_config.save_config(config["model"], config), runs)
+    }
+
+
+def bench_history(runs: int, quick: bool) -> ResultsType:
+    """
+    Time conversation history operations at growing history sizes.
+
+    Args:
+        runs: Base number of timed runs
+        quick: Skip the largest history size
+
+    Returns:
+        ResultsType: Results per operation and history size
+    """
+    from conversation_history import ConversationHandler
+
+    exchanges = [
+        {"user": "how do I find large files", "basho": "Use du -ah . | sort -rh | head -n 20"},
+        {"user": "and only in /var", "basho": "Run it as: du -ah /var | sort -rh | head -n 20"},
+        {"user": "how do I follow a log with docker", "basho": "docker logs -f <container>"}
+    ]
+    results: ResultsType = {}
+    for size in (QUICK_HISTORY_SIZES if quick else HISTORY_SIZES):
+        ConversationHandler(max_conversations=0).delete_all()
+        handler = ConversationHandler(max_conversations=size)
+        with handler.db:
+            for _ in range(size):
+                handler._insert("gpt-4o-mini", exchanges)
+
+        # Reading everything back gets slow for big histories, keep those runs few
+        size_runs = runs if size <= 1000 else max(runs // 4, 3)
+        results[f"history.save.{size}"] = measure(
+            lambda: handler.save_conversation("gpt-4o-mini", exchanges), runs
+        )
+        results[f"history.get_conversations.{size}"] = measure(handler.get_conversations, size_runs)
+        results[f"history.get_conversation.{size}"] = measure(lambda: handler.get_conversation(size), runs)
+        results[f"history.search.{size}"] = measure(lambda: handler.search("docker logs"), runs)
+        handler.delete_all()
+    return results
+
+
+def bench_roundtrip(runs: int, quick: bool) -> ResultsType:
+    """
+    Time full chat and search round trips against the fake backend.
+
+    Args:
+        runs: Base number of timed runs
+        quick: Fewer runs
+
+    Returns:
+        ResultsType: Results per round trip
+    """
+    import quick_basho
+    from answer_cache import AnswerCache
+    from batch import BatchRunner
+    from prompts import get_prompt
+    from streaming import reset_chat, stream_chat
+
+    config = quick_basho.load_config()
+    client = quick_basho.get_client()
+    quick_prompt = get_prompt(config, "quick")
+    prompt = quick_prompt.render(question="how do I list files")
+    settings = quick_basho.get_search_settings(config, "text")
+    cache = AnswerCache()
+    cache.put(config["model"], prompt, "ls -la")
+
+    def chat() -> None:
+        reset_chat(client)
+        stream_chat(client, prompt, config["model"], out=io.StringIO())
+
+    def search(use_cache: bool) -> Callable[[], str]:
+        def run() -> str:
+            results = quick_basho.get_results(client, "text", "find large files", settings, use_cache)
+            return quick_basho.render_results("text", results, settings["max_results"])
+        return run
+
+    def batch() -> None:
+        questions = io.StringIO("".join(f"question {i}\n" for i in range(20)))
+        BatchRunner(config["model"], quick_prompt, workers=4).run(questions, io.StringIO())
+
+    runs = runs if not quick else max(runs // 2, 5)
+    return {
+        "roundtrip.chat_stream": measure(chat, runs),
+        "roundtrip.chat_cached": measure(lambda: cache.get(config["model"], prompt), runs),
+        "roundtrip.search_text": measure(search(False), runs),
+        "roundtrip.search_text_cached": measure(search(True), runs),
+        "roundtrip.batch_20": measure(batch, max(runs // 4, 3))
+    }
+
+
+BENCHMARKS: Dict[str, Callable[[int, bool], ResultsType]] = {
+    "startup": bench_startup,
+    "config": bench_config,
+    "history": bench_history,
+    "roundtrip": bench_roundtrip
+}
+
+
+def compare(results: ResultsType, baseline: ResultsType, tolerance: float,
+            min_delta_ms: float = 0.5) -> List[str]:
+    """
+    Find benchmarks whose median got slower than the baseline.
+
+    Args:
+        results: Current results
+        baseline: Stored baseline results
+        tolerance: Allowed relative slowdown (0.25 is 25%)
+        min_delta_ms: Slowdowns smaller than this are noise
+
+    Returns:
+        List[str]: Description of every regression
+    """
+    regressions = []
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["median_ms"], stats["median_ms"]
+        if after > before * (1 + tolerance) and after - before > min_delta_ms:
+            regressions.append(f"{name}: {before:.2f} ms -> {after:.2f} ms (+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_results(results: ResultsType, baseline: Optional[ResultsType]) -> None:
+    """
+    Print results as a table, with the baseline median when there is one.
+
+    Args:
+        results: Current results
+        baseline: Stored baseline results, if any
+    """
+    print(f"{'benchmark':<40} {'median':>10} {'p95':>10} {'baseline':>10}")
+    for name, stats in results.items():
+        before = ""
+        if baseline and name in baseline:
+            before = f"{baseline[name]['median_ms']:.2f}"
+        print(f"{name:<40} {stats['median_ms']:>10.2f} {stats['p95_ms']:>10.2f} {before:>10}")
+
+
+def main() -> None:
+    """
+    Run the selected benchmarks, store the results and compare them with the baseline.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark BASHō's hot paths.")
+    parser.add_argument("--only", default=",".join(BENCHMARKS),
+                        help="Comma-separated benchmarks to run: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--runs", type=int, default=20, help="Base number of timed runs")
+    parser.add_argument("--quick", action="store_true", help="Fewer runs and no 10,000 conversation history")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, default=BASELINE, help="Baseline to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+
+    home = Path(tempfile.mkdtemp(prefix="basho-bench-"))
+    os.environ["BASHO_HOME"] = str(home)
+    (home / "config.json").write_text(json.dumps(BENCH_CONFIG))
+    sys.path.insert(0, str(ROOT))
+
+    results: ResultsType = {}
+    try:
+        for name in selected:
+            results.update(BENCHMARKS[name](args.runs, args.quick))
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "quick": args.quick
+        },
+        "results": results
+    }
+
+    baseline = None
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+    print_results(results, baseline)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nNo regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
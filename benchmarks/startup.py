@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the bsho entry point.
+
+Runs quick_basho.py with flags that never touch the network and fails
+(exit code 1) when BASHō's own startup cost goes over its budget. The
+cost is measured as the median wall time minus the median wall time of
+a bare interpreter (python -c pass), so the budget holds on slow and
+fast machines alike.
+
+Usage:
+    python benchmarks/startup.py [--runs N]
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+QUICK_BASHO = ROOT / "quick_basho.py"
+
+# Budget in milliseconds for BASHō's startup on top of the bare interpreter
+BUDGETS_MS: Dict[str, float] = {
+    "-h": 50.0,
+}
+
+
+def time_command(command: List[str], runs: int) -> List[float]:
+    """
+    Time repeated runs of a command.
+
+    Args:
+        command: Command line to run
+        runs: Number of timed runs
+
+    Returns:
+        List[float]: Wall time of each run in milliseconds
+    """
+    # Warm-up run so bytecode caches and the page cache are populated
+    subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    timings: List[float] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    """
+    Run every budgeted invocation and report the results against the budget.
+    """
+    runs = 20
+    if "--runs" in sys.argv:
+        runs = int(sys.argv[sys.argv.index("--runs") + 1])
+
+    interpreter = statistics.median(time_command([sys.executable, "-c", "pass"], runs))
+    print(f"bare interpreter median {interpreter:6.1f} ms")
+
+    failed = False
+    for flag, budget in BUDGETS_MS.items():
+        timings = time_command([sys.executable, str(QUICK_BASHO), flag], runs)
+        median = statistics.median(timings)
+        overhead = median - interpreter
+        status = "ok" if overhead <= budget else "OVER BUDGET"
+        failed |= overhead > budget
+        print(f"bsho {flag:<6} median {median:6.1f} ms  startup {overhead:6.1f} ms  "
+              f"budget {budget:.0f} ms  {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Stress test for the conversation history under concurrent processes.
+
+Spawns many writer processes that save conversations at the same time
+(like several ask-basho sessions exiting together on a shared host) and
+reader processes that keep listing, loading and searching conversations
+meanwhile. Everything runs in a throwaway BASHO_HOME.
+
+Afterwards the database must pass SQLite's integrity check, hold exactly
+max_conversations complete conversations (or every saved one, if fewer)
+and its full-text index must be consistent. The exit code is 1 otherwise
+or when any process hit an error.
+
+Usage:
+    python benchmarks/stress_history.py [--writers 32] [--saves 20] [--readers 4]
+                                        [--max-conversations 50] [--compress]
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def writer(number: int, saves: int, max_conversations: int, compress: bool, start, results) -> None:
+    """
+    Save conversations as fast as possible.
+
+    Args:
+        number: Writer number, part of every message
+        saves: Conversations to save
+        max_conversations: History size limit
+        compress: Store messages compressed
+        start: Event all processes wait for, so they begin together
+        results: Queue receiving (kind, errors, seconds per operation)
+    """
+    from conversation_history import ConversationHandler
+
+    handler = ConversationHandler(max_conversations=max_conversations, compress=compress)
+    errors: List[str] = []
+    latencies: List[float] = []
+    start.wait()
+    for i in range(saves):
+        exchanges = [
+            {"user": f"writer {number} save {i} question {j}", "basho": f"answer {j} " * 20}
+            for j in range(3)
+        ]
+        began = time.perf_counter()
+        try:
+            handler.save_conversation("gpt-4o-mini", exchanges)
+        except Exception as error:
+            errors.append(f"writer {number}: {error}")
+        latencies.append(time.perf_counter() - began)
+    results.put(("save", errors, latencies))
+
+
+def reader(number: int, max_conversations: int, start, stop, results) -> None:
+    """
+    List, load and search conversations until the writers are done.
+
+    Args:
+        number: Reader number
+        max_conversations: History size limit
+        start: Event all processes wait for, so they begin together
+        stop: Event set once every writer finished
+        results: Queue receiving (kind, errors, seconds per operation)
+    """
+    from conversation_history import ConversationHandler
+
+    handler = ConversationHandler(max_conversations=max_conversations)
+    errors: List[str] = []
+    latencies: List[float] = []
+    start.wait()
+    while not stop.is_set():
+        began = time.perf_counter()
+        try:
+            count = handler.count()
+            if count:
+                conversation = handler.get_conversation(count)
+                if conversation is not None and len(conversation["exchanges"]) != 3:
+                    errors.append(f"reader {number}: conversation with {len(conversation['exchanges'])} exchanges")
+            handler.search("question")
+        except Exception as error:
+            errors.append(f"reader {number}: {error}")
+        latencies.append(time.perf_counter() - began)
+    results.put(("read", errors, latencies))
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Pick a percentile of the values, in milliseconds.
+
+    Args:
+        values: Timings in seconds
+        fraction: Percentile as a fraction, e.g. 0.95
+
+    Returns:
+        float: Milliseconds (0 without values)
+    """
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[int(fraction * (len(values) - 1))] * 1000
+
+
+def check(max_conversations: int, expected: int) -> List[str]:
+    """
+    Check the database left behind by the stress run.
+
+    Args:
+        max_conversations: History size limit
+        expected: Number of conversations that must be stored
+
+    Returns:
+        List[str]: Problems found
+    """
+    from conversation_history import ConversationHandler
+
+    handler = ConversationHandler(max_conversations=max_conversations)
+    db = handler.db
+    problems = []
+    integrity = db.execute("PRAGMA integrity_check").fetchone()[0]
+    if integrity != "ok":
+        problems.append(f"integrity check: {integrity}")
+    if handler._fts:
+        try:
+            db.execute("INSERT INTO exchanges_fts (exchanges_fts) VALUES ('integrity-check')")
+        except Exception as error:
+            problems.append(f"full-text index: {error}")
+    count = handler.count()
+    if count != expected:
+        problems.append(f"{count} conversations stored, expected {expected}")
+    incomplete = db.execute(
+        "SELECT COUNT(*) FROM (SELECT conversation_id FROM exchanges GROUP BY conversation_id"
+        " HAVING COUNT(*) != 3)"
+    ).fetchone()[0]
+    if incomplete:
+        problems.append(f"{incomplete} conversations with missing exchanges")
+    mode = db.execute("PRAGMA journal_mode").fetchone()[0]
+    print(f"Journal mode: {mode}")
+    return problems
+
+
+def main() -> None:
+    """
+    Run the stress test and report throughput, latencies and problems.
+    """
+    parser = argparse.ArgumentParser(description="Stress the conversation history with concurrent processes.")
+    parser.add_argument("--writers", type=int, default=32, help="Writer processes")
+    parser.add_argument("--saves", type=int, default=20, help="Conversations saved per writer")
+    parser.add_argument("--readers", type=int, default=4, help="Reader processes")
+    parser.add_argument("--max-conversations", type=int, default=50, help="History size limit")
+    parser.add_argument("--compress", action="store_true", help="Store messages compressed")
+    args = parser.parse_args()
+
+    home = Path(tempfile.mkdtemp(prefix="basho-stress-"))
+    os.environ["BASHO_HOME"] = str(home)
+    sys.path.insert(0, str(ROOT))
+
+    # Fresh interpreters, so every process opens its own connections like separate bsho runs
+    context = multiprocessing.get_context("spawn")
+    start, stop = context.Event(), context.Event()
+    results = context.Queue()
+    writers = [
+        context.Process(target=writer, args=(i, args.saves, args.max_conversations, args.compress, start, results))
+        for i in range(args.writers)
+    ]
+    readers = [
+        context.Process(target=reader, args=(i, args.max_conversations, start, stop, results))
+        for i in range(args.readers)
+    ]
+    try:
+        for process in writers + readers:
+            process.start()
+        began = time.perf_counter()
+        start.set()
+
+        collected: Dict[str, List] = {"save": [[], []], "read": [[], []]}
+        for _ in writers:
+            kind, errors, latencies = results.get()
+            collected[kind][0].extend(errors)
+            collected[kind][1].extend(latencies)
+        elapsed = time.perf_counter() - began
+        stop.set()
+        for _ in readers:
+            kind, errors, latencies = results.get()
+            collected[kind][0].extend(errors)
+            collected[kind][1].extend(latencies)
+        for process in writers + readers:
+            process.join()
+
+        saves = args.writers * args.saves
+        print(f"{args.writers} writers saved {saves} conversations in {elapsed:.2f}s "
+              f"({saves / elapsed:.0f} saves/s)")
+        for kind, label in (("save", "save"), ("read", "read (count + load + search)")):
+            latencies = collected[kind][1]
+            print(f"  {label:<28} {len(latencies):>6} ops  p50 {percentile(latencies, 0.5):8.1f} ms"
+                  f"  p95 {percentile(latencies, 0.95):8.1f} ms  max {percentile(latencies, 1.0):8.1f} ms")
+
+        problems = collected["save"][0] + collected["read"][0]
+        problems += check(args.max_conversations, min(args.max_conversations, saves))
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+
+    if problems:
+        print(f"\n{len(problems)} problems:")
+        for problem in problems[:20]:
+            print(f"  {problem}")
+        sys.exit(1)
+    print("\nNo errors, history is consistent.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+from typing import Callable, Dict, List, Optional, Union
+
+SummarizerType = Callable[[str], str]
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the number of tokens in a text (about 4 characters per token).
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    return max(len(text) // 4, 1)
+
+
+def get_budget(context_config: Dict[str, any], model: str) -> int:
+    """
+    Get the context token budget for a model.
+
+    Args:
+        context_config: The "context" block of the config
+        model: Name of the model
+
+    Returns:
+        int: Token budget for the conversation context
+    """
+    budget: Union[int, Dict[str, int]] = context_config.get("budget_tokens", 2000)
+    if isinstance(budget, dict):
+        return budget.get(model, budget.get("default", 2000))
+    return budget
+
+
+def format_exchange(exchange: Dict[str, str]) -> str:
+    """
+    Format one exchange the way it is sent to the model.
+
+    Args:
+        exchange: Exchange containing user and BASHō messages
+
+    Returns:
+        str: Formatted exchange
+    """
+    return f"User: {exchange['user']}\nBASHō: {exchange['basho']}\n"
+
+
+class ContextWindow:
+    """
+    Conversation context kept under a token budget.
+
+    The most recent exchanges are sent verbatim, older ones are folded into
+    a summary. The summary is only recomputed when enough new exchanges
+    have piled up, and it is stored with the conversation so loading it
+    again doesn't summarize again.
+
+    Every exchange is formatted and measured once, when it is added, and
+    the rendered context is reused until the next exchange arrives, so a
+    turn only costs its own exchange instead of the whole conversation.
+
+    Attributes:
+        exchanges: All exchanges of the conversation
+        summary: Summary of exchanges[:summarized]
+        summarized: Number of leading exchanges covered by the summary
+        budget_tokens: Maximum estimated tokens of the rendered context
+        keep_recent: Number of most recent exchanges always kept verbatim
+    """
+
+    def __init__(self, budget_tokens: int = 2000, keep_recent: int = 4,
+                 summarize: Optional[SummarizerType] = None,
+                 exchanges: Optional[List[Dict[str, str]]] = None,
+                 summary: str = "", summarized: int = 0) -> None:
+        """
+        Initialize the context window.
+
+        Args:
+            budget_tokens: Maximum estimated tokens of the rendered context
+            keep_recent: Number of most recent exchanges always kept verbatim
+            summarize: Callable turning conversation text into a short summary
+            exchanges: Exchanges the conversation starts with
+            summary: Stored summary of the first `summarized` exchanges
+            summarized: Number of leading exchanges covered by the summary
+        """
+        self.budget_tokens = budget_tokens
+        self.keep_recent = keep_recent
+        self.summarize = summarize
+        self.exchanges: List[Dict[str, str]] = list(exchanges or [])
+        self.summary = summary
+        self.summarized = min(summarized, len(self.exchanges))
+        self._formatted: List[str] = [format_exchange(exchange) for exchange in self.exchanges]
+        self._tokens: List[int] = [estimate_tokens(text) for text in self._formatted]
+        self._pending_tokens = sum(self._tokens[self.summarized:])
+        self._rendered: Optional[str] = None
+
+    def add(self, user: str, basho: str) -> None:
+        """
+        Append a new exchange.
+
+        Args:
+            user: User message
+            basho: BASHō response
+        """
+        exchange = {"user": user, "basho": basho}
+        text = format_exchange(exchange)
+        self.exchanges.append(exchange)
+        self._formatted.append(text)
+        self._tokens.append(estimate_tokens(text))
+        self._pending_tokens += self._tokens[-1]
+        self._rendered = None
+
+    def _fold(self, exchanges: List[Dict[str, str]], formatted: List[str]) -> None:
+        """
+        Merge exchanges into the running summary.
+
+        Args:
+            exchanges: Exchanges that are no longer sent verbatim
+            formatted: The same exchanges, formatted
+        """
+        parts = [f"Summary so far: {self.summary}\n"] if self.summary else []
+        parts.extend(formatted)
+        text = "".join(parts)
+
+        summary = ""
+        if self.summarize is not None:
+            try:
+                summary = self.summarize(text).strip()
+            except Exception:
+                summary = ""
+        if not summary:
+            # Without a model summary keep at least what the user asked about
+            topics = "; ".join(exchange["user"] for exchange in exchanges)
+            summary = f"{self.summary} The user also asked about: {topics}".strip()
+
+        # A summary may use at most a quarter of the budget
+        self.summary = summary[:self.budget_tokens]
+
+    def _compact(self) -> None:
+        """
+        Fold older exchanges into the summary once the verbatim part grows too long.
+
+        Exchanges are folded in batches: over the budget only the newest
+        exchanges fitting in half of it stay verbatim, so the next turns fit
+        without summarizing again. When even the kept exchanges and a full
+        summary are over the budget, folding can't help and render() trims
+        the context instead, until too many exchanges are pending.
+        """
+        pending = len(self.exchanges) - self.summarized
+        if not pending:
+            return
+        over_budget = estimate_tokens(self.summary) + self._pending_tokens > self.budget_tokens
+        too_many = pending > 2 * self.keep_recent
+        if not (over_budget or too_many):
+            return
+
+        keep = min(self.keep_recent, pending)
+        if over_budget:
+            limit, keep, kept_tokens = keep, 0, 0
+            while keep < limit and (not keep or kept_tokens + self._tokens[-keep - 1] <= self.budget_tokens // 2):
+                keep += 1
+                kept_tokens += self._tokens[-keep]
+            # A summary takes up to a quarter of the budget
+            if not too_many and kept_tokens + self.budget_tokens // 4 > self.budget_tokens:
+                return
+
+        fold_until = len(self.exchanges) - keep
+        if fold_until > self.summarized:
+            self._fold(self.exchanges[self.summarized:fold_until], self._formatted[self.summarized:fold_until])
+            self._pending_tokens -= sum(self._tokens[self.summarized:fold_until])
+            self.summarized = fold_until
+            self._rendered = None
+
+    def render(self) -> str:
+        """
+        Build the context text for the next request.
+
+        Returns:
+            str: Summary and recent exchanges, within the token budget
+        """
+        if self._rendered is not None:
+            return self._rendered
+        self._compact()
+
+        parts: List[str] = []
+        if self.summary:
+            parts.append(f"Summary of the earlier conversation: {self.summary}\n")
+
+        # Newest exchanges win when even the verbatim part is over budget
+        remaining = self.budget_tokens * 4 - sum(len(part) for part in parts)
+        recent: List[str] = []
+        for index in range(len(self._formatted) - 1, self.summarized - 1, -1):
+            if remaining <= 0:
+                break
+            text = self._formatted[index]
+            if len(text) > remaining:
+                text = text[:remaining].rstrip() + "...\n"
+            recent.append(text)
+            remaining -= len(text)
+        parts.extend(reversed(recent))
+        self._rendered = "".join(parts)
+        return self._rendered
@@ -1,74 +1,554 @@
 import json
+import zlib
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
-ConversationType = Dict[str, Union[str, List[Dict[str, str]]]]
+from basho_config import BASHO_HOME
+
+ConversationType = Dict[str, Union[str, int, List[Dict[str, str]]]]
+
+# Bumped whenever SCHEMA changes, stored in the database's user_version
+SCHEMA_VERSION = 1
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS conversations ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+    " model TEXT NOT NULL,"
+    " summary TEXT NOT NULL DEFAULT '',"
+    " summarized INTEGER NOT NULL DEFAULT 0)",
+    "CREATE TABLE IF NOT EXISTS exchanges ("
+    " id INTEGER PRIMARY KEY,"
+    " conversation_id INTEGER NOT NULL REFERENCES conversations (id) ON DELETE CASCADE,"
+    " position INTEGER NOT NULL,"
+    " user TEXT NOT NULL,"
+    " basho TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS exchanges_conversation ON exchanges (conversation_id, position)"
+)
+
+
+def encode_text(text: str, compress: bool) -> Union[str, bytes]:
+    """
+    Prepare message text for storage.
+
+    Args:
+        text: Message text
+        compress: Store it zlib-compressed when that is smaller
+
+    Returns:
+        Union[str, bytes]: The text itself, or its compressed bytes
+    """
+    if not compress:
+        return text
+    raw = text.encode("utf-8")
+    packed = zlib.compress(raw, 9)
+    # Short messages grow when compressed, those are kept as plain text
+    return packed if len(packed) < len(raw) else text
+
+
+def decode_text(value: Union[str, bytes]) -> str:
+    """
+    Read message text as stored by encode_text. Plain text (including rows
+    written before compression was enabled) is returned unchanged.
+
+    Args:
+        value: Stored column value
+
+    Returns:
+        str: Message text
+    """
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode("utf-8")
+    return value
 
 class ConversationHandler:
     """
     Handles saving and loading conversation histories.
-    
+
+    Conversations are kept in a SQLite database (conversations/history.db),
+    so saving one conversation is a single insert instead of rewriting the
+    whole history, and a single conversation can be read without loading
+    the others. Exchanges are also indexed in an FTS5 full-text index
+    (when SQLite ships with it) that is updated on every save. Message
+    text can optionally be stored zlib-compressed; compressed and plain
+    rows can be mixed. Many bsho/ask-basho processes can save at the same
+    time: every save is one transaction on a WAL-mode database, and
+    readers are never blocked by a save in progress.
+
     Attributes:
         conv_dir: Directory path where conversation files are stored
+        db_path: Path of the SQLite history database
         max_conversations: Maximum number of conversations to store
+        compress: Compress message text of newly saved conversations
     """
-    
-    def __init__(self, max_conversations: int = 5) -> None:
+
+    def __init__(self, max_conversations: int = 5, compress: bool = False) -> None:
         """
         Initialize conversation handler with storage directory.
-        
+
         Args:
             max_conversations: Maximum number of conversations to store (0 for no storage)
+            compress: Compress message text of newly saved conversations
         """
-        self.conv_dir: Path = Path(__file__).parent / "conversations"
+        self.conv_dir: Path = BASHO_HOME / "conversations"
+        self.db_path: Path = self.conv_dir / "history.db"
         self.max_conversations = max_conversations
+        self.compress = compress
+        self._db = None
+        self._fts = False
         if max_conversations > 0:
             self.conv_dir.mkdir(exist_ok=True)
-        
-    def save_conversation(self, model: str, exchanges: List[Dict[str, str]]) -> None:
+
+    @property
+    def db(self):
+        """
+        Open the history database on first use, creating the schema and
+        migrating old convo_N.json files if needed.
+
+        The database runs in WAL mode, so any number of processes can read
+        while one of them writes, and writers wait for each other (up to the
+        busy timeout) instead of failing. Opening an up-to-date database
+        only reads, so readers never queue behind writers.
+
+        Returns:
+            sqlite3.Connection: Open database connection
+        """
+        if self._db is None:
+            import sqlite3
+            # The timeout is SQLite's busy timeout: how long a writer waits for the lock
+            self._db = sqlite3.connect(str(self.db_path), timeout=30)
+            self._db.execute("PRAGMA foreign_keys = ON")
+            # Lets SQL that replays message text (FTS maintenance) read compressed rows
+            self._db.create_function("message_text", 1, decode_text, deterministic=True)
+            try:
+                mode = self._db.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+            except sqlite3.OperationalError:
+                mode = ""
+            if mode == "wal":
+                # Durable across crashes in WAL mode, without an fsync per commit
+                self._db.execute("PRAGMA synchronous = NORMAL")
+
+            version = self._db.execute("PRAGMA user_version").fetchone()[0]
+            if version < SCHEMA_VERSION or any(self.conv_dir.glob("convo_*.json")):
+                self._setup()
+            self._fts = self._db.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'exchanges_fts'"
+            ).fetchone() is not None
+        return self._db
+
+    @contextmanager
+    def _write(self) -> Iterator[None]:
+        """
+        Run the enclosed statements as one write transaction.
+
+        BEGIN IMMEDIATE takes the write lock up front (waiting for other
+        writers), so a transaction never fails halfway when it turns from
+        reading into writing while another process writes.
+        """
+        db = self.db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            db.rollback()
+            raise
+        db.commit()
+
+    @contextmanager
+    def snapshot(self) -> Iterator[None]:
+        """
+        Read consistently across several queries: everything read inside
+        sees the history as it was at the first query, even while other
+        processes save and evict conversations.
+        """
+        db = self.db
+        db.execute("BEGIN")
+        try:
+            yield
+        finally:
+            db.commit()
+
+    def _setup(self) -> None:
+        """
+        Create or upgrade the schema and import old JSON conversations, in
+        one write transaction so concurrent first runs don't both do it.
+        """
+        migrated: List[Path] = []
+        try:
+            with self._write():
+                for statement in SCHEMA:
+                    self._db.execute(statement)
+                columns = {row[1] for row in self._db.execute("PRAGMA table_info(conversations)")}
+                if "summary" not in columns:
+                    # Databases created before summaries were stored
+                    self._db.execute("ALTER TABLE conversations ADD COLUMN summary TEXT NOT NULL DEFAULT ''")
+                    self._db.execute("ALTER TABLE conversations ADD COLUMN summarized INTEGER NOT NULL DEFAULT 0")
+                self._create_search_index()
+                migrated = self._migrate_json_files()
+                self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        except BaseException:
+            # Put the JSON files back so the next run imports them again
+            for file in migrated:
+                file.rename(file.with_suffix(""))
+            raise
+        for file in migrated:
+            file.unlink(missing_ok=True)
+
+    def _create_search_index(self) -> None:
+        """
+        Create the full-text index over exchanges, filling it from existing
+        exchanges when it is new (caller handles the transaction). Falls
+        back to plain LIKE search when SQLite is built without FTS5.
+        """
+        import sqlite3
+        exists = self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'exchanges_fts'"
+        ).fetchone()
+        if exists:
+            self._fts = True
+            return
+
+        try:
+            # Contentless: the text lives in exchanges, the index only stores tokens
+            self._db.execute(
+                "CREATE VIRTUAL TABLE exchanges_fts USING fts5(user, basho, content='')"
+            )
+            self._db.execute(
+                "INSERT INTO exchanges_fts (rowid, user, basho) "
+                "SELECT id, message_text(user), message_text(basho) FROM exchanges"
+            )
+            self._fts = True
+        except sqlite3.OperationalError:
+            self._fts = False
+
+    def _migrate_json_files(self) -> List[Path]:
+        """
+        Import conversations stored as convo_N.json by older versions (caller
+        handles the transaction). The files are renamed to .migrated while
+        the transaction is open, so no other process imports them too.
+
+        Returns:
+            List[Path]: Renamed files, to delete once the transaction is committed
+        """
+        json_files = sorted(self.conv_dir.glob("convo_*.json"),
+                            key=lambda x: int(x.stem.split('_')[1]))
+        migrated = []
+        for file in json_files:
+            with open(file, 'r') as f:
+                convo = json.load(f)
+            self._insert(convo["model"], convo["exchanges"])
+            target = file.with_name(file.name + ".migrated")
+            file.rename(target)
+            migrated.append(target)
+        if migrated:
+            self._evict()
+        return migrated
+
+    def _insert(self, model: str, exchanges: List[Dict[str, str]],
+                summary: str = "", summarized: int = 0) -> int:
+        """
+        Insert one conversation (caller handles the transaction).
+
+        Args:
+            model: Name of the model used in conversation
+            exchanges: List of conversation exchanges
+            summary: Summary of the first `summarized` exchanges
+            summarized: Number of leading exchanges covered by the summary
+
+        Returns:
+            int: ID of the new conversation
+        """
+        cursor = self._db.execute(
+            "INSERT INTO conversations (model, summary, summarized) VALUES (?, ?, ?)",
+            (model, summary, summarized)
+        )
+        convo_id = cursor.lastrowid
+        for i, exchange in enumerate(exchanges):
+            cursor = self._db.execute(
+                "INSERT INTO exchanges (conversation_id, position, user, basho) VALUES (?, ?, ?, ?)",
+                (convo_id, i, encode_text(exchange["user"], self.compress),
+                 encode_text(exchange["basho"], self.compress))
+            )
+            if self._fts:
+                self._db.execute(
+                    "INSERT INTO exchanges_fts (rowid, user, basho) VALUES (?, ?, ?)",
+                    (cursor.lastrowid, exchange["user"], exchange["basho"])
+                )
+        return convo_id
+
+    def _evict(self) -> None:
+        """
+        Delete the oldest conversations beyond max_conversations (caller handles the transaction).
+        """
+        row = self._db.execute(
+            "SELECT id FROM conversations ORDER BY id DESC LIMIT 1 OFFSET ?",
+            (self.max_conversations,)
+        ).fetchone()
+        if row is None:
+            return
+
+        if self._fts:
+            # Contentless FTS5 rows are removed by replaying their original text
+            self._db.execute(
+                "INSERT INTO exchanges_fts (exchanges_fts, rowid, user, basho) "
+                "SELECT 'delete', id, message_text(user), message_text(basho) FROM exchanges"
+                " WHERE conversation_id <= ?",
+                (row[0],)
+            )
+        self._db.execute("DELETE FROM conversations WHERE id <= ?", (row[0],))
+
+    def save_conversation(self, model: str, exchanges: List[Dict[str, str]],
+                          summary: str = "", summarized: int = 0) -> None:
         """
         Save a new conversation while maintaining only the specified number of recent ones.
-        
+
         Args:
             model: Name of the model used in conversation
             exchanges: List of conversation exchanges containing user and BASHō messages
+            summary: Summary of older exchanges computed while chatting, if any
+            summarized: Number of leading exchanges covered by the summary
         """
         if self.max_conversations <= 0:
             return
-            
-        conversations: List[ConversationType] = []
-        existing_files = sorted(self.conv_dir.glob("convo_*.json"), 
-                              key=lambda x: int(x.stem.split('_')[1]))
-        
-        for file in existing_files:
-            with open(file, 'r') as f:
-                conversations.append(json.load(f))
-            file.unlink()
-            
-        conversations.append({
-            "model": model,
-            "exchanges": exchanges
-        })
-        
-        if len(conversations) > self.max_conversations:
-            conversations = conversations[-self.max_conversations:]
-            
-        for i, convo in enumerate(conversations, 1):
-            with open(self.conv_dir / f"convo_{i}.json", 'w') as f:
-                json.dump(convo, f, indent=2)
-            
+
+        with self._write():
+            self._insert(model, exchanges, summary, summarized)
+            self._evict()
+
+    def count(self) -> int:
+        """
+        Count the stored conversations.
+
+        Returns:
+            int: Number of stored conversations
+        """
+        if self.max_conversations <= 0:
+            return 0
+        return self.db.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+
+    def get_conversation(self, convo_num: int) -> Optional[ConversationType]:
+        """
+        Retrieve a single conversation by its number.
+
+        Args:
+            convo_num: Conversation number, 1 is the oldest stored conversation
+
+        Returns:
+            Optional[ConversationType]: Conversation dict, None if it doesn't exist
+        """
+        if self.max_conversations <= 0 or convo_num < 1:
+            return None
+
+        with self.snapshot():
+            row = self._find(convo_num)
+            if row is None:
+                return None
+            exchanges = list(self.iter_exchanges(row[0]))
+        return {"model": row[1], "exchanges": exchanges, "summary": row[2], "summarized": row[3]}
+
+    def get_conversation_info(self, convo_num: int) -> Optional[ConversationType]:
+        """
+        Retrieve a conversation without its exchanges, to stream them with iter_exchanges.
+
+        Args:
+            convo_num: Conversation number, 1 is the oldest stored conversation
+
+        Returns:
+            Optional[ConversationType]: Dict with id, model, summary and summarized, None if it doesn't exist
+        """
+        if self.max_conversations <= 0 or convo_num < 1:
+            return None
+        row = self._find(convo_num)
+        if row is None:
+            return None
+        return {"id": row[0], "model": row[1], "summary": row[2], "summarized": row[3]}
+
+    def _find(self, convo_num: int):
+        """
+        Look up the row of a conversation by its number.
+
+        Args:
+            convo_num: Conversation number, 1 is the oldest stored conversation
+
+        Returns:
+            Optional[tuple]: id, model, summary and summarized, None if it doesn't exist
+        """
+        return self.db.execute(
+            "SELECT id, model, summary, summarized FROM conversations ORDER BY id LIMIT 1 OFFSET ?",
+            (convo_num - 1,)
+        ).fetchone()
+
+    def iter_exchanges(self, convo_id: int) -> Iterator[Dict[str, str]]:
+        """
+        Stream the exchanges of a conversation in order, decoding one at a time.
+
+        Args:
+            convo_id: Database id of the conversation (see get_conversation_info)
+
+        Yields:
+            Dict[str, str]: Exchange containing user and BASHō messages
+        """
+        cursor = self.db.execute(
+            "SELECT user, basho FROM exchanges WHERE conversation_id = ? ORDER BY position",
+            (convo_id,)
+        )
+        for user, basho in cursor:
+            yield {"user": decode_text(user), "basho": decode_text(basho)}
+
+    def first_exchange_id(self) -> int:
+        """
+        Get the database id of the oldest stored exchange.
+
+        Returns:
+            int: Exchange id, 0 when nothing is stored
+        """
+        return self.db.execute("SELECT COALESCE(MIN(id), 0) FROM exchanges").fetchone()[0]
+
+    def last_exchange_id(self) -> int:
+        """
+        Get the database id of the newest stored exchange.
+
+        Returns:
+            int: Exchange id, 0 when nothing is stored
+        """
+        return self.db.execute("SELECT COALESCE(MAX(id), 0) FROM exchanges").fetchone()[0]
+
+    def iter_exchanges_since(self, last_id: int) -> Iterator[Tuple[int, str, str, str]]:
+        """
+        Stream exchanges stored after a given one, across all conversations.
+
+        Args:
+            last_id: Database id of the last exchange already seen (0 for all)
+
+        Yields:
+            Tuple[int, str, str, str]: Exchange id, model of its conversation, user and BASHō messages
+        """
+        cursor = self.db.execute(
+            "SELECT exchanges.id, conversations.model, exchanges.user, exchanges.basho FROM exchanges"
+            " JOIN conversations ON conversations.id = exchanges.conversation_id"
+            " WHERE exchanges.id > ? ORDER BY exchanges.id",
+            (last_id,)
+        )
+        for exchange_id, model, user, basho in cursor:
+            yield exchange_id, model, decode_text(user), decode_text(basho)
+
     def get_conversations(self) -> List[ConversationType]:
         """
         Retrieve all saved conversations.
-        
+
         Returns:
             List of conversation dictionaries containing model and exchanges
         """
         if self.max_conversations <= 0:
             return []
-            
+
         conversations: List[ConversationType] = []
-        for file in sorted(self.conv_dir.glob("convo_*.json")):
-            with open(file, 'r') as f:
-                conversations.append(json.load(f))
+        by_id: Dict[int, ConversationType] = {}
+        with self.snapshot():
+            for convo_id, model in self.db.execute("SELECT id, model FROM conversations ORDER BY id"):
+                by_id[convo_id] = {"model": model, "exchanges": []}
+                conversations.append(by_id[convo_id])
+            for convo_id, user, basho in self.db.execute(
+                    "SELECT conversation_id, user, basho FROM exchanges ORDER BY conversation_id, position"):
+                by_id[convo_id]["exchanges"].append({"user": decode_text(user), "basho": decode_text(basho)})
         return conversations
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Union[int, str]]]:
+        """
+        Find stored exchanges matching a query, best matches first.
+
+        Args:
+            query: Free-text search query
+            limit: Maximum number of matches to return
+
+        Returns:
+            List of dicts with the conversation number, user question and BASHō answer
+        """
+        import re
+
+        words = re.findall(r"\w+", query)
+        if self.max_conversations <= 0 or not words:
+            return []
+
+        db = self.db
+        if self._fts:
+            # Quote every word so FTS5 operators in the query are taken literally,
+            # try all words first and fall back to any word
+            rows = []
+            for operator in (" AND ", " OR "):
+                match = operator.join('"' + word.replace('"', '') + '"' for word in words)
+                rows = db.execute(
+                    "SELECT e.conversation_id, e.user, e.basho FROM exchanges_fts"
+                    " JOIN exchanges e ON e.id = exchanges_fts.rowid"
+                    " WHERE exchanges_fts MATCH ? ORDER BY bm25(exchanges_fts) LIMIT ?",
+                    (match, limit)
+                ).fetchall()
+                if rows:
+                    break
+        else:
+            conditions = " AND ".join(
+                "(message_text(user) || ' ' || message_text(basho)) LIKE ?" for _ in words
+            )
+            rows = db.execute(
+                f"SELECT conversation_id, user, basho FROM exchanges WHERE {conditions}"
+                " ORDER BY conversation_id DESC LIMIT ?",
+                [f"%{word}%" for word in words] + [limit]
+            ).fetchall()
+
+        results = []
+        for convo_id, user, basho in rows:
+            convo_num = db.execute(
+                "SELECT COUNT(*) FROM conversations WHERE id <= ?", (convo_id,)
+            ).fetchone()[0]
+            results.append({"conversation": convo_num, "user": decode_text(user), "basho": decode_text(basho)})
+        return results
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """
+        Report how much space the history takes.
+
+        Returns:
+            Dict with the number of conversations and exchanges, the message
+            text size before and after compression, the compression ratio,
+            how many messages are compressed and the database size on disk
+        """
+        stats: Dict[str, Union[int, float]] = {
+            "conversations": 0, "exchanges": 0, "text_bytes": 0, "stored_bytes": 0,
+            "compressed_messages": 0, "ratio": 1.0, "disk_bytes": 0
+        }
+        if self.max_conversations <= 0 or not self.db_path.exists():
+            return stats
+
+        db = self.db
+        stats["conversations"] = self.count()
+        for user, basho in db.execute("SELECT user, basho FROM exchanges"):
+            stats["exchanges"] += 1
+            for value in (user, basho):
+                text = decode_text(value)
+                stats["text_bytes"] += len(text.encode("utf-8"))
+                if isinstance(value, bytes):
+                    stats["stored_bytes"] += len(value)
+                    stats["compressed_messages"] += 1
+                else:
+                    stats["stored_bytes"] += len(value.encode("utf-8"))
+        if stats["stored_bytes"]:
+            stats["ratio"] = round(stats["text_bytes"] / stats["stored_bytes"], 2)
+        stats["disk_bytes"] = sum(
+            path.stat().st_size for path in self.conv_dir.glob("history.db*") if path.is_file()
+        )
+        return stats
+
+    def delete_all(self) -> None:
+        """
+        Delete every stored conversation together with the storage directory.
+        """
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        if not self.conv_dir.exists():
+            return
+        for file in self.conv_dir.iterdir():
+            if file.name.startswith(("convo_", "history.db")):
+                file.unlink()
+        if not any(self.conv_dir.iterdir()):
+            self.conv_dir.rmdir()
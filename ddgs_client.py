@@ -0,0 +1,284 @@
+import random
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import timings
+from basho_config import BASHO_HOME, DEFAULTS
+from state_file import locked_state
+
+STATE_FILE = BASHO_HOME / "ratelimit.json"
+
+
+class CircuitOpenError(Exception):
+    """Raised when an endpoint failed too often recently and is cooling down."""
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Check whether a DDGS error is worth retrying.
+
+    Args:
+        error: Exception raised by a DDGS call
+
+    Returns:
+        bool: True for rate-limit and timeout errors
+    """
+    return type(error).__name__ in ("RatelimitException", "TimeoutException")
+
+
+class SharedRateLimiter:
+    """
+    Token bucket and per-endpoint circuit breakers whose state lives in a
+    small JSON file guarded by an flock, so concurrent bsho processes share
+    one request budget instead of each hammering the API.
+
+    Attributes:
+        path: Path of the shared state file
+        settings: Rate limit settings (the "rate_limit" config block)
+    """
+
+    def __init__(self, settings: Optional[Dict[str, float]] = None, path: Path = STATE_FILE) -> None:
+        """
+        Initialize the limiter.
+
+        Args:
+            settings: Overrides for the default "rate_limit" block
+            path: Path of the shared state file
+        """
+        self.settings = dict(DEFAULTS["rate_limit"], **(settings or {}))
+        self.path = path
+
+    @contextmanager
+    def _state(self) -> Iterator[Dict[str, Any]]:
+        """
+        Lock, read and (on exit) write back the shared state.
+
+        Yields:
+            Dict[str, Any]: Mutable state
+        """
+        with locked_state(self.path) as state:
+            state.setdefault("tokens", float(self.settings["burst"]))
+            state.setdefault("updated", time.time())
+            state.setdefault("endpoints", {})
+            yield state
+
+    def acquire(self, endpoint: str) -> None:
+        """
+        Block until a request to the endpoint is allowed. A rate of 0
+        (or less) turns throttling off, the circuit breaker still applies.
+
+        Args:
+            endpoint: Name of the DDGS endpoint (chat, text, news, videos)
+
+        Raises:
+            CircuitOpenError: If the endpoint's circuit is open
+        """
+        while True:
+            with self._state() as state:
+                now = time.time()
+                circuit = state["endpoints"].get(endpoint, {})
+                if circuit.get("open_until", 0) > now:
+                    raise CircuitOpenError(
+                        f"DuckDuckGo {endpoint} endpoint is cooling down after repeated failures, "
+                        f"try again in {circuit['open_until'] - now:.0f}s"
+                    )
+
+                if self.settings["rate"] <= 0:
+                    return
+
+                elapsed = max(now - state["updated"], 0.0)
+                state["tokens"] = min(float(self.settings["burst"]),
+                                      state["tokens"] + elapsed * self.settings["rate"])
+                state["updated"] = now
+                if state["tokens"] >= 1:
+                    state["tokens"] -= 1
+                    return
+                wait = (1 - state["tokens"]) / self.settings["rate"]
+            time.sleep(wait)
+
+    def record_success(self, endpoint: str) -> None:
+        """
+        Close the endpoint's circuit after a successful request.
+
+        Args:
+            endpoint: Name of the DDGS endpoint
+        """
+        with self._state() as state:
+            state["endpoints"].pop(endpoint, None)
+
+    def record_failure(self, endpoint: str, rate_limited: bool) -> None:
+        """
+        Count a rate-limited or timed out request and open the circuit once
+        failures pile up. Other errors say nothing about the endpoint's health
+        and are not recorded.
+
+        Args:
+            endpoint: Name of the DDGS endpoint
+            rate_limited: Whether DuckDuckGo rate-limited us, which also
+                empties the shared bucket so other processes back off too
+        """
+        with self._state() as state:
+            circuit = state["endpoints"].setdefault(endpoint, {"failures": 0})
+            circuit["failures"] = circuit.get("failures", 0) + 1
+            if circuit["failures"] >= self.settings["failure_threshold"]:
+                circuit["open_until"] = time.time() + self.settings["cooldown"]
+                circuit["failures"] = 0
+            if rate_limited:
+                state["tokens"] = 0.0
+                state["updated"] = time.time()
+
+
+class RateLimitedDDGS:
+    """
+    DDGS wrapper that sends every chat and search request through the
+    shared rate limiter and retries rate-limit/timeout errors with
+    jittered exponential backoff.
+
+    Attributes:
+        ddgs: Wrapped DDGS instance
+        limiter: Shared rate limiter
+        last_attempts: Number of attempts made by the last request
+    """
+
+    def __init__(self, ddgs, settings: Optional[Dict[str, float]] = None,
+                 limiter: Optional[SharedRateLimiter] = None) -> None:
+        """
+        Wrap a DDGS instance.
+
+        Args:
+            ddgs: DDGS instance to wrap
+            settings: Rate limit settings (the "rate_limit" config block)
+            limiter: Limiter to use, a new one backed by the shared state file by default
+        """
+        self.ddgs = ddgs
+        self.limiter = limiter or SharedRateLimiter(settings)
+        self.last_attempts = 0
+
+    def _backoff(self, attempt: int) -> float:
+        """
+        Delay before the given retry.
+
+        Args:
+            attempt: Zero-based retry number
+
+        Returns:
+            float: Seconds to wait
+        """
+        settings = self.limiter.settings
+        delay = min(settings["backoff_base"] * 2 ** attempt, settings["backoff_max"])
+        return delay * (0.5 + random.random())
+
+    def _call(self, endpoint: str, request: Callable[[], Any]) -> Any:
+        """
+        Run a request with rate limiting, retries and circuit breaking.
+
+        Args:
+            endpoint: Name of the DDGS endpoint
+            request: Callable performing the request
+
+        Returns:
+            Any: Result of the request
+        """
+        max_retries = int(self.limiter.settings["max_retries"])
+        for attempt in range(max_retries + 1):
+            self.last_attempts = attempt + 1
+            with timings.phase("rate_limit"):
+                self.limiter.acquire(endpoint)
+            try:
+                result = request()
+            except Exception as error:
+                if not is_retryable(error):
+                    raise
+                self.limiter.record_failure(endpoint, type(error).__name__ == "RatelimitException")
+                if attempt == max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+            self.limiter.record_success(endpoint)
+            return result
+
+    def reset_chat(self) -> None:
+        """
+        Start a fresh chat session on the wrapped client.
+        """
+        from streaming import reset_chat
+        reset_chat(self.ddgs)
+
+    def chat(self, keywords: str, model: str = "gpt-4o-mini") -> str:
+        """
+        Send a chat message.
+
+        Args:
+            keywords: Prompt to send
+            model: Name of the model to use
+
+        Returns:
+            str: The model's answer
+        """
+        def request() -> str:
+            # A failed attempt must not leave its message in the DDGS chat history
+            messages = list(getattr(self.ddgs, "_chat_messages", []))
+            try:
+                return self.ddgs.chat(keywords, model=model)
+            except Exception:
+                if hasattr(self.ddgs, "_chat_messages"):
+                    self.ddgs._chat_messages = messages
+                raise
+        return self._call("chat", request)
+
+    def chat_yield(self, keywords: str, model: str = "gpt-4o-mini") -> Iterator[str]:
+        """
+        Stream a chat answer. Retries only happen before the first chunk arrives.
+
+        Args:
+            keywords: Prompt to send
+            model: Name of the model to use
+
+        Yields:
+            str: Chunks of the answer
+        """
+        if not hasattr(self.ddgs, "chat_yield"):
+            yield self.chat(keywords, model=model)
+            return
+
+        def request():
+            messages = list(getattr(self.ddgs, "_chat_messages", []))
+            chunks = self.ddgs.chat_yield(keywords, model=model)
+            try:
+                first = next(chunks, "")
+            except Exception:
+                if hasattr(self.ddgs, "_chat_messages"):
+                    self.ddgs._chat_messages = messages
+                raise
+            return first, chunks
+
+        first, chunks = self._call("chat", request)
+        yield first
+        yield from chunks
+
+    def _search(self, endpoint: str, **kwargs) -> List[Dict[str, str]]:
+        """
+        Run a search endpoint.
+
+        Args:
+            endpoint: One of text, news, videos
+            **kwargs: Arguments of the DDGS search method
+
+        Returns:
+            List[Dict[str, str]]: Search results
+        """
+        return self._call(endpoint, lambda: getattr(self.ddgs, endpoint)(**kwargs))
+
+    def text(self, **kwargs) -> List[Dict[str, str]]:
+        """Text search, see DDGS.text."""
+        return self._search("text", **kwargs)
+
+    def news(self, **kwargs) -> List[Dict[str, str]]:
+        """News search, see DDGS.news."""
+        return self._search("news", **kwargs)
+
+    def videos(self, **kwargs) -> List[Dict[str, str]]:
+        """Video search, see DDGS.videos."""
+        return self._search("videos", **kwargs)
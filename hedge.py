@@ -0,0 +1,222 @@
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from basho_config import BASHO_HOME
+from state_file import locked_state, read_state
+
+HISTOGRAM_FILE = BASHO_HOME / "latency.json"
+
+# Upper bounds in seconds of the latency buckets. One more bucket after the
+# last bound holds slower answers and failed requests.
+BUCKETS = [0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 4.0, 6.0, 8.0, 12.0, 20.0, 30.0]
+
+
+class LatencyHistogram:
+    """
+    Per-model histogram of complete answer times, stored in a small JSON
+    file guarded by an flock so concurrent bsho processes can all record.
+
+    Once a model has max_samples answers all its counts are halved, so the
+    histogram follows models that got faster or slower.
+
+    Attributes:
+        path: Path of the histogram file
+        max_samples: Samples per model before older ones are aged out
+    """
+
+    def __init__(self, path: Path = HISTOGRAM_FILE, max_samples: int = 200) -> None:
+        """
+        Initialize the histogram.
+
+        Args:
+            path: Path of the histogram file
+            max_samples: Samples per model before older ones are aged out
+        """
+        self.path = path
+        self.max_samples = max_samples
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Read the histograms without locking (the file is replaced atomically).
+
+        Returns:
+            Dict[str, Any]: Model name to {"counts": [...]}
+        """
+        return read_state(self.path)
+
+    def record(self, model: str, seconds: Optional[float]) -> None:
+        """
+        Add one answer time.
+
+        Args:
+            model: Name of the model
+            seconds: Time until the complete answer, None for a failed request
+        """
+        bucket = len(BUCKETS)
+        if seconds is not None:
+            bucket = next((i for i, bound in enumerate(BUCKETS) if seconds <= bound), len(BUCKETS))
+        try:
+            with locked_state(self.path) as state:
+                counts = state.setdefault(model, {}).setdefault("counts", [0.0] * (len(BUCKETS) + 1))
+                counts[bucket] += 1
+                if sum(counts) >= self.max_samples:
+                    state[model]["counts"] = [count / 2 for count in counts]
+        except OSError:
+            pass
+
+    @staticmethod
+    def samples(state: Dict[str, Any], model: str) -> float:
+        """
+        Count the (aged) samples of a model.
+
+        Args:
+            state: Histograms as returned by load()
+            model: Name of the model
+
+        Returns:
+            float: Number of samples
+        """
+        return sum(state.get(model, {}).get("counts", []))
+
+    @staticmethod
+    def percentile(state: Dict[str, Any], model: str, fraction: float) -> Optional[float]:
+        """
+        Estimate a latency percentile, interpolating inside the bucket.
+
+        Args:
+            state: Histograms as returned by load()
+            model: Name of the model
+            fraction: Percentile as a fraction, e.g. 0.95
+
+        Returns:
+            Optional[float]: Seconds, None without samples
+        """
+        counts = state.get(model, {}).get("counts", [])
+        total = sum(counts)
+        if not total:
+            return None
+        target = fraction * total
+        seen = 0.0
+        bounds = [0.0] + BUCKETS + [BUCKETS[-1] * 2]
+        for i, count in enumerate(counts):
+            if count and seen + count >= target:
+                return bounds[i] + (bounds[i + 1] - bounds[i]) * (target - seen) / count
+            seen += count
+        return bounds[-1]
+
+
+def plan(state: Dict[str, Any], models: List[str], settings: Dict[str, Any]) -> Tuple[List[str], float]:
+    """
+    Order the models for a hedged request and pick the hedge delay.
+
+    Models with enough samples are ordered by median latency. A model that
+    still lacks samples becomes the first backup, so it gets measured when
+    the primary is slow. The delay is the primary's 95th percentile: only
+    the slowest answers get hedged.
+
+    Args:
+        state: Histograms as returned by LatencyHistogram.load()
+        models: Candidate models, preferred model first
+        settings: The "hedge" config block
+
+    Returns:
+        Tuple[List[str], float]: Models in the order they are tried, hedge delay in seconds
+    """
+    delay = settings["delay"]
+    if not settings["auto"]:
+        return models, delay
+
+    min_samples = settings["min_samples"]
+    known = [model for model in models if LatencyHistogram.samples(state, model) >= min_samples]
+    unknown = [model for model in models if model not in known]
+    if not known:
+        return models, delay
+
+    def median(model: str) -> float:
+        # With min_samples 0 a model can count as known without any samples
+        value = LatencyHistogram.percentile(state, model, 0.5)
+        return float("inf") if value is None else value
+
+    known.sort(key=median)
+    order = known[:1] + unknown[:1] + known[1:] + unknown[1:]
+    delay = LatencyHistogram.percentile(state, order[0], 0.95)
+    if delay is None:
+        return order, settings["delay"]
+    return order, min(max(delay, settings["min_delay"]), settings["max_delay"])
+
+
+def hedged_chat(create_client: Callable[[], Any], prompt: str, models: List[str], delay: float,
+                backups: int = 1, histogram: Optional[LatencyHistogram] = None) -> Tuple[str, str, float]:
+    """
+    Ask the first model and, whenever no answer arrived within the delay,
+    one more backup model. The first complete answer wins and the other
+    requests are cancelled at their next chunk. A failed request starts the
+    next backup right away.
+
+    Args:
+        create_client: Creates a chat client; every model gets its own, since
+            a DDGS client holds the state of one chat session
+        prompt: Full prompt to send
+        models: Models in the order they are tried
+        delay: Seconds to wait for an answer before starting the next backup
+        backups: Maximum number of backup models
+        histogram: Latency histogram that records every finished request
+
+    Returns:
+        Tuple[str, str, float]: Answer, model that gave it and its answer time in seconds
+
+    Raises:
+        Exception: The last error when every model failed
+    """
+    from streaming import iter_chat
+
+    racers = models[:1 + max(backups, 0)]
+    finished: queue.Queue = queue.Queue()
+    cancelled = threading.Event()
+
+    def run(model: str) -> None:
+        try:
+            client = create_client()
+            start = time.perf_counter()
+            parts = []
+            # Streaming lets a losing request stop at its next chunk
+            for chunk in iter_chat(client, prompt, model):
+                if cancelled.is_set():
+                    return
+                parts.append(chunk)
+            finished.put((model, "".join(parts), time.perf_counter() - start, None))
+        except Exception as error:
+            finished.put((model, None, None, error))
+
+    def start_next() -> None:
+        # Daemon threads, so a cancelled request that is still waiting for its
+        # first byte never keeps bsho from exiting
+        threading.Thread(target=run, args=(racers[started],), daemon=True).start()
+
+    started, running = 0, 0
+    last_error: Optional[Exception] = None
+    while started < len(racers) or running:
+        if running == 0 or started < len(racers) and time.perf_counter() >= next_start:
+            start_next()
+            started += 1
+            running += 1
+            next_start = time.perf_counter() + delay
+            continue
+        timeout = max(next_start - time.perf_counter(), 0) if started < len(racers) else None
+        try:
+            model, answer, seconds, error = finished.get(timeout=timeout)
+        except queue.Empty:
+            continue
+        running -= 1
+        if histogram is not None:
+            histogram.record(model, seconds)
+        if error is None:
+            cancelled.set()
+            return answer, model, seconds
+        last_error = error
+        # Don't wait out the delay after a failure
+        next_start = time.perf_counter()
+    raise last_error or RuntimeError("No models to ask")
@@ -11,17 +11,16 @@ source "$SCRIPT_DIR/.venv/bin/activate"
 pip install duckduckgo-search
 
 # Create the executable script for conversation mode
+# (the venv interpreter is exec'd directly, sourcing activate on every call is slow)
 cat > "$SCRIPT_DIR/ask-basho" << EOF
-#!/bin/bash
-source "$SCRIPT_DIR/.venv/bin/activate"
-python3 "$SCRIPT_DIR/basho.py" "\$@"
+#!/bin/sh
+exec "$SCRIPT_DIR/.venv/bin/python3" "$SCRIPT_DIR/basho.py" "\$@"
 EOF
 
 # Create the quick question script
 cat > "$SCRIPT_DIR/bsho" << EOF
-#!/bin/bash
-source "$SCRIPT_DIR/.venv/bin/activate"
-python3 "$SCRIPT_DIR/quick_basho.py" "\$@"
+#!/bin/sh
+exec "$SCRIPT_DIR/.venv/bin/python3" "$SCRIPT_DIR/quick_basho.py" "\$@"
 EOF
 
 # Make all scripts executable
@@ -43,4 +42,5 @@ if [[ ":$PATH:" != *":$HOME/.local/bin:"* ]]; then
 fi
 
 echo "Installation complete! Please restart your terminal or run: source ~/.bashrc"
-echo "Then you can use 'ask-basho' for conversation mode or 'bsho \"question\"' for quick answers!"
\ No newline at end of file
+echo "Then you can use 'ask-basho' for conversation mode or 'bsho \"question\"' for quick answers!"
+echo "Optional: add 'source $SCRIPT_DIR/shell/basho.bash' to ~/.bashrc (or shell/basho.zsh to ~/.zshrc) for the Ctrl-X e / Ctrl-X s key bindings."
\ No newline at end of file
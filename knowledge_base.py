@@ -0,0 +1,666 @@
+#!/usr/bin/env python3
+
+import fcntl
+import os
+import re
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from basho_config import BASHO_HOME
+
+KNOWLEDGE_FILE = BASHO_HOME / "knowledge.db"
+
+# Only commands (section 1) and admin commands (section 8) answer questions
+MAN_SECTIONS = ("man1", "man8")
+MAN_PATHS = ("/usr/share/man", "/usr/local/share/man")
+
+# Commands whose --help output is indexed when they have no man page. Only
+# well-known tools that print help and exit, never run arbitrary binaries.
+HELP_COMMANDS = tuple((
+    "ls cp mv rm mkdir rmdir touch ln cat head tail less more grep egrep find locate sort uniq wc cut "
+    "paste tr sed awk diff cmp du df stat file chmod chown chgrp tar gzip gunzip bzip2 xz zip unzip "
+    "ps top free uname date cal xargs tee basename dirname realpath readlink which whereis whoami id "
+    "groups hostname uptime env printenv sleep watch seq split md5sum sha256sum base64 nl rev column "
+    "curl wget ssh scp rsync git ip ss ping traceroute dig nslookup lsblk lsof mount journalctl "
+    "systemctl useradd usermod groupadd crontab nano vim jq"
+).split())
+
+# Words of a question that say nothing about which command is meant
+QUERY_STOPWORDS = frozenset(
+    "a all an and any are as at be best bash by can command commands could do does easiest for from "
+    "get give how i if in into is it know linux me my of on or please shell should so tell terminal "
+    "that the there this to tool use using want way what when where which why will with would you your"
+    .split()
+)
+
+# Everyday words and the words man pages use for them. Each question word
+# matches any of its alternatives, quoted alternatives are phrases.
+SYNONYMS: Dict[str, Tuple[str, ...]] = {
+    "folder": ("directory",),
+    "folders": ("directories",),
+    "create": ("make",),
+    "new": ("make", "create"),
+    "delete": ("remove",),
+    "erase": ("remove",),
+    "rename": ("move",),
+    "hidden": ("starting with",),
+    "file": ("contents", "entries"),
+    "files": ("contents", "entries"),
+    "show": ("list", "print", "display", "report"),
+    "text": ("lines",),
+    "view": ("print", "display", "concatenate"),
+    "search": ("match", "pattern", "find"),
+    "permissions": ("mode",),
+    "permission": ("mode",),
+    "owner": ("ownership",),
+    "download": ("transfer", "retriever"),
+    "size": ("usage",),
+    "space": ("usage", "disk"),
+    "running": ("process", "processes"),
+    "lines": ("newline",),
+    "extract": ("archive", "decompress"),
+    "compress": ("archive", "compression"),
+    "link": ("links",),
+    "symlink": ("symbolic",),
+}
+
+# An option only hints at the command, a question word found in the whatis
+# line counts fully and one found only in an option counts this much
+OPTION_WEIGHT = 0.5
+
+MatchType = Dict[str, Union[str, float]]
+
+
+def _clean_troff(text: str) -> str:
+    """
+    Strip troff font changes and escapes from a line of a man page.
+
+    Args:
+        text: Raw troff text
+
+    Returns:
+        str: Plain text
+    """
+    text = re.sub(r"\\f(\(..|\[[^]]*\]|.)", "", text)
+    text = re.sub(r"\\\((..)", lambda match: {"em": "-", "en": "-", "aq": "'", "dq": '"'}.get(match.group(1), ""),
+                  text)
+    text = re.sub(r"\\\[[^]]*\]|\\\*(\(..|\[[^]]*\]|.)", "", text)
+    text = text.replace("\\-", "-").replace("\\ ", " ").replace("\\~", " ")
+    text = re.sub(r"\\[&,/|^%:)]", "", text)
+    # Any other escape keeps its character, a trailing backslash continues the line
+    text = re.sub(r"\\(.)", lambda match: "\\" if match.group(1) == "e" else match.group(1), text).rstrip("\\")
+    return " ".join(text.replace('"', "").split())
+
+
+def _macro_text(line: str) -> str:
+    """
+    Turn a troff line into its text, following font macros like .B and .BR.
+
+    Args:
+        line: One line of a man page
+
+    Returns:
+        str: Text of the line, empty for other macros
+    """
+    if not line.startswith((".", "'")):
+        return _clean_troff(line)
+    macro, _, rest = line[1:].partition(" ")
+    if macro in ("B", "I", "SM", "SB"):
+        return _clean_troff(rest)
+    if macro in ("BR", "RB", "BI", "IB", "IR", "RI"):
+        # Alternating fonts join their arguments without spaces
+        return _clean_troff("".join(re.findall(r'"[^"]*"|\S+', rest)))
+    return ""
+
+
+def parse_man_page(text: str) -> Optional[Dict[str, Union[str, List[str], List[Tuple[str, str]]]]]:
+    """
+    Extract the whatis line, synopsis and options of a man page.
+
+    Args:
+        text: Man page in troff format
+
+    Returns:
+        Optional[Dict]: names, summary, synopsis and options ((flags, description) pairs),
+            None when the page has no NAME section (or only points to another page)
+    """
+    sections: Dict[str, List[str]] = {}
+    current = None
+    for line in text.splitlines():
+        if line.startswith(('.\\"', "'\\\"")):
+            continue
+        if line.startswith((".SH", ".Sh")):
+            current = _clean_troff(line[3:]).upper()
+            sections.setdefault(current, [])
+        elif current is not None:
+            sections[current].append(line)
+
+    name_line = " ".join(filter(None, (_macro_text(line) for line in sections.get("NAME", []))))
+    names, separator, summary = name_line.partition(" - ")
+    if not separator:
+        return None
+    synopsis = " ".join(filter(None, (_macro_text(line) for line in sections.get("SYNOPSIS", [])[:6])))
+
+    options: List[Tuple[str, str]] = []
+    # Options are listed under OPTIONS, DESCRIPTION or, like find's tests, sections of their own
+    for section, lines in sections.items():
+        if section in ("NAME", "SYNOPSIS"):
+            continue
+        i = 0
+        while i < len(lines):
+            line = lines[i]
+            tag = None
+            if line.startswith(".TP") and i + 1 < len(lines):
+                i += 1
+                tag = _macro_text(lines[i])
+            elif line.startswith(".IP "):
+                tag = _clean_troff(line[4:].rsplit(" ", 1)[0] if line.rstrip()[-1:].isdigit() else line[4:])
+            i += 1
+            if not tag or not tag.startswith("-"):
+                continue
+            description: List[str] = []
+            while i < len(lines) and not re.match(r"\.(TP|IP|PP|P|LP|HP|SH|SS)\b", lines[i]):
+                description.append(_macro_text(lines[i]))
+                i += 1
+            description_text = " ".join(filter(None, description))
+            if description_text:
+                options.append((tag[:60], description_text[:200]))
+
+    return {
+        "names": [name.strip() for name in names.split(",") if name.strip()],
+        "summary": summary.strip(),
+        "synopsis": synopsis[:200],
+        "options": options
+    }
+
+
+def parse_help(command: str, text: str) -> Optional[Dict[str, Union[str, List[str], List[Tuple[str, str]]]]]:
+    """
+    Extract the usage line, summary and options of --help output.
+
+    Args:
+        command: Name of the command
+        text: Output of "command --help"
+
+    Returns:
+        Optional[Dict]: Same fields as parse_man_page, None without a summary
+    """
+    synopsis = ""
+    summary = ""
+    options: List[Tuple[str, str]] = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        # Flags, then two or more spaces, then the description
+        option = re.match(r"\s{1,8}(-\S.{0,58}?)\s{2,}(\S.*)", line)
+        if option:
+            options.append((option.group(1)[:60], option.group(2)[:200]))
+        elif stripped.lower().startswith("usage:") and not synopsis:
+            synopsis = stripped[6:].strip()[:200]
+        elif stripped.startswith(command + " ") and not synopsis:
+            synopsis = stripped[:200]
+        elif (not summary and not line[0].isspace() and not stripped.startswith("-") and not stripped.endswith(":")
+              and not re.search(r"(unknown|illegal|invalid|not an?) option|\bsee \S+\(\d\)", stripped,
+                                re.IGNORECASE)):
+            summary = stripped.rstrip(".")
+    if not summary:
+        return None
+    return {"names": [command], "summary": summary[:200], "synopsis": synopsis, "options": options}
+
+
+def tokenize_question(question: str) -> List[Tuple[str, ...]]:
+    """
+    Split a question into term groups for the index lookup.
+
+    Every content word becomes a group of itself and its synonyms; a group
+    matches an entry when any of its alternatives does.
+
+    Args:
+        question: Question text
+
+    Returns:
+        List[Tuple[str, ...]]: FTS5 terms (or quoted phrases) per question word
+    """
+    groups: List[Tuple[str, ...]] = []
+    for word in re.findall(r"[a-z0-9][a-z0-9_+-]*", question.lower()):
+        word = word.strip("-")
+        if not word or word in QUERY_STOPWORDS:
+            continue
+        group = tuple(f'"{term}"' for term in (word,) + SYNONYMS.get(word, ()))
+        if group not in groups:
+            groups.append(group)
+    return groups
+
+
+class KnowledgeBase:
+    """
+    Offline index of installed command documentation, stored in SQLite FTS5.
+
+    Every man page of section 1 and 8 adds its whatis line, synopsis and
+    options; allowlisted commands without a man page add their --help
+    output instead. Sources are re-read only when their modification time
+    changes, so rebuilding after a package upgrade is quick.
+
+    Attributes:
+        path: Path of the SQLite index file
+    """
+
+    def __init__(self, path: Path = KNOWLEDGE_FILE) -> None:
+        """
+        Open (and create if needed) the knowledge base.
+
+        Args:
+            path: Location of the index, defaults to knowledge.db in BASHO_HOME
+        """
+        self.path = path
+        self._lock_path = path.with_name(path.name + ".lock")
+        self._db = sqlite3.connect(str(path), timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS sources ("
+            " path TEXT PRIMARY KEY,"
+            " mtime INTEGER NOT NULL,"
+            " command TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS commands ("
+            " name TEXT PRIMARY KEY,"
+            " summary TEXT NOT NULL,"
+            " synopsis TEXT NOT NULL,"
+            " source TEXT NOT NULL);"
+            "CREATE VIRTUAL TABLE IF NOT EXISTS summaries USING fts5("
+            " text, name UNINDEXED, source UNINDEXED, tokenize='porter unicode61');"
+            "CREATE VIRTUAL TABLE IF NOT EXISTS options USING fts5("
+            " name, text, source UNINDEXED, tokenize='porter unicode61');"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+        )
+
+    @contextmanager
+    def _build_lock(self) -> Iterator[bool]:
+        """
+        Hold the build lock for the enclosed block if no other build does.
+
+        Yields:
+            bool: True if the lock was taken, False if a build is already running
+        """
+        with open(self._lock_path, "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def building(self) -> bool:
+        """
+        Check whether a build is running right now.
+
+        Returns:
+            bool: True while another process holds the build lock
+        """
+        with self._build_lock() as locked:
+            return not locked
+
+    def _remove_source(self, path: str) -> None:
+        """
+        Forget everything indexed from one source (caller handles the transaction).
+
+        Args:
+            path: Man page or binary path
+        """
+        self._db.execute("DELETE FROM summaries WHERE source = ?", (path,))
+        self._db.execute("DELETE FROM options WHERE source = ?", (path,))
+        self._db.execute("DELETE FROM commands WHERE source = ?", (path,))
+        self._db.execute("DELETE FROM sources WHERE path = ?", (path,))
+
+    def _add_source(self, path: str, mtime: int, entry: Dict) -> None:
+        """
+        Index one parsed man page or --help output (caller handles the transaction).
+
+        Args:
+            path: Man page or binary path
+            mtime: Modification time of the source in nanoseconds
+            entry: Result of parse_man_page or parse_help
+        """
+        name = entry["names"][0]
+        self._db.executemany(
+            "INSERT OR IGNORE INTO commands (name, summary, synopsis, source) VALUES (?, ?, ?, ?)",
+            [(alias, entry["summary"], entry["synopsis"], path) for alias in entry["names"]]
+        )
+        self._db.execute("INSERT INTO summaries (text, name, source) VALUES (?, ?, ?)",
+                         (f"{', '.join(entry['names'])} - {entry['summary']}", name, path))
+        self._db.executemany(
+            "INSERT INTO options (name, text, source) VALUES (?, ?, ?)",
+            [(name, f"{flags}  {description}", path) for flags, description in entry["options"]]
+        )
+        self._db.execute("INSERT OR REPLACE INTO sources (path, mtime, command) VALUES (?, ?, ?)",
+                         (path, mtime, name))
+
+    def _man_pages(self, man_paths: Sequence[str]) -> Iterator[Tuple[str, int]]:
+        """
+        List the installed man pages of the command sections.
+
+        Args:
+            man_paths: Man page directories
+
+        Yields:
+            Tuple[str, int]: Path and modification time in nanoseconds
+        """
+        for man_path in man_paths:
+            for section in MAN_SECTIONS:
+                try:
+                    entries = list(os.scandir(os.path.join(man_path, section)))
+                except OSError:
+                    continue
+                for entry in entries:
+                    if entry.is_file() and not entry.name.endswith((".bz2", ".xz", ".zst")):
+                        yield entry.path, entry.stat().st_mtime_ns
+
+    def build(self, man_paths: Optional[Sequence[str]] = None,
+              help_commands: Optional[Sequence[str]] = None, batch: int = 200,
+              out=sys.stdout) -> Optional[int]:
+        """
+        Index new and changed sources and drop removed ones.
+
+        Work is committed every `batch` sources, so an interrupted build
+        keeps its progress and the next one continues from there.
+
+        Args:
+            man_paths: Man page directories (defaults to MANPATH or MAN_PATHS)
+            help_commands: Commands whose --help output may be indexed (defaults to HELP_COMMANDS)
+            batch: Sources indexed per transaction
+            out: Stream for progress messages
+
+        Returns:
+            Optional[int]: Number of sources (re)indexed, None if another build is running
+        """
+        # Only a build reads pages and runs --help, lookups don't pay for these imports
+        import gzip
+        import shutil
+        import subprocess
+
+        if man_paths is None:
+            man_paths = [path for path in os.environ.get("MANPATH", "").split(":") if path] or MAN_PATHS
+        help_commands = HELP_COMMANDS if help_commands is None else help_commands
+
+        with self._build_lock() as locked:
+            if not locked:
+                return None
+            start = time.perf_counter()
+            known = dict(self._db.execute("SELECT path, mtime FROM sources"))
+            seen = set()
+            indexed = 0
+            pending = 0
+
+            def add(path: str, mtime: int, entry: Optional[Dict]) -> None:
+                nonlocal indexed, pending
+                if path in known:
+                    self._remove_source(path)
+                if entry is not None and entry["names"]:
+                    self._add_source(path, mtime, entry)
+                else:
+                    # Remember unusable sources too, so they aren't read again
+                    self._db.execute("INSERT OR REPLACE INTO sources (path, mtime, command) VALUES (?, ?, '')",
+                                     (path, mtime))
+                indexed += 1
+                pending += 1
+                if pending >= batch:
+                    self._db.commit()
+                    pending = 0
+                    print(f"Indexed {indexed} sources...", file=out, flush=True)
+
+            for path, mtime in self._man_pages(man_paths):
+                seen.add(path)
+                if known.get(path) == mtime:
+                    continue
+                try:
+                    opener = gzip.open if path.endswith(".gz") else open
+                    with opener(path, "rt", encoding="utf-8", errors="replace") as file:
+                        text = file.read(1_000_000)
+                except (OSError, EOFError):
+                    continue
+                # ".so" pages only point to another page, whose NAME lists this command too
+                add(path, mtime, None if text.startswith(".so ") else parse_man_page(text))
+
+            documented = {name for (name,) in self._db.execute("SELECT name FROM commands")}
+            for command in help_commands:
+                binary = shutil.which(command)
+                if binary is None or command in documented:
+                    continue
+                mtime = os.stat(binary).st_mtime_ns
+                seen.add(binary)
+                if known.get(binary) == mtime:
+                    continue
+                try:
+                    # No pager may wait for a terminal, and usage lines name the command, not its path
+                    result = subprocess.run(
+                        [command, "--help"], executable=binary, stdin=subprocess.DEVNULL, capture_output=True,
+                        text=True, errors="replace", timeout=5,
+                        env=dict(os.environ, LC_ALL="C", PAGER="cat", MANPAGER="cat", GIT_PAGER="cat",
+                                 SYSTEMD_PAGER="cat")
+                    )
+                except (OSError, subprocess.SubprocessError):
+                    continue
+                add(binary, mtime, parse_help(command, (result.stdout or result.stderr)[:65536]))
+
+            for path in set(known) - seen:
+                self._remove_source(path)
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('built', ?)", (str(int(time.time())),))
+            self._db.commit()
+            print(f"Indexed {indexed} new or changed sources in {time.perf_counter() - start:.1f}s.", file=out)
+            return indexed
+
+    def stats(self) -> Dict[str, Union[int, float, None]]:
+        """
+        Describe the knowledge base.
+
+        Returns:
+            Dict: Number of commands, indexed options and sources, file size in bytes
+                and time of the last completed build (None if never built)
+        """
+        built = self._db.execute("SELECT value FROM meta WHERE key = 'built'").fetchone()
+        return {
+            "commands": self._db.execute("SELECT COUNT(*) FROM commands").fetchone()[0],
+            "options": self._db.execute("SELECT COUNT(*) FROM options").fetchone()[0],
+            "sources": self._db.execute("SELECT COUNT(*) FROM sources").fetchone()[0],
+            "size": self.path.stat().st_size if self.path.exists() else 0,
+            "built": int(built[0]) if built else None
+        }
+
+    def find(self, question: str, threshold: float = 0.8, candidates: int = 30) -> Optional[MatchType]:
+        """
+        Answer a question from the documentation if it clearly matches one command.
+
+        The confidence is the share of the question's words (or their
+        synonyms) found in a command's whatis line, plus OPTION_WEIGHT per
+        word only found in its best matching option. Between equally confident commands, one named in the
+        question wins, then well-known tools, then the better bm25 rank.
+        Questions of a single word only match a command name.
+
+        Args:
+            question: Question text
+            threshold: Minimum confidence (0 to 1) of an answer
+            candidates: Number of best whatis matches whose options are scored
+
+        Returns:
+            Optional[MatchType]: command, answer, source and confidence, None below threshold
+        """
+        groups = tokenize_question(question)
+        if not groups:
+            return None
+        words = {group[0].strip('"') for group in groups}
+        if len(groups) == 1 and self._db.execute("SELECT 1 FROM commands WHERE name = ?", tuple(words)).fetchone() is None:
+            return None
+
+        expressions = [f"({' OR '.join(group)})" for group in groups]
+        try:
+            # The whatis lines are few, so every question word is looked up in all of them
+            ranked = self._db.execute(
+                "SELECT rowid, name, bm25(summaries) FROM summaries WHERE summaries MATCH ?",
+                (" OR ".join(expressions),)
+            ).fetchall()
+            if not ranked:
+                return None
+            summary_terms: Dict[int, set] = {rowid: set() for rowid, _, _ in ranked}
+            for index, expression in enumerate(expressions):
+                for (rowid,) in self._db.execute("SELECT rowid FROM summaries WHERE summaries MATCH ?", (expression,)):
+                    summary_terms[rowid].add(index)
+
+            def prior(row: Tuple[int, str, float]) -> Tuple[int, bool, bool, float]:
+                rowid, name, rank = row
+                return len(summary_terms[rowid]), name in words, name in HELP_COMMANDS, -rank
+
+            ranked.sort(key=prior, reverse=True)
+            ranked = ranked[:candidates]
+
+            # Options only count for the candidate commands, the column filter keeps this cheap
+            names = {name for _, name, _ in ranked}
+            name_filter = "name : (" + " OR ".join(f'"{name}"' for name in names) + ")"
+            option_terms: Dict[int, Tuple[str, set]] = {}
+            for index, expression in enumerate(expressions):
+                for rowid, name in self._db.execute(
+                        "SELECT rowid, name FROM options WHERE options MATCH ?", (f"{name_filter} AND {expression}",)):
+                    if name in names:
+                        option_terms.setdefault(rowid, (name, set()))[1].add(index)
+        except sqlite3.OperationalError:
+            return None
+
+        best_options: Dict[str, List[Tuple[int, set]]] = {}
+        for rowid, (name, terms) in option_terms.items():
+            best_options.setdefault(name, []).append((rowid, terms))
+
+        best: Optional[Tuple[Tuple[float, bool, bool, int, float], str, Optional[int]]] = None
+        for row in ranked:
+            rowid, name, rank = row
+            covered = summary_terms[rowid]
+            option_id, extra = max(
+                ((option_id, terms - covered) for option_id, terms in best_options.get(name, [])),
+                key=lambda option: (len(option[1]), -option[0]), default=(None, set())
+            )
+            if not extra:
+                option_id = None
+            count, named, common, score = prior(row)
+            key = ((len(covered) + OPTION_WEIGHT * len(extra)) / len(groups), named, common, count, score)
+            if best is None or key > best[0]:
+                best = (key, name, option_id)
+        if best is None or best[0][0] < threshold:
+            return None
+
+        key, name, option_id = best
+        summary, synopsis, source = self._db.execute(
+            "SELECT summary, synopsis, source FROM commands WHERE name = ?", (name,)
+        ).fetchone()
+        lines = [f"{name} - {summary}"]
+        if synopsis:
+            lines.append(f"  Usage: {synopsis}")
+        if option_id is not None:
+            lines.append("  " + self._db.execute("SELECT text FROM options WHERE rowid = ?", (option_id,)).fetchone()[0])
+        kind = "man page" if Path(source).parent.name in MAN_SECTIONS else "--help output"
+        return {"command": name, "answer": "\n".join(lines), "source": f"{name} {kind}",
+                "score": round(key[0], 3)}
+
+    def close(self) -> None:
+        """
+        Close the underlying database connection.
+        """
+        self._db.close()
+
+
+def _open(action: str) -> Optional[KnowledgeBase]:
+    """
+    Open (and create if needed) the knowledge base for a CLI command.
+
+    Args:
+        action: What failed, for the message, e.g. "create" or "open"
+
+    Returns:
+        Optional[KnowledgeBase]: The knowledge base, None (after printing why) when SQLite can't hold it
+    """
+    try:
+        return KnowledgeBase()
+    except sqlite3.OperationalError as error:
+        # SQLite builds without FTS5 can't hold the index
+        print(f"Cannot {action} the knowledge base: {error}")
+        return None
+
+
+def start_build() -> int:
+    """
+    Build the knowledge base in a background process.
+
+    Returns:
+        int: Exit code for the CLI
+    """
+    knowledge = _open("create")
+    if knowledge is None:
+        return 1
+    try:
+        if knowledge.building():
+            print("The knowledge base is already being built. Check progress with: bsho --kb status")
+            return 0
+    finally:
+        knowledge.close()
+
+    import subprocess
+
+    log_path = BASHO_HOME / "knowledge.log"
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "build"],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True
+        )
+    print(f"Building the knowledge base in the background (pid {process.pid}, log: {log_path}).")
+    print("Check progress with: bsho --kb status")
+    return 0
+
+
+def show_status() -> int:
+    """
+    Print the size and state of the knowledge base.
+
+    Returns:
+        int: Exit code for the CLI
+    """
+    # A build creates the file before it starts, so without it there is nothing to show
+    if not KNOWLEDGE_FILE.exists():
+        print("The knowledge base has not been built yet. Build it with: bsho --kb build")
+        return 0
+    knowledge = _open("open")
+    if knowledge is None:
+        return 1
+    try:
+        stats = knowledge.stats()
+        building = knowledge.building()
+    finally:
+        knowledge.close()
+    if stats["built"] is None and not building:
+        print("The knowledge base has not been built yet. Build it with: bsho --kb build")
+        return 0
+    print(f"Commands:      {stats['commands']}")
+    print(f"Options:       {stats['options']}")
+    print(f"Sources:       {stats['sources']} man pages and --help outputs")
+    print(f"Size on disk:  {stats['size'] / 1_000_000:.1f} MB")
+    if stats["built"] is not None:
+        print(f"Last build:    {time.strftime('%Y-%m-%d %H:%M', time.localtime(stats['built']))}")
+    if building:
+        print("A build is running right now.")
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "build":
+        from basho_config import default_config, load_config
+        settings = (load_config() or default_config())["knowledge"]
+        result = KnowledgeBase().build(settings["man_paths"] or None,
+                                       HELP_COMMANDS + tuple(settings["help_commands"]))
+        if result is None:
+            print("The knowledge base is already being built.")
@@ -0,0 +1,172 @@
+import re
+from collections import deque
+from typing import Any, BinaryIO, Deque, Dict, List, Optional, Tuple
+
+from basho_config import DEFAULTS
+
+# Lines worth keeping from anywhere in the input
+ERROR_PATTERN = re.compile(
+    rb"error|fail|fatal|panic|exception|traceback|denied|refused|timed? ?out|unable to|cannot|"
+    rb"segfault|killed|critical|\bE[A-Z]{3,}\b|warn",
+    re.IGNORECASE
+)
+
+# Timestamps, counters and PIDs differ between otherwise identical lines. Dropping
+# digits with bytes.translate is several times faster than a regex substitution.
+DIGITS = b"0123456789"
+
+# Distinct lines remembered for deduplication, bounds memory on huge inputs
+MAX_TRACKED = 200_000
+
+LineType = Tuple[int, bytes, bytes]
+
+
+class LogDigest:
+    """
+    Reduce command output to a compact excerpt in one pass and bounded memory.
+
+    Lines that only differ in digits (timestamps, PIDs, counters) are
+    counted as repeats of the first one. Of the distinct lines, the first
+    head_lines, the last tail_lines and up to error_lines lines that look
+    like errors are kept; everything else is only counted.
+
+    Attributes:
+        settings: Digest settings (the "input" config block)
+        lines: Number of lines read
+        bytes: Number of bytes read
+        distinct: Number of distinct lines
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Initialize an empty digest.
+
+        Args:
+            settings: Overrides for the default "input" block
+        """
+        self.settings = dict(DEFAULTS["input"], **(settings or {}))
+        self.lines = 0
+        self.bytes = 0
+        self.distinct = 0
+        self._counts: Dict[int, int] = {}
+        self._head: List[LineType] = []
+        self._tail: Deque[LineType] = deque(maxlen=self.settings["tail_lines"])
+        self._first_errors: List[LineType] = []
+        self._last_errors: Deque[LineType] = deque(maxlen=max(self.settings["error_lines"] // 2, 1))
+
+    def feed(self, line: bytes) -> None:
+        """
+        Add one line of input.
+
+        Args:
+            line: Raw line, with or without its newline
+        """
+        self.lines += 1
+        self.bytes += len(line)
+        line = line[:self.settings["max_line_chars"]].rstrip()
+        if not line:
+            return
+
+        key = hash(line.translate(None, DIGITS))
+        count = self._counts.get(key)
+        if count is not None:
+            self._counts[key] = count + 1
+            return
+        if len(self._counts) < MAX_TRACKED:
+            self._counts[key] = 1
+        self.distinct += 1
+
+        entry = (self.lines, line, key)
+        if len(self._head) < self.settings["head_lines"]:
+            self._head.append(entry)
+            return
+        if ERROR_PATTERN.search(line):
+            if len(self._first_errors) < self.settings["error_lines"] - self._last_errors.maxlen:
+                self._first_errors.append(entry)
+            else:
+                self._last_errors.append(entry)
+        self._tail.append(entry)
+
+    def feed_stream(self, stream: BinaryIO) -> "LogDigest":
+        """
+        Read a binary stream to its end, line by line.
+
+        Args:
+            stream: Stream to read, e.g. sys.stdin.buffer
+
+        Returns:
+            LogDigest: self, for chaining
+        """
+        for line in stream:
+            self.feed(line)
+        return self
+
+    def _format(self, entry: LineType) -> str:
+        """
+        Turn a kept line into text, noting how often it was repeated.
+
+        Args:
+            entry: Line number, raw line and dedupe key
+
+        Returns:
+            str: Printable line
+        """
+        _, line, key = entry
+        text = line.decode("utf-8", "replace")
+        repeats = self._counts.get(key, 1)
+        return f"{text}  [x{repeats}]" if repeats > 1 else text
+
+    def render(self, budget_chars: int) -> str:
+        """
+        Build the excerpt, at most budget_chars long.
+
+        When not everything kept fits, the lines are taken in order of
+        usefulness: the very first lines, the very last lines, error lines
+        (first and last ones alternating), then the remaining tail and head.
+        The chosen lines are shown in input order with the gaps marked.
+
+        Args:
+            budget_chars: Maximum length of the excerpt
+
+        Returns:
+            str: Excerpt of the input
+        """
+        head, tail = self._head, list(self._tail)
+        first_errors, last_errors = self._first_errors, list(self._last_errors)
+        errors: List[LineType] = []
+        for i in range(max(len(first_errors), len(last_errors))):
+            errors += first_errors[i:i + 1] + last_errors[-1 - i:len(last_errors) - i]
+        priority = head[:5] + tail[-10:][::-1] + errors + tail[:-10][::-1] + head[5:]
+
+        chosen: Dict[int, str] = {}
+        used = 0
+        for entry in priority:
+            if entry[0] in chosen:
+                continue
+            text = self._format(entry)
+            if used + len(text) + 1 > budget_chars:
+                continue
+            chosen[entry[0]] = text
+            used += len(text) + 1
+
+        parts = []
+        previous = 0
+        for number in sorted(chosen):
+            if number > previous + 1:
+                parts.append(f"... [{number - previous - 1} lines skipped] ...")
+            parts.append(chosen[number])
+            previous = number
+        if self.lines > previous:
+            parts.append(f"... [{self.lines - previous} lines skipped] ...")
+        return "\n".join(parts)
+
+    def describe(self) -> str:
+        """
+        Summarize the input size for the prompt.
+
+        Returns:
+            str: e.g. "120431 lines (14.2 MB), 2311 distinct"
+        """
+        size = f"{self.bytes / 1_000_000:.1f} MB" if self.bytes >= 100_000 else f"{self.bytes} bytes"
+        return f"{self.lines} lines ({size}), {self.distinct} distinct"
+
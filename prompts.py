@@ -0,0 +1,173 @@
+import sys
+from string import Template
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+
+# Every prompt BASHō sends, as string.Template text. The "prompts" block of
+# config.json replaces any of them by name, e.g.
+#   "prompts": {"quick": "Answer in one short sentence: $question"}
+DEFAULT_PROMPTS: Dict[str, str] = {
+    "quick": "You are a Linux terminal assistant called BASHō. Your responses should be very concise and directly answer the user's question. One or two sentences maximum. Only provide Linux command examples or explanations when specifically asked. Don't list commands unless requested. Try to make the responses as short as possible. Answer: $question",
+    "chat": "You are a Linux terminal assistant called BASHō. Your responses should be concise and directly answer the user's question. Only provide Linux command examples or explanations when specifically asked. Don't list commands unless requested. Try to make the responses short. Treat this as a system prompt and respond naturally to: \n$history\nCurrent query: $question",
+    "history": "Previous conversation:\n$context",
+    "continue": "You are a Linux terminal assistant called BASHō. Your responses should be concise and directly answer the user's question. Only provide Linux command examples or explanations when specifically asked. Don't list commands unless requested. Try to make the responses short. \nThis is a continuation of our previous conversation. Here are our previous exchanges:\n$context\nNow we're continuing from where we left off. Please respond to: $question",
+    "summary": "Summarize the following conversation between a user and BASHō, a Linux terminal assistant, in at most 80 words. Keep commands, file names and decisions. Reply with the summary only.\n\n$conversation",
+    "explain": "You are a Linux terminal assistant called BASHō. Explain what the following shell command does in at most three short sentences, and warn if it can delete data or change the system. Command: $command",
+    "suggest": "You are a Linux terminal assistant called BASHō. Reply with exactly one shell command for bash and nothing else: no explanation, no markdown, no backticks. The command should do the following, or complete this partial command: $command",
+    "piped": "Input piped to bsho ($description, excerpt):\n$excerpt"
+}
+
+# Placeholders each prompt must use, and the only ones it may use
+FIELDS: Dict[str, Tuple[str, ...]] = {
+    "quick": ("question",),
+    "chat": ("history", "question"),
+    "history": ("context",),
+    "continue": ("context", "question"),
+    "summary": ("conversation",),
+    "explain": ("command",),
+    "suggest": ("command",),
+    "piped": ("description", "excerpt")
+}
+
+# Compiled prompts by (name, template text), so each is parsed once per process
+_compiled: Dict[Tuple[str, str], "PromptTemplate"] = {}
+
+# Invalid overrides already reported by this process
+_reported: Set[Tuple[str, str]] = set()
+
+
+class PromptTemplate:
+    """
+    A prompt parsed once into literal text and placeholder slots.
+
+    Rendering fills the slots of a copy of the parts list and joins it,
+    so no template is parsed or scanned again per request.
+
+    Attributes:
+        name: Name of the prompt in the registry
+        text: Template text
+    """
+
+    def __init__(self, name: str, text: str) -> None:
+        """
+        Parse and validate a template.
+
+        Args:
+            name: Name of the prompt, decides the allowed placeholders
+            text: Template text using $name or ${name} placeholders ($$ for a dollar sign)
+
+        Raises:
+            ValueError: When the text has a malformed, unknown or missing placeholder
+        """
+        self.name = name
+        self.text = text
+        allowed = FIELDS[name]
+        self._parts: List[str] = []
+        self._slots: List[Tuple[int, str]] = []
+
+        literal: List[str] = []
+        position = 0
+        for match in Template.pattern.finditer(text):
+            literal.append(text[position:match.start()])
+            position = match.end()
+            if match.group("escaped") is not None:
+                literal.append("$")
+                continue
+            field = match.group("named") or match.group("braced")
+            if field is None:
+                raise ValueError(f"malformed placeholder at position {match.start('invalid')}")
+            if field not in allowed:
+                raise ValueError(f"unknown placeholder ${field}, use {', '.join('$' + f for f in allowed)}")
+            self._parts.append("".join(literal))
+            literal = []
+            self._slots.append((len(self._parts), field))
+            self._parts.append("")
+        literal.append(text[position:])
+        self._parts.append("".join(literal))
+
+        missing = set(allowed) - {field for _, field in self._slots}
+        if missing:
+            raise ValueError(f"missing placeholder {', '.join('$' + field for field in sorted(missing))}")
+
+    def render(self, **values: str) -> str:
+        """
+        Fill in the placeholders.
+
+        Args:
+            **values: Text for every placeholder of the prompt
+
+        Returns:
+            str: Prompt text
+        """
+        parts = self._parts.copy()
+        for index, field in self._slots:
+            parts[index] = values[field]
+        return "".join(parts)
+
+
+def compile_prompt(name: str, text: object) -> PromptTemplate:
+    """
+    Get a compiled prompt, parsing its text only the first time.
+
+    Args:
+        name: Name of the prompt, decides the allowed placeholders
+        text: Template text
+
+    Returns:
+        PromptTemplate: Compiled prompt
+
+    Raises:
+        ValueError: When the text is not a valid template for the prompt
+    """
+    if not isinstance(text, str):
+        raise ValueError("the prompt must be a string")
+    template = _compiled.get((name, text))
+    if template is None:
+        template = _compiled[(name, text)] = PromptTemplate(name, text)
+    return template
+
+
+def check_prompts(overrides: Optional[Mapping[str, object]]) -> List[str]:
+    """
+    Validate every override of the "prompts" config block, e.g. after editing config.json.
+
+    Args:
+        overrides: The "prompts" block of the config
+
+    Returns:
+        List[str]: One message per unknown or invalid prompt
+    """
+    problems = []
+    for name, text in (overrides or {}).items():
+        if name not in DEFAULT_PROMPTS:
+            problems.append(f"Unknown prompt '{name}' in config.json (known: {', '.join(DEFAULT_PROMPTS)})")
+            continue
+        try:
+            compile_prompt(name, text)
+        except ValueError as error:
+            problems.append(f"Invalid prompt '{name}' in config.json ({error})")
+    return problems
+
+
+def get_prompt(config: Mapping, name: str) -> PromptTemplate:
+    """
+    Get one compiled prompt for a configuration.
+
+    Only the requested prompt is validated. An invalid override is
+    reported on stderr (once per process) and the default is used instead.
+
+    Args:
+        config: Configuration with an optional "prompts" block
+        name: Name of the prompt, e.g. "quick"
+
+    Returns:
+        PromptTemplate: The configured prompt
+    """
+    text = (config.get("prompts") or {}).get(name)
+    if text is not None:
+        try:
+            return compile_prompt(name, text)
+        except ValueError as error:
+            if (name, repr(text)) not in _reported:
+                _reported.add((name, repr(text)))
+                print(f"Invalid prompt '{name}' in config.json ({error}), using the default", file=sys.stderr)
+    return compile_prompt(name, DEFAULT_PROMPTS[name])
@@ -1,118 +1,21 @@
 #!/usr/bin/env python3
 
+import timings
 import sys
-import json
-import subprocess
+import time
 from pathlib import Path
-from typing import Dict, List, Optional, Union
-from duckduckgo_search import DDGS
-from conversation_history import ConversationHandler
+from typing import Dict, Iterator, List, Optional, Union
+from basho_config import (BASHO_HOME, CONFIG, MODELS, ConfigType, SearchSettings, default_config,
+                          get_model, load_config, save_config)
 
-# Version number for -h flag
-VERSION = "1.1.3"
+# duckduckgo_search (and its HTTP stack), the answer cache and the streaming
+# helpers are imported inside the functions that need them, so cheap paths
+# like -h, -m and -dev don't pay for them at startup.
 
-CONFIG = Path(__file__).parent / "config.json"
-MODELS: Dict[str, str] = {
-    "1": "gpt-4o-mini",
-    "2": "llama-3.3-70b",
-    "3": "claude-3-haiku",
-    "4": "o3-mini",
-    "5": "mixtral-8x7b"
-}
+timings.record("import", timings.elapsed())
 
-def load_config() -> Optional[Dict[str, any]]:
-    """
-    Load configuration from JSON file.
-    
-    Returns:
-        Optional[Dict[str, any]]: Configuration dict if valid, None otherwise
-    """
-    if CONFIG.exists():
-        try:
-            with CONFIG.open("r") as file:
-                config = json.load(file)
-                # Ensure basic structure exists
-                if not "search" in config:
-                    config["search"] = {}
-                if not "video" in config["search"]:
-                    config["search"]["video"] = {
-                        "max_results": 3,
-                        "region": "wt-wt",
-                        "safesearch": "moderate"
-                    }
-                if not "text" in config["search"]:
-                    config["search"]["text"] = {
-                        "max_results": 5,
-                        "region": "wt-wt",
-                        "safesearch": "moderate"
-                    }
-                if not "news" in config["search"]:
-                    config["search"]["news"] = {
-                        "max_results": 3,
-                        "region": "wt-wt",
-                        "safesearch": "moderate"
-                    }
-                if not "max_conversations" in config:
-                    config["max_conversations"] = 5
-                
-                if not "editor" in config:
-                    config["editor"] = "nano"
-                
-                # Verify model is valid
-                if config.get("model") in MODELS.values():
-                    return config
-                
-        except (json.JSONDecodeError, KeyError):
-            pass
-    return None
-
-
-
-
-def save_config(model: str, config: Optional[Dict] = None) -> None:
-    """
-    Save model configuration to JSON file.
-    
-    Args:
-        model: Name of the model to save
-        config: Existing config to update (optional)
-    """
-    CONFIG.parent.mkdir(parents=True, exist_ok=True)
-    
-    if config is None:
-        config = {"model": model}
-    else:
-        config["model"] = model
-        
-    # Ensure basic structure exists
-    if not "search" in config:
-        config["search"] = {}
-    if not "video" in config["search"]:
-        config["search"]["video"] = {
-            "max_results": 3,
-            "region": "wt-wt",
-            "safesearch": "moderate"
-        }
-    if not "text" in config["search"]:
-        config["search"]["text"] = {
-            "max_results": 5,
-            "region": "wt-wt",
-            "safesearch": "moderate"
-        }
-    if not "news" in config["search"]:
-        config["search"]["news"] = {
-            "max_results": 3,
-            "region": "wt-wt",
-            "safesearch": "moderate"
-        }
-    if not "max_conversations" in config:
-        config["max_conversations"] = 5
-
-    if not "editor" in config:
-        config["editor"] = "nano"
-    
-    with CONFIG.open("w") as file:
-        json.dump(config, file, indent=2)
+# Version number for -h flag
+VERSION = "1.1.3"
 
 def edit_config() -> None:
     """
@@ -126,9 +29,14 @@ def edit_config() -> None:
     
     editor = config.get("editor", "nano")
     
+    import subprocess
     try:
         subprocess.run([editor, str(CONFIG)])
         print(f"Configuration updated.")
+        # Prompts are otherwise only checked when they are used
+        from prompts import check_prompts
+        for problem in check_prompts((load_config() or {}).get("prompts")):
+            print(problem)
     except Exception as e:
         print(f"Error opening editor: {e}")
         print(f"You can manually edit the config file at: {CONFIG}")
@@ -140,40 +48,50 @@ def set_max_conversations(max_convos: int) -> None:
     Args:
         max_convos: Maximum number of conversations (0 for no storage)
     """
-    config = load_config() or {}
+    config = load_config() or default_config()
     config["max_conversations"] = max_convos
-    save_config(config.get("model", MODELS["1"]), config)
+    save_config(config["model"], config)
     print(f"Maximum conversations set to: {max_convos}")
     
     if max_convos == 0:
-        conv_dir = Path(__file__).parent / "conversations"
-        if conv_dir.exists():
-            for file in conv_dir.glob("convo_*.json"):
-                file.unlink()
-            conv_dir.rmdir()
+        from conversation_history import ConversationHandler
+        ConversationHandler(max_conversations=0).delete_all()
+        if (BASHO_HOME / "similar.db").exists():
+            # Deleted exchanges must not be found as similar questions either
+            from similarity import SimilarityIndex
+            SimilarityIndex().remove_history()
 
-def get_model() -> str:
-    """
-    Get the model choice from config or user input.
-    
-    Returns:
-        str: Selected model name
-    """
-    config = load_config()
+_client = None
+# The "backend" and "rate_limit" blocks _client was created from
+_client_settings = None
 
-    if config:
-        return config["model"]
+def get_client(new_chat: bool = False):
+    """
+    Get the process-wide chat and search client, creating it on first use
+    from the backends selected in config.json.
+    Reusing one client keeps its HTTP connection warm across requests,
+    which matters for the resident daemon. The client is created again
+    when the backend settings in config.json change.
 
-    print("Choose a model: ")
-    for key, model in MODELS.items():
-        print(f"{key}: {model}")
+    Args:
+        new_chat: Drop the chat history kept by the client so the next
+            chat starts a fresh conversation
 
-    while True:
-        choice = input("Enter number: ").strip()
-        if choice in MODELS:
-            save_config(MODELS[choice])
-            return MODELS[choice]
-        print("Invalid choice, try again.")
+    Returns:
+        Shared client instance (see backends.create_client)
+    """
+    global _client, _client_settings
+    config = load_config() or default_config()
+    settings = (config["backend"], config["rate_limit"])
+    if _client is None or settings != _client_settings:
+        import copy
+        from backends import create_client
+        _client = create_client(config)
+        _client_settings = copy.deepcopy(settings)
+    elif new_chat:
+        from streaming import reset_chat
+        reset_chat(_client)
+    return _client
 
 def format_video_result(video: dict) -> str:
     """
@@ -226,124 +144,409 @@ def format_news_result(text: dict) -> str:
         f"Source: {text['source']}\n"
     )
 
-def search_text(query: str) -> None:
+SEARCH_VERTICALS: Dict[str, Dict[str, any]] = {
+    "text": {
+        "method": "text",
+        "heading": "Text Results",
+        "label": "Result",
+        "empty": "No text found.",
+        "key": "href",
+        "formatter": format_text_result
+    },
+    "news": {
+        "method": "news",
+        "heading": "News Results",
+        "label": "News",
+        "empty": "No news found.",
+        "key": "url",
+        "formatter": format_news_result
+    },
+    "video": {
+        "method": "videos",
+        "heading": "Video Results",
+        "label": "Video",
+        "empty": "No videos found.",
+        "key": "content",
+        "formatter": format_video_result
+    }
+}
+
+def get_search_settings(config: ConfigType, vertical: str) -> SearchSettings:
     """
-    Search for text and show results according to config.
+    Get search settings for a vertical.
 
     Args:
+        config: Loaded configuration (defaults already applied)
+        vertical: One of "text", "news" or "video"
+
+    Returns:
+        SearchSettings: max_results, region and safesearch for the vertical
+    """
+    return config["search"][vertical]
+
+def fetch_results(ddgs, vertical: str, query: str, settings: SearchSettings) -> List[dict]:
+    """
+    Run a single search vertical.
+
+    Args:
+        ddgs: Client to search with
+        vertical: One of "text", "news" or "video"
         query: Search query string
+        settings: max_results, region and safesearch for the vertical
+
+    Returns:
+        List[dict]: Raw search results
     """
-    config = load_config() or {"search": {}}
-    
-    # Set defaults if text configuration doesn't exist
-    if not "text" in config["search"]:
-        config["search"]["text"] = {
-            "max_results": 5,
-            "region": "wt-wt", 
-            "safesearch": "moderate"
-        }
-        save_config(config.get("model", MODELS["1"]), config)
-    
-    max_results = config["search"]["text"].get("max_results", 5)
-    region = config["search"]["text"].get("region", "wt-wt")
-    safesearch = config["search"]["text"].get("safesearch", "moderate")
-    
-    try:
-        with DDGS() as ddgs:
-            results = ddgs.text(
-                keywords=query,
-                region=region,
-                safesearch=safesearch,
-                max_results=max_results
-            )
-            if not results:
-                print("No text found.")
-                return
-            
-            print(f"\nTop {max_results} Text Results:")
-            print("=" * 50)
-            for i, text in enumerate(results, 1):
-                print(f"\n[Result {i}]")
-                print(format_text_result(text))
-                
-    except Exception as error:
-        print("Error searching text:", error)
+    search = getattr(ddgs, SEARCH_VERTICALS[vertical]["method"])
+    with timings.phase(f"search.{vertical}"):
+        return search(
+            keywords=query,
+            region=settings["region"],
+            safesearch=settings["safesearch"],
+            max_results=settings["max_results"]
+        ) or []
 
-def search_videos(query: str) -> None:
+_search_cache = None
+
+def get_search_cache():
     """
-    Search for videos and show top results according to config.
+    Get the process-wide search result cache, opening it on first use.
+
+    Returns:
+        SearchCache: Shared cache instance
+    """
+    global _search_cache
+    if _search_cache is None:
+        from backends import cache_scope
+        from search_cache import SearchCache
+        _search_cache = SearchCache(scope=cache_scope(load_config() or default_config(), "search"))
+    return _search_cache
+
+def refresh_results(ddgs, vertical: str, query: str, settings: SearchSettings) -> None:
+    """
+    Fetch a vertical again and store the fresh results, ignoring failures.
+    Used to revalidate stale results in the background.
 
     Args:
+        ddgs: Client to search with
+        vertical: One of "text", "news" or "video"
         query: Search query string
+        settings: Search settings of the vertical
     """
-    config = load_config() or {"search": {"video": {"max_results": 3, "region": "wt-wt", "safesearch": "moderate"}}}
-    max_results = config["search"].get("video", {}).get("max_results", 3)
-    region = config["search"].get("video", {}).get("region", "wt-wt")
-    safesearch = config["search"].get("video", {}).get("safesearch", "moderate")
-    
     try:
-        with DDGS() as ddgs:
-            results = ddgs.videos(
-                keywords=query,
-                region=region,
-                safesearch=safesearch,
-                max_results=max_results
-            )
-            if not results:
-                print("No videos found.")
-                return
+        get_search_cache().put(vertical, query, settings, fetch_results(ddgs, vertical, query, settings))
+    except Exception:
+        pass
 
-            print(f"\nTop {max_results} Video Results:")
-            print("=" * 50)
-            for i, video in enumerate(results, 1):
-                print(f"\n[Video {i}]")
-                print(format_video_result(video))
+def get_results(ddgs, vertical: str, query: str, settings: SearchSettings,
+                use_cache: bool = True) -> List[dict]:
+    """
+    Run a search vertical through the local result cache.
 
-    except Exception as error:
-        print("Error searching videos:", error)
+    Results younger than the vertical's ttl are served from disk. Older
+    ones are fetched again, unless stale_while_revalidate is set: then the
+    stale results are returned right away and refreshed in a background
+    thread for the next search.
+
+    Args:
+        ddgs: Client to search with
+        vertical: One of "text", "news" or "video"
+        query: Search query string
+        settings: Search settings of the vertical
+        use_cache: Whether to use the local result cache
 
-def search_news(query: str) -> None:
+    Returns:
+        List[dict]: Raw search results
+    """
+    if not use_cache or settings.get("ttl", 0) <= 0:
+        return fetch_results(ddgs, vertical, query, settings)
+
+    cache = get_search_cache()
+    cached = cache.get(vertical, query, settings)
+    if cached is not None:
+        results, age = cached
+        if age <= settings["ttl"]:
+            return results
+        if settings.get("stale_while_revalidate", False):
+            import threading
+            # Not a daemon thread, so a short-lived bsho still finishes the refresh
+            threading.Thread(target=refresh_results, args=(ddgs, vertical, query, settings)).start()
+            return results
+
+    results = fetch_results(ddgs, vertical, query, settings)
+    cache.put(vertical, query, settings, results)
+    return results
+
+def render_result(vertical: str, rank: int, result: dict) -> str:
+    """
+    Render a single search result.
+
+    Args:
+        vertical: One of "text", "news" or "video"
+        rank: Position of the result, starting at 1
+        result: Raw search result
+
+    Returns:
+        str: Formatted result
     """
-    Search for news and show top 3 results.
+    info = SEARCH_VERTICALS[vertical]
+    return f"\n[{info['label']} {rank}]\n{info['formatter'](result)}"
+
+def render_results(vertical: str, results: List[dict], max_results: int) -> str:
+    """
+    Render results of a search vertical as one printable block.
 
     Args:
+        vertical: One of "text", "news" or "video"
+        results: Raw search results
+        max_results: Number of requested results, shown in the heading
+
+    Returns:
+        str: Formatted section
+    """
+    info = SEARCH_VERTICALS[vertical]
+    if not results:
+        return info["empty"]
+
+    lines = [f"\nTop {max_results} {info['heading']}:", "=" * 50]
+    for i, result in enumerate(results, 1):
+        lines.append(render_result(vertical, i, result))
+    return "\n".join(lines)
+
+def iter_pages(ddgs, vertical: str, query: str, settings: SearchSettings, use_cache: bool = True,
+               limit: Optional[int] = None) -> Iterator[List[dict]]:
+    """
+    Fetch a search vertical one page at a time, only when the next page is asked for.
+
+    DDGS has no result offset, so a later page asks for all results up to
+    its end again and only the results not seen before are yielded. With a
+    known limit that is a single request after the first page (for the
+    whole limit), without one every page asks for page_size more results.
+    Each request goes through the result cache on its own.
+
+    Args:
+        ddgs: Client to search with
+        vertical: One of "text", "news" or "video"
         query: Search query string
+        settings: Search settings of the vertical
+        use_cache: Whether to use the local result cache
+        limit: Total number of results to fetch, None to go on until results run out
+
+    Yields:
+        List[dict]: New results of each page
     """
-    config = load_config() or {"search": {"news": {"max_results": 3, "region": "wt-wt", "safesearch": "moderate"}}}
-
-    # Set defaults if news configuration doesn't exist
-    if not "news" in config["search"]:
-        config["search"]["news"] = {
-           "max_results": 3,
-           "region": "wt-wt",
-           "safesearch": "moderate"
-        }
-        save_config(config.get("model", MODELS["1"]), config)
- 
-    max_results = config["search"]["news"].get("max_results", 3)
-    region = config["search"]["news"].get("region", "wt-wt")
-    safesearch = config["search"]["news"].get("safesearch", "moderate")
-    
+    key = SEARCH_VERTICALS[vertical]["key"]
+    page_size = max(settings.get("page_size", 10), 1)
+    seen = set()
+    wanted = 0
+    while limit is None or wanted < limit:
+        if limit is None:
+            wanted += page_size
+        else:
+            # A quick first page, then the rest of the results at once
+            wanted = min(limit if wanted else page_size, limit)
+        results = get_results(ddgs, vertical, query, dict(settings, max_results=wanted), use_cache)
+        page = []
+        for result in results:
+            if result.get(key) not in seen:
+                seen.add(result.get(key))
+                page.append(result)
+        if page:
+            yield page
+        if not page or len(results) < wanted:
+            # The search engine has nothing more for this query
+            return
+
+def exit_on_broken_pipe() -> None:
+    """
+    Exit quietly after the reader of stdout went away, as in: bsho -a --json x | head -1
+    """
+    if sys.stdout is sys.__stdout__:
+        import os
+        # Otherwise flushing stdout at exit fails once more
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    sys.exit(0)
+
+def print_json_results(vertical: str, results: Iterator[dict], start: int = 1) -> int:
+    """
+    Print search results as JSON lines, flushing each one.
+    Exits quietly when stdout is closed.
+
+    Args:
+        vertical: One of "text", "news" or "video"
+        results: Raw search results
+        start: Rank of the first result
+
+    Returns:
+        int: Rank of the next result
+    """
+    import json
+
+    rank = start
     try:
-        with DDGS() as ddgs:
-            results = ddgs.news(
-                keywords=query,
-                region=region,
-                safesearch=safesearch,
-                max_results=max_results
-            )
-            if not results:
-                print("No news found.")
-                return
+        for result in results:
+            print(json.dumps({"vertical": vertical, "rank": rank, **result}, ensure_ascii=False), flush=True)
+            rank += 1
+    except BrokenPipeError:
+        exit_on_broken_pipe()
+    return rank
 
-            print("\nTop {max_results} News Results:")
-            print("=" * 50)
-            for i, news in enumerate(results, 1):
-                print(f"\n[News {i}]")
-                print(format_news_result(news))
+def search_vertical(vertical: str, query: str, use_cache: bool = True, output: str = "text") -> None:
+    """
+    Search one vertical and print every page of results as soon as it arrives.
 
+    Args:
+        vertical: One of "text", "news" or "video"
+        query: Search query string
+        use_cache: Whether to use the local result cache
+        output: "text", "json" (one JSON line per result) or "more"
+            (fetch further pages interactively, until the user stops)
+    """
+    info = SEARCH_VERTICALS[vertical]
+    settings = get_search_settings(load_config() or default_config(), vertical)
+    interactive = output == "more" and sys.stdin.isatty() and sys.stdout.isatty()
+    limit = None if interactive else settings["max_results"]
+
+    rank = 1
+    try:
+        for page in iter_pages(get_client(), vertical, query, settings, use_cache, limit):
+            with timings.phase("render"):
+                if output == "json":
+                    rank = print_json_results(vertical, page, rank)
+                    continue
+                if rank == 1:
+                    heading = info["heading"] if interactive else f"Top {settings['max_results']} {info['heading']}"
+                    print(f"\n{heading}:\n{'=' * 50}")
+                for result in page:
+                    print(render_result(vertical, rank, result), flush=True)
+                    rank += 1
+            if interactive:
+                try:
+                    if input("-- Enter for more results, q to quit -- ").strip().lower().startswith("q"):
+                        return
+                except EOFError:
+                    print()
+                    return
+    except BrokenPipeError:
+        exit_on_broken_pipe()
     except Exception as error:
-        print("Error searching news:", error)
+        if output == "json":
+            import json
+            print(json.dumps({"vertical": vertical, "error": str(error)}), flush=True)
+        else:
+            print(f"Error searching {info['method']}:", error)
+        return
+
+    if rank == 1 and output != "json":
+        print(info["empty"])
+
+def search_text(query: str, use_cache: bool = True, output: str = "text") -> None:
+    """
+    Search for text and show results according to config.
+
+    Args:
+        query: Search query string
+        use_cache: Whether to use the local result cache
+        output: "text", "json" or "more" (see search_vertical)
+    """
+    search_vertical("text", query, use_cache, output)
+
+def search_videos(query: str, use_cache: bool = True, output: str = "text") -> None:
+    """
+    Search for videos and show top results according to config.
+
+    Args:
+        query: Search query string
+        use_cache: Whether to use the local result cache
+        output: "text", "json" or "more" (see search_vertical)
+    """
+    search_vertical("video", query, use_cache, output)
+
+def search_news(query: str, use_cache: bool = True, output: str = "text") -> None:
+    """
+    Search for news and show top results according to config.
+
+    Args:
+        query: Search query string
+        use_cache: Whether to use the local result cache
+        output: "text", "json" or "more" (see search_vertical)
+    """
+    search_vertical("news", query, use_cache, output)
+
+def search_all(query: str, use_cache: bool = True, output: str = "text") -> None:
+    """
+    Search text, news and videos concurrently over one shared client.
+    Each section is printed as soon as its vertical finishes (with JSON
+    output every result as soon as its page arrives), and a failing
+    vertical does not stop the others.
+
+    Args:
+        query: Search query string
+        use_cache: Whether to use the local result cache
+        output: "text" or "json" (one JSON line per result)
+    """
+    import threading
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    config = load_config() or default_config()
+    ddgs = get_client()
+    print_lock = threading.Lock()
+
+    def collect(vertical: str, settings: SearchSettings) -> List[dict]:
+        results = []
+        for page in iter_pages(ddgs, vertical, query, settings, use_cache, settings["max_results"]):
+            if output == "json":
+                with print_lock:
+                    print_json_results(vertical, page, len(results) + 1)
+            results.extend(page)
+        return results
+
+    with ThreadPoolExecutor(max_workers=len(SEARCH_VERTICALS)) as pool:
+        futures = {}
+        for vertical in SEARCH_VERTICALS:
+            settings = get_search_settings(config, vertical)
+            futures[pool.submit(collect, vertical, settings)] = (vertical, settings)
+
+        for future in as_completed(futures):
+            vertical, settings = futures[future]
+            try:
+                results = future.result()
+                if output == "json":
+                    continue
+                with timings.phase("render"):
+                    print(render_results(vertical, results, settings["max_results"]), flush=True)
+            except BrokenPipeError:
+                exit_on_broken_pipe()
+            except Exception as error:
+                if output == "json":
+                    import json
+                    with print_lock:
+                        print(json.dumps({"vertical": vertical, "error": str(error)}), flush=True)
+                else:
+                    print(f"Error searching {vertical}:", error, flush=True)
+
+def make_summarizer(ddgs, model: str, config: ConfigType):
+    """
+    Build a summarizer that condenses older exchanges with the chat model.
+
+    Args:
+        ddgs: Client to send summary requests with
+        model: Name of the model to use
+        config: Configuration with the prompts
+
+    Returns:
+        Callable[[str], str]: Function turning conversation text into a short summary
+    """
+    from prompts import get_prompt
+    from streaming import reset_chat
+
+    summary_prompt = get_prompt(config, "summary")
+
+    def summarize(text: str) -> str:
+        reset_chat(ddgs)
+        return ddgs.chat(summary_prompt.render(conversation=text), model=model)
+
+    return summarize
 
 def load_conversation(convo_num: int) -> None:
     """
@@ -352,7 +555,7 @@ def load_conversation(convo_num: int) -> None:
     Args:
         convo_num: Number of the conversation to load (1-5)
     """
-    config = load_config()
+    config = load_config() or default_config()
     max_conversations = config.get("max_conversations", 5)
     
     # Early return if conversations are disabled
@@ -360,61 +563,380 @@ def load_conversation(convo_num: int) -> None:
         print("Conversation storage is disabled. Use 'bsho -m <number>' to enable.")
         return
         
-    conversation_handler = ConversationHandler(max_conversations=max_conversations)
-    prev_conversations = conversation_handler.get_conversations()
-    
-    if not prev_conversations:
-        print("No previous conversations found.")
-        return
-    
-    if not 1 <= convo_num <= len(prev_conversations):
-        print(f"Please select a conversation between 1 and {len(prev_conversations)}")
-        return
-    
-    selected_convo = prev_conversations[convo_num - 1]
-    model = selected_convo["model"]
-    current_exchanges = selected_convo["exchanges"].copy()
-    
-    print(f"Loaded conversation {convo_num} (using model: {model})")
-    print("\nPrevious exchanges:")
-    for exchange in current_exchanges:
-        print(f"You: {exchange['user']}")
-        print(f"BASHō: {exchange['basho']}")
+    from conversation_history import ConversationHandler
+
+    conversation_handler = ConversationHandler(
+        max_conversations=max_conversations,
+        compress=config["history"]["compress"]
+    )
+    # Another bsho saving meanwhile may evict and renumber conversations
+    with conversation_handler.snapshot():
+        stored = conversation_handler.count()
+
+        if not stored:
+            print("No previous conversations found.")
+            return
+
+        if not 1 <= convo_num <= stored:
+            print(f"Please select a conversation between 1 and {stored}")
+            return
+
+        selected_convo = conversation_handler.get_conversation_info(convo_num)
+        model = selected_convo["model"]
+        current_exchanges = []
+
+        print(f"Loaded conversation {convo_num} (using model: {model})")
+        print("\nPrevious exchanges:")
+        # Exchanges are decoded and printed one by one as they are read
+        for exchange in conversation_handler.iter_exchanges(selected_convo["id"]):
+            print(f"You: {exchange['user']}")
+            print(f"BASHō: {exchange['basho']}", flush=True)
+            current_exchanges.append(exchange)
     print("\nContinuing conversation... (Type 'exit' to quit)")
     
-    conversation_context = "This is a continuation of our previous conversation. Here are our previous exchanges:\n"
-    for exchange in current_exchanges:
-        conversation_context += f"User: {exchange['user']}\nBASHō: {exchange['basho']}\n"
-    conversation_context += "\nNow we're continuing from where we left off. Please respond to: "
-    
-    linux_context = "You are a Linux terminal assistant called BASHō. Your responses should be concise and directly answer the user's question. Only provide Linux command examples or explanations when specifically asked. Don't list commands unless requested. Try to make the responses short. "
-    
-    ddgs = DDGS()
+    from context_window import ContextWindow, get_budget
+    from prompts import get_prompt
+    from streaming import reset_chat, stream_chat
+
+    continue_prompt = get_prompt(config, "continue")
+
+    ddgs = get_client(new_chat=True)
+    context_config = config.get("context", {})
+    window = ContextWindow(
+        budget_tokens=get_budget(context_config, model),
+        keep_recent=context_config.get("keep_recent", 4),
+        summarize=make_summarizer(ddgs, model, config),
+        exchanges=current_exchanges,
+        summary=selected_convo.get("summary", ""),
+        summarized=selected_convo.get("summarized", 0)
+    )
     
     while True:
         visible_input = input("\nYou: ")
         
         if visible_input.lower() == 'exit':
-            if current_exchanges and max_conversations > 0:
-                conversation_handler.save_conversation(model, current_exchanges)
+            if window.exchanges and max_conversations > 0:
+                conversation_handler.save_conversation(
+                    model, window.exchanges, summary=window.summary, summarized=window.summarized
+                )
             print("Jaa, mata ne! See you later!")
             break
         
-        actual_query = f"{linux_context}\n{conversation_context}{visible_input}"
+        actual_query = continue_prompt.render(context=window.render(), question=visible_input)
         
         try:
-            response = ddgs.chat(actual_query, model=model)
-            print("BASHō:", response)
+            # The context is sent explicitly, DDGS must not resend its own history
+            reset_chat(ddgs)
+            if config.get("stream", True):
+                response = stream_chat(ddgs, actual_query, model)
+            else:
+                response = ddgs.chat(actual_query, model=model)
+                print("BASHō:", response)
             
             # Store the exchange
-            current_exchanges.append({
-                "user": visible_input,
-                "basho": response
-            })
+            window.add(visible_input, response)
             
         except Exception as error:
             print("Error:", error)
 
+def run_batch(args: List[str], use_cache: bool = True) -> None:
+    """
+    Answer a file (or stdin with "-") of questions concurrently and print JSONL results.
+
+    Args:
+        args: Arguments after --batch: the source and optional --workers N / --unordered
+        use_cache: Whether to use the local answer cache
+    """
+    from batch import BatchRunner, print_summary
+    from prompts import get_prompt
+
+    source_name = args[0]
+    config = load_config() or default_config()
+    batch_config = config["batch"]
+    workers = batch_config["workers"]
+    if "--workers" in args:
+        try:
+            workers = int(args[args.index("--workers") + 1])
+        except (IndexError, ValueError):
+            print("Please provide a number after --workers")
+            sys.exit(1)
+
+    from backends import cache_scope, create_client
+
+    # Batch questions get their own retry budget
+    config["rate_limit"]["max_retries"] = batch_config["max_retries"]
+    runner = BatchRunner(
+        model=get_model(),
+        prompt=get_prompt(config, "quick"),
+        workers=workers,
+        cache_config=config["cache"] if use_cache else None,
+        client_factory=lambda: create_client(config),
+        cache_scope=cache_scope(config, "chat")
+    )
+    ordered = "--unordered" not in args
+
+    if source_name == "-":
+        summary = runner.run(sys.stdin, sys.stdout, ordered=ordered)
+    else:
+        try:
+            with open(source_name, "r") as source:
+                summary = runner.run(source, sys.stdout, ordered=ordered)
+        except OSError as error:
+            print(f"Error reading questions: {error}")
+            sys.exit(1)
+    print_summary(summary)
+
+def search_history(query: str) -> None:
+    """
+    Search saved conversations and show the best matching exchanges.
+
+    Args:
+        query: Search query string
+    """
+    config = load_config() or default_config()
+    max_conversations = config.get("max_conversations", 5)
+    if max_conversations <= 0:
+        print("Conversation storage is disabled. Use 'bsho -m <number>' to enable.")
+        return
+
+    from conversation_history import ConversationHandler
+
+    matches = ConversationHandler(max_conversations=max_conversations).search(query)
+    if not matches:
+        print("No matching conversations found.")
+        return
+
+    print(f"\nTop {len(matches)} Conversation Matches:")
+    print("=" * 50)
+    for match in matches:
+        answer = match["basho"] if len(match["basho"]) <= 300 else match["basho"][:300] + "..."
+        print(f"\n[Conversation {match['conversation']}] (continue with 'bsho -c{match['conversation']}')")
+        print(f"You: {match['user']}")
+        print(f"BASHō: {answer}")
+
+def show_history_stats() -> None:
+    """
+    Show how much space the conversation history takes on disk.
+    """
+    config = load_config() or default_config()
+    if config.get("max_conversations", 5) <= 0:
+        print("Conversation storage is disabled. Use 'bsho -m <number>' to enable.")
+        return
+
+    from conversation_history import ConversationHandler
+
+    stats = ConversationHandler(max_conversations=config["max_conversations"]).stats()
+    print(f"Conversations:        {stats['conversations']}")
+    print(f"Exchanges:            {stats['exchanges']}")
+    print(f"Message text:         {stats['text_bytes'] / 1024:.1f} KiB")
+    print(f"Stored message text:  {stats['stored_bytes'] / 1024:.1f} KiB "
+          f"(compression ratio {stats['ratio']:.2f}, {stats['compressed_messages']} messages compressed)")
+    print(f"Database on disk:     {stats['disk_bytes'] / 1024:.1f} KiB (including the search index)")
+    print(f"Compression:          {'on' if config['history']['compress'] else 'off'} "
+          "('history.compress' in config.json)")
+
+def get_similarity_index(config: ConfigType):
+    """
+    Open the similar question index, first adding the exchanges stored in
+    the conversation history since the last lookup. When indexed exchanges
+    were deleted or evicted from the history, its questions are indexed anew.
+
+    Entries expire with the answer cache's ttl.
+
+    Args:
+        config: Configuration with the similarity and cache settings
+
+    Returns:
+        SimilarityIndex: Up to date index
+    """
+    from backends import cache_scope
+    from similarity import SimilarityIndex
+
+    index = SimilarityIndex(max_entries=config["similarity"]["max_entries"],
+                            ttl=config["cache"].get("ttl", 86400))
+    if config.get("max_conversations", 5) > 0:
+        from conversation_history import ConversationHandler
+
+        handler = ConversationHandler(max_conversations=config["max_conversations"])
+        if (index.history_position() > handler.last_exchange_id()
+                or index.history_start() < handler.first_exchange_id()):
+            # The history was deleted (its ids start over) or old conversations were evicted
+            index.remove_history()
+        # Exchanges are indexed under the backend in use when they are picked up
+        scope = cache_scope(config, "chat")
+        index.add_history((exchange_id, scope + model, user, basho) for exchange_id, model, user, basho
+                          in handler.iter_exchanges_since(index.history_position()))
+    elif index.history_position():
+        # History storage was turned off
+        index.remove_history()
+    return index
+
+def offer_local_answer(answer: str, note: str) -> bool:
+    """
+    Show an answer found without asking the model.
+
+    Args:
+        answer: Answer to print
+        note: Where the answer comes from, printed below it
+
+    Returns:
+        bool: True if the user wants to ask the model anyway
+    """
+    print(f"BASHō: {answer}")
+    print(f"[{note}]")
+    if not (sys.stdin.isatty() and sys.stdout.isatty()):
+        print("[Use --no-cache to ask the model instead]")
+        return False
+    try:
+        return input("Ask the model anyway? [y/N] ").strip().lower() in ("y", "yes")
+    except EOFError:
+        print()
+        return False
+
+def ask_hedged(config: ConfigType, prompt: str, model: str) -> str:
+    """
+    Answer a question with a hedged request over several models and print it.
+
+    Args:
+        config: Configuration with the hedge and backend settings
+        prompt: Full prompt to send
+        model: Preferred model, tried first until the latency histogram knows better
+
+    Returns:
+        str: The first complete answer
+    """
+    from backends import create_backend
+    from hedge import LatencyHistogram, hedged_chat, plan
+
+    settings = config["hedge"]
+    candidates = settings["models"] or list(MODELS.values())
+    models = sorted(candidates, key=lambda name: name != model)
+    histogram = LatencyHistogram()
+    order, delay = plan(histogram.load(), models, settings)
+    with timings.phase("request"):
+        response, winner, seconds = hedged_chat(
+            lambda: create_backend(config["backend"]["chat"], config),
+            prompt, order, delay, settings["backups"], histogram
+        )
+    print(f"BASHō: {response}")
+    print(f"[{winner} answered in {seconds:.2f}s, backups start after {delay:.2f}s]")
+    return response
+
+def show_latency() -> None:
+    """
+    Show the answer time percentiles per model and how hedged requests would use them.
+    """
+    from hedge import LatencyHistogram, plan
+
+    config = load_config() or default_config()
+    state = LatencyHistogram().load()
+    if not state:
+        print("No answer times recorded yet, ask a few questions first.")
+        return
+
+    print(f"{'model':<16} {'samples':>8} {'p50':>9} {'p95':>9}")
+    for name in MODELS.values():
+        if name in state:
+            p50 = LatencyHistogram.percentile(state, name, 0.5)
+            p95 = LatencyHistogram.percentile(state, name, 0.95)
+            print(f"{name:<16} {LatencyHistogram.samples(state, name):>8.0f} {p50:>8.2f}s {p95:>8.2f}s")
+
+    settings = config["hedge"]
+    models = sorted(settings["models"] or list(MODELS.values()), key=lambda name: name != config["model"])
+    order, delay = plan(state, models, settings)
+    backups = ", ".join(order[1:1 + settings["backups"]]) or "none"
+    print(f"\nHedged requests ({'on' if settings['enabled'] else 'off'}): "
+          f"primary {order[0]}, backups {backups} after {delay:.2f}s")
+
+def clean_command(answer: str) -> str:
+    """
+    Reduce a suggested command to the command line itself, dropping markdown
+    fences, backticks and prompt characters models like to add.
+
+    Args:
+        answer: Model answer
+
+    Returns:
+        str: First command line of the answer
+    """
+    for line in answer.strip().splitlines():
+        line = line.strip().strip("`").strip()
+        if not line or line.startswith("```") or line.lower() in ("bash", "sh", "shell", "zsh"):
+            continue
+        return line[2:] if line.startswith("$ ") else line
+    return ""
+
+def ask_command(kind: str, text: str, use_cache: bool = True) -> None:
+    """
+    Explain a command line or suggest one, for the shell integration.
+
+    The output is only the explanation or the bare command, so shell key
+    bindings can show it or put it on the command line. Errors go to stderr
+    and exit with status 1.
+
+    Args:
+        kind: "explain" or "suggest"
+        text: Command line (or for suggest, a description of what to do)
+        use_cache: Whether to use the local answer cache
+    """
+    from answer_cache import AnswerCache
+    from backends import cache_scope
+    from prompts import get_prompt
+
+    config = load_config() or default_config()
+    model = get_model()
+    prompt = get_prompt(config, kind).render(command=text)
+    cache_model = cache_scope(config, "chat") + model
+    cache = None
+    response = None
+    if config["cache"].get("enabled", True) and use_cache:
+        with timings.phase("cache"):
+            cache = AnswerCache(ttl=config["cache"].get("ttl", 86400),
+                                max_entries=config["cache"].get("max_entries", 500))
+            response = cache.get(cache_model, prompt)
+
+    if response is None:
+        try:
+            with timings.phase("request"):
+                response = get_client(new_chat=True).chat(prompt, model=model)
+        except Exception as error:
+            # Nothing on stdout, so key bindings don't put the error on the command line
+            print("Error:", error, file=sys.stderr)
+            sys.exit(1)
+        if cache is not None:
+            cache.put(cache_model, prompt, response)
+    print(clean_command(response) if kind == "suggest" else response.strip())
+
+def read_piped_input(config: ConfigType, model: str) -> str:
+    """
+    Digest output piped into bsho, as in: journalctl -u nginx | bsho - "why is this failing?"
+
+    The input is read line by line in bounded memory and reduced to
+    distinct head, tail and error lines within the model's input budget.
+
+    Args:
+        config: Configuration with the input settings
+        model: Model the question goes to, selects the budget
+
+    Returns:
+        str: Prompt block with the excerpt, empty when stdin is a terminal or empty
+    """
+    settings = config["input"]
+    if not settings["enabled"] or sys.stdin is None or sys.stdin.isatty():
+        return ""
+
+    from context_window import get_budget
+    from log_digest import LogDigest
+    from prompts import get_prompt
+
+    with timings.phase("input"):
+        digest = LogDigest(settings).feed_stream(sys.stdin.buffer)
+        if not digest.distinct:
+            return ""
+        # About 4 characters per token, like context_window.estimate_tokens
+        excerpt = digest.render(get_budget(settings, model) * 4)
+    return get_prompt(config, "piped").render(description=digest.describe(), excerpt=excerpt)
+
 def display_help() -> None:
     """
     Display help information including version and available commands.
@@ -425,17 +947,100 @@ def display_help() -> None:
     print("  bsho -v \"your search query\"          Search for videos")
     print("  bsho -t \"your search query\"          Search for text/web results")
     print("  bsho -n \"your news search query\"     Search for news")
+    print("  bsho -a \"your search query\"          Search text, news and videos in parallel")
+    print("  bsho -t|-n|-v --more \"query\"         Fetch further pages of results on demand")
+    print("  bsho -t|-n|-v|-a --json \"query\"      Print one JSON line per result as it arrives")
     print("  bsho -c<num>                         Continue conversation number <num> (1-5)")
+    print("  bsho -s \"your search query\"          Search saved conversations")
+    print("  bsho --history-stats                 Show the size and compression of the stored conversations")
     print("  bsho -m <num>                        Change the amount of stored conversations or set them to zero")
     print("  bsho -dev                            Edit configuration file")
     print("  bsho -h                              Display this help message")
+    print("  bsho --no-cache \"your question\"      Ask or search without local caches or local answers")
+    print("  command | bsho - \"your question\"     Ask about the piped output of a command (or --stdin)")
+    print("  bsho --hedge \"your question\"         Race backup models when the first one is slow")
+    print("  bsho --latency                       Show answer time percentiles per model")
+    print("  bsho --explain \"command\"             Explain what a shell command does")
+    print("  bsho --suggest \"what to do\"          Print a single shell command that does it")
+    print("  bsho --daemon start|stop|status      Manage the background daemon that keeps BASHō warm")
+    print("  bsho --kb build|status               Index installed man pages for instant local answers")
+    print("  bsho --batch <file|-> [--workers N]  Answer one question per line concurrently, JSONL output")
+    print("  bsho --timings <command>             Show where the time of a command went")
+    print("  bsho --profile <command>             Write a cProfile dump of a command to bsho.prof")
+    print("  bsho --metrics                       Show p50/p95 timings from the metrics log")
     print("\nAvailable models:")
     for key, model in MODELS.items():
         print(f"  {key}: {model}")
     print("\nBASHō will remember your model preference after the first use.")
     print("Use -dev flag to customize BASHō's behavior.")
 
-def main() -> None:
+def get_metrics_path(config: ConfigType) -> Path:
+    """
+    Get the location of the JSONL metrics log.
+
+    Args:
+        config: Loaded configuration (defaults already applied)
+
+    Returns:
+        Path: Configured path, or metrics.jsonl in BASHO_HOME
+    """
+    path = config["metrics"]["path"]
+    return Path(path).expanduser() if path else BASHO_HOME / "metrics.jsonl"
+
+def show_metrics() -> None:
+    """
+    Print p50/p95 of every phase per command from the metrics log.
+    """
+    path = get_metrics_path(load_config() or default_config())
+    if not path.exists():
+        print(f"No metrics logged yet ({path}). Enable them with \"metrics\": {{\"log\": true}} in config.json.")
+        return
+
+    for command, phases in timings.summarize_log(path).items():
+        print(f"\n{command} ({phases['total']['count']} runs)")
+        for name, stats in phases.items():
+            print(f"  {name:<14} p50 {stats['p50']:9.1f} ms   p95 {stats['p95']:9.1f} ms")
+
+def main(forward: bool = True, piped_input: Optional[str] = None) -> None:
+    """
+    Run one bsho command, handling the --timings and --profile options.
+
+    Args:
+        forward: Hand the command to a running BASHō daemon when possible
+        piped_input: Already digested stdin of the command (see read_piped_input),
+            None to read this process's stdin
+    """
+    # Like --no-cache these may appear anywhere
+    show_timings = "--timings" in sys.argv
+    profile = "--profile" in sys.argv
+    sys.argv = [arg for arg in sys.argv if arg not in ("--timings", "--profile")]
+    args = [arg for arg in sys.argv[1:] if arg not in ("--no-cache", "--hedge", "--json", "--more", "--stdin")]
+    if args[:1] == ["-"]:
+        args = args[1:]
+    command = "usage" if not args else args[0] if args[0].startswith("-") else "question"
+
+    profiler = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        # Timing or profiling a forwarded command would only measure the socket round trip
+        run_command(forward and not (show_timings or profile), piped_input)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profile_path = Path("bsho.prof").resolve()
+            profiler.dump_stats(str(profile_path))
+            print(f"\nProfile written to {profile_path} (inspect it with: python -m pstats {profile_path})",
+                  file=sys.stderr)
+        if show_timings:
+            timings.report()
+        config = load_config()
+        if config and config["metrics"]["log"]:
+            timings.log_metrics(get_metrics_path(config), command)
+
+def run_command(forward: bool = True, piped_input: Optional[str] = None) -> None:
     """
     Main function that processes a single question and returns BASHō's response.
     Single question can also be a search of videos.
@@ -443,17 +1048,63 @@ def main() -> None:
     Single question can also be a search of news.
     Can continue previous conversations.
     Exits with error if no question is provided.
+
+    Args:
+        forward: Hand the command to a running BASHō daemon when possible
+        piped_input: Already digested stdin of the command, None to read stdin
     """
+    if sys.argv[1:2] == ["--daemon"]:
+        import basho_daemon
+        action = sys.argv[2] if len(sys.argv) > 2 else "status"
+        actions = {"start": basho_daemon.start, "stop": basho_daemon.stop, "status": basho_daemon.status}
+        if action not in actions:
+            print("Usage: bsho --daemon start|stop|status")
+            sys.exit(1)
+        sys.exit(actions[action]())
+
+    # --no-cache may appear anywhere, strip it before positional parsing
+    use_cache = "--no-cache" not in sys.argv
+    if not use_cache:
+        sys.argv = [arg for arg in sys.argv if arg != "--no-cache"]
+    hedge = "--hedge" in sys.argv
+    if hedge:
+        sys.argv = [arg for arg in sys.argv if arg != "--hedge"]
+    # Output mode of the searches: one JSON line per result, or more pages on demand
+    output = "json" if "--json" in sys.argv else "more" if "--more" in sys.argv else "text"
+    sys.argv = [arg for arg in sys.argv if arg not in ("--json", "--more")]
+    # Stdin is only read when asked for ("-" before the question or --stdin anywhere),
+    # so scripts and loops that feed bsho's stdin something else never block on it
+    use_stdin = "--stdin" in sys.argv or sys.argv[1:2] == ["-"]
+    if use_stdin:
+        sys.argv = [arg for index, arg in enumerate(sys.argv)
+                    if arg != "--stdin" and not (index == 1 and arg == "-")]
+
     if len(sys.argv) < 2:
         print("Usage:")
         print("bsho \"your question here\"")
         print("bsho -v \"your video search here\"")
         print("bsho -t \"your text search here\"")
         print("bsho -n \"your news search here\"")
+        print("bsho -a \"your search here\" (Search text, news and videos at once)")
+        print("bsho -t|-n|-v --more \"your search here\" (Fetch further pages of results on demand)")
+        print("bsho -t|-n|-v|-a --json \"your search here\" (One JSON line per result)")
         print("bsho -c<num> (Load and continue conversation number 1-5)")
+        print("bsho -s \"your history search here\" (Search saved conversations)")
+        print("bsho --history-stats (Show size and compression of stored conversations)")
         print("bsho -dev (Edit configuration file)")
         print("bsho -h (Display help and version information)")
         print("bsho -m <number> (Set maximum stored conversations, 0 for no storage)")
+        print("bsho --no-cache \"your question here\" (Skip the local caches and local answers)")
+        print("command | bsho - \"your question here\" (Ask about piped output, same as --stdin)")
+        print("bsho --hedge \"your question here\" (Ask backup models too when the first one is slow)")
+        print("bsho --latency (Show answer time percentiles per model)")
+        print("bsho --explain \"command\" (Explain what a shell command does)")
+        print("bsho --suggest \"what to do\" (Print a single shell command that does it)")
+        print("bsho --daemon start|stop|status (Manage the background BASHō daemon)")
+        print("bsho --kb build|status (Build the offline command knowledge base in the background)")
+        print("bsho --batch <file|-> [--workers N] [--unordered] (Answer many questions, JSONL output)")
+        print("bsho --timings|--profile <command> (Show phase timings or write a cProfile dump)")
+        print("bsho --metrics (Show p50/p95 timings from the metrics log)")
         sys.exit(1)
     
     # Check if help flag was used
@@ -475,13 +1126,72 @@ def main() -> None:
         except ValueError:
             print("Invalid conversation number. Use -c1 to -c5.")
             sys.exit(1)
+
+    # Check if history search flag was used
+    if sys.argv[1] == "-s":
+        if len(sys.argv) < 3:
+            print("Please provide a search query after -s flag")
+            sys.exit(1)
+        search_history(sys.argv[2])
+        return
+
+    # Check if history stats flag was used
+    if sys.argv[1] == "--history-stats":
+        show_history_stats()
+        return
+
+    # Check if metrics flag was used
+    if sys.argv[1] == "--metrics":
+        show_metrics()
+        return
+
+    # Check if latency flag was used
+    if sys.argv[1] == "--latency":
+        show_latency()
+        return
+
+    # Check if knowledge base flag was used
+    if sys.argv[1] == "--kb":
+        import knowledge_base
+        action = sys.argv[2] if len(sys.argv) > 2 else "status"
+        actions = {"build": knowledge_base.start_build, "status": knowledge_base.show_status}
+        if action not in actions:
+            print("Usage: bsho --kb build|status")
+            sys.exit(1)
+        sys.exit(actions[action]())
+
+    # Check if batch flag was used
+    if sys.argv[1] == "--batch":
+        if len(sys.argv) < 3:
+            print("Please provide a questions file (or - for stdin) after --batch flag")
+            sys.exit(1)
+        run_batch(sys.argv[2:], use_cache)
+        return
+
+    # Local-only flags are handled above, so only network commands pay for the daemon client
+    # Output piped into a question is digested here, so a daemon only gets the excerpt
+    if use_stdin and piped_input is None:
+        if sys.argv[1].startswith("-"):
+            print("Piped input (- or --stdin) only works with a question")
+            sys.exit(1)
+        piped_input = read_piped_input(load_config() or default_config(), get_model())
+
+    # --more asks for input, so it always runs in this process
+    if forward and output != "more":
+        import basho_daemon
+        forwarded_args = (sys.argv[1:] + ([] if use_cache else ["--no-cache"]) + (["--hedge"] if hedge else [])
+                          + (["--json"] if output == "json" else []))
+        if basho_daemon.should_forward(forwarded_args):
+            exit_code = basho_daemon.forward(forwarded_args, piped_input)
+            if exit_code is not None:
+                sys.exit(exit_code)
     
     # Check if video flag was used
     if sys.argv[1] == "-v":
         if len(sys.argv) < 3:
             print("Please provide a search query after -v flag")
             sys.exit(1)
-        search_videos(sys.argv[2])
+        search_videos(sys.argv[2], use_cache, output)
         return
 
     # Check if text flag was used
@@ -489,7 +1199,23 @@ def main() -> None:
         if len(sys.argv) < 3:
             print("Please provide a search query after -t flag")
             sys.exit(1)
-        search_text(sys.argv[2])
+        search_text(sys.argv[2], use_cache, output)
+        return
+
+    # Check if all-verticals flag was used
+    if sys.argv[1] == "-a":
+        if len(sys.argv) < 3:
+            print("Please provide a search query after -a flag")
+            sys.exit(1)
+        search_all(sys.argv[2], use_cache, output)
+        return
+
+    # Check if explain/suggest flags (used by the shell integration) were used
+    if sys.argv[1] in ("--explain", "--suggest"):
+        if len(sys.argv) < 3 or not sys.argv[2].strip():
+            print(f"Please provide a command line after {sys.argv[1]} flag")
+            sys.exit(1)
+        ask_command(sys.argv[1][2:], sys.argv[2], use_cache)
         return
 
     # Check if news flag was used
@@ -497,7 +1223,7 @@ def main() -> None:
         if len(sys.argv) < 3:
             print("Please provide a search query after -n flag")
             sys.exit(1)
-        search_news(sys.argv[2])
+        search_news(sys.argv[2], use_cache, output)
         return
 
     if sys.argv[1] == "-m":
@@ -515,14 +1241,95 @@ def main() -> None:
             print("Please provide a valid number")
             sys.exit(1)
     
+    from answer_cache import AnswerCache
+    from backends import cache_scope
+    from prompts import get_prompt
+
     question = sys.argv[1]
     model = get_model()
-    linux_context = "You are a Linux terminal assistant called BASHō. Your responses should be very concise and directly answer the user's question. One or two sentences maximum. Only provide Linux command examples or explanations when specifically asked. Don't list commands unless requested. Try to make the responses as short as possible. Answer: "
+    config = load_config() or default_config()
+    prompt = get_prompt(config, "quick").render(question=question)
+    if piped_input:
+        prompt = f"{prompt}\n\n{piped_input}"
+
+    cache_config = config["cache"]
+    # Answers of different backends are cached apart
+    cache_model = cache_scope(config, "chat") + model
+    cache = None
+    if cache_config.get("enabled", True) and use_cache:
+        with timings.phase("cache"):
+            cache = AnswerCache(
+                ttl=cache_config.get("ttl", 86400),
+                max_entries=cache_config.get("max_entries", 500)
+            )
+            cached = cache.get(cache_model, prompt)
+        if cached is not None:
+            print(f"BASHō: {cached}")
+            return
+
+    # Common questions are answered from the installed documentation when it clearly matches
+    knowledge_config = config["knowledge"]
+    declined = False
+    if knowledge_config["enabled"] and use_cache and not piped_input:
+        from knowledge_base import KNOWLEDGE_FILE, KnowledgeBase
+
+        local = None
+        if KNOWLEDGE_FILE.exists():
+            try:
+                with timings.phase("knowledge"):
+                    knowledge = KnowledgeBase()
+                    local = knowledge.find(question, knowledge_config["threshold"])
+                    knowledge.close()
+            except Exception as error:
+                print(f"Knowledge base lookup failed: {error}", file=sys.stderr)
+        if local is not None:
+            if not offer_local_answer(local["answer"], f"From the {local['source']} ({local['score']:.0%} match)"):
+                return
+            declined = True
+
+    similar = None
+    # A question about piped output is only similar to others when the output is too.
+    # Like the answers themselves, similar ones are only reused with the cache enabled.
+    if config["similarity"]["enabled"] and cache_config.get("enabled", True) and not piped_input:
+        try:
+            with timings.phase("similar"):
+                similar = get_similarity_index(config)
+                match = (similar.find(question, cache_model, config["similarity"]["threshold"])
+                         if use_cache and not declined else None)
+        except Exception as error:
+            # The index only saves requests, a broken one must not stop the question
+            print(f"Similar question lookup failed: {error}", file=sys.stderr)
+            similar = match = None
+        if match is not None and not offer_local_answer(
+                match["answer"],
+                f"Earlier answer to a similar question ({match['score']:.0%} match): \"{match['question']}\""):
+            return
+
+    from hedge import LatencyHistogram
+    from streaming import stream_chat
 
     try:
-        with DDGS() as ddgs:
-            response = ddgs.chat(f"{linux_context}{question}", model=model)
-            print(f"BASHō: {response}")
+        if hedge or config["hedge"]["enabled"]:
+            response = ask_hedged(config, prompt, model)
+        else:
+            ddgs = get_client(new_chat=True)
+            # Every answer feeds the latency histogram that hedged requests plan with
+            start = time.perf_counter()
+            try:
+                if config.get("stream", True):
+                    response = stream_chat(ddgs, prompt, model)
+                else:
+                    with timings.phase("request"):
+                        response = ddgs.chat(prompt, model=model)
+                    print(f"BASHō: {response}")
+            except Exception:
+                LatencyHistogram().record(model, None)
+                raise
+            LatencyHistogram().record(model, time.perf_counter() - start)
+        if cache is not None:
+            cache.put(cache_model, prompt, response)
+        if similar is not None:
+            similar.add(question, response, cache_model)
     except Exception as error:
         print("Error:", error)
 
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from basho_config import BASHO_HOME
+
+
+class SearchCache:
+    """
+    Persistent on-disk cache of search results.
+
+    Entries are keyed by vertical, query, region, safesearch and
+    max_results. Expiry is decided by the caller, which knows the TTL of
+    each vertical, so stale entries can still be served while they are
+    being refreshed. One connection is shared between threads, guarded by
+    a lock, so concurrent searches and background refreshes can use it.
+
+    Attributes:
+        path: Path to the SQLite file holding cached results
+        max_entries: Maximum number of cached searches before evicting the oldest
+        scope: Prefix keeping results of different search backends apart
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = 500, scope: str = "") -> None:
+        """
+        Open (and create if needed) the cache database.
+
+        Args:
+            path: Location of the cache file, defaults to search_cache.db in BASHO_HOME
+            max_entries: Maximum number of cached searches
+            scope: Prefix keeping results of different search backends apart
+        """
+        self.path: Path = path or BASHO_HOME / "search_cache.db"
+        self.max_entries = max_entries
+        self.scope = scope
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=5, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " results TEXT NOT NULL,"
+            " created REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_created ON results (created)")
+        self._db.commit()
+
+    def make_key(self, vertical: str, query: str, settings: Dict[str, Any]) -> str:
+        """
+        Build the cache key for a search.
+
+        Args:
+            vertical: One of "text", "news" or "video"
+            query: Search query, normalized for case and whitespace
+            settings: Search settings of the vertical
+
+        Returns:
+            str: Hex digest identifying the entry
+        """
+        normalized = " ".join(query.split()).casefold()
+        parts = [self.scope + vertical, normalized, settings["region"],
+                 settings["safesearch"], str(settings["max_results"])]
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, vertical: str, query: str, settings: Dict[str, Any]) -> Optional[Tuple[List[dict], float]]:
+        """
+        Look up cached results.
+
+        Args:
+            vertical: One of "text", "news" or "video"
+            query: Search query
+            settings: Search settings of the vertical
+
+        Returns:
+            Optional[Tuple[List[dict], float]]: Results and their age in seconds, None when missing
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT results, created FROM results WHERE key = ?",
+                (self.make_key(vertical, query, settings),)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), time.time() - row[1]
+
+    def put(self, vertical: str, query: str, settings: Dict[str, Any], results: List[dict]) -> None:
+        """
+        Store results and evict the oldest entries over the size cap.
+
+        Args:
+            vertical: One of "text", "news" or "video"
+            query: Search query
+            settings: Search settings of the vertical
+            results: Raw search results to cache
+        """
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, results, created) VALUES (?, ?, ?)",
+                (self.make_key(vertical, query, settings), json.dumps(results), time.time())
+            )
+            self._db.execute(
+                "DELETE FROM results WHERE key NOT IN "
+                "(SELECT key FROM results ORDER BY created DESC LIMIT ?)",
+                (max(self.max_entries, 0),)
+            )
+            self._db.commit()
+
+    def close(self) -> None:
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,63 @@
+# BASHō shell integration for bash.
+#
+# Add this line to ~/.bashrc:
+#
+#     source /path/to/BASHo/shell/basho.bash
+#
+# Ctrl-X e  explains the command currently typed on the prompt
+# Ctrl-X s  replaces the command line with a command suggested by BASHō
+#           (type what you want to do, e.g. "find files bigger than 1G")
+#
+# Requests go to the BASHō daemon over its Unix socket with socat or nc, so
+# no Python interpreter is started per request. The daemon is started on
+# first use and keeps its client and config loaded until it is idle for an
+# hour ("daemon.idle_timeout" in config.json).
+
+_basho_home="${BASHO_HOME:-$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)}"
+
+_basho_request() {
+    # Usage: _basho_request explain|suggest "text"
+    # Prints the answer, or the error on stderr with a non-zero status
+    local socket="$_basho_home/basho.sock"
+    if [ ! -S "$socket" ]; then
+        bsho --daemon start >/dev/null 2>&1 || { echo "BASHō daemon could not be started" >&2; return 1; }
+    fi
+    # One request per line, so newlines in the command line become spaces
+    local text="${2//$'\n'/ }" response
+    if command -v socat >/dev/null 2>&1; then
+        response="$(printf '%s %s\n' "$1" "$text" | socat -t 60 - "UNIX-CONNECT:$socket")" || return 1
+    elif command -v nc >/dev/null 2>&1; then
+        response="$(printf '%s %s\n' "$1" "$text" | nc -U "$socket")" || return 1
+    else
+        bsho "--$1" "$text"
+        return
+    fi
+    # The daemon answers with the exit code on the first line, then the answer or the error
+    local code="${response%%$'\n'*}" output=""
+    [[ "$response" == *$'\n'* ]] && output="${response#*$'\n'}"
+    if [ "$code" != 0 ]; then
+        echo "${output:-BASHō daemon did not answer}" >&2
+        return 1
+    fi
+    printf '%s\n' "$output"
+}
+
+_basho_explain() {
+    [ -n "$READLINE_LINE" ] || return
+    echo
+    _basho_request explain "$READLINE_LINE"
+}
+
+_basho_suggest() {
+    [ -n "$READLINE_LINE" ] || return
+    local suggestion
+    # On failure the command line is left as it is
+    suggestion="$(_basho_request suggest "$READLINE_LINE")" || return
+    if [ -n "$suggestion" ]; then
+        READLINE_LINE="$suggestion"
+        READLINE_POINT=${#READLINE_LINE}
+    fi
+}
+
+bind -x '"\C-xe": _basho_explain'
+bind -x '"\C-xs": _basho_suggest'
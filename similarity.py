@@ -0,0 +1,309 @@
+import math
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from basho_config import BASHO_HOME
+
+# Words that say nothing about which Linux question was asked
+STOPWORDS = frozenset(
+    "a an and are as at be can could do does for from get has have how i if in into is it "
+    "me my of on or please should so that the there this to using was what when where "
+    "which why will with would you your".split()
+)
+
+MatchType = Dict[str, Union[str, float]]
+
+# Bumped whenever the tables change, stored in the database's user_version.
+# The index only saves requests, so an older one is dropped and built anew.
+SCHEMA_VERSION = 1
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS entries ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+    " model TEXT NOT NULL,"
+    " question TEXT NOT NULL,"
+    " normalized TEXT NOT NULL,"
+    " answer TEXT NOT NULL,"
+    " source TEXT NOT NULL,"
+    " created REAL NOT NULL,"
+    " UNIQUE (model, normalized));"
+    "CREATE INDEX IF NOT EXISTS entries_created ON entries (created);"
+    "CREATE TABLE IF NOT EXISTS postings ("
+    " term TEXT NOT NULL,"
+    " entry_id INTEGER NOT NULL,"
+    " count INTEGER NOT NULL,"
+    " PRIMARY KEY (term, entry_id)) WITHOUT ROWID;"
+    "CREATE INDEX IF NOT EXISTS postings_entry ON postings (entry_id);"
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);"
+)
+
+
+def tokenize(text: str) -> Dict[str, int]:
+    """
+    Split a question into term counts for the TF-IDF vectors.
+
+    Words are lowercased, stopwords dropped and a trailing plural "s"
+    removed, so "How do I list files?" and "list all file" share terms.
+
+    Args:
+        text: Question text
+
+    Returns:
+        Dict[str, int]: Term to number of occurrences
+    """
+    counts: Dict[str, int] = {}
+    for word in re.findall(r"[\w.+-]+", text.lower()):
+        word = word.strip(".-")
+        if not word or word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        counts[word] = counts.get(word, 0) + 1
+    return counts
+
+
+class SimilarityIndex:
+    """
+    TF-IDF index over previously answered questions, stored in SQLite.
+
+    Questions are added one at a time (answered quick questions right
+    away, conversation history incrementally from the last indexed
+    exchange), so the index never has to be rebuilt. Lookups score only
+    the questions sharing a term with the query by cosine similarity.
+
+    Like the answer cache, entries are kept per model (with its backend
+    scope) and expire after ttl seconds.
+
+    Attributes:
+        path: Path of the SQLite index file
+        max_entries: Maximum number of indexed questions, the oldest are dropped first
+        ttl: Seconds an answer stays valid (0 disables expiry)
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = 2000, ttl: int = 86400) -> None:
+        """
+        Open (and create if needed) the index.
+
+        Args:
+            path: Location of the index, defaults to similar.db in BASHO_HOME
+            max_entries: Maximum number of indexed questions
+            ttl: Seconds an answer stays valid (0 disables expiry)
+        """
+        self.path: Path = path or BASHO_HOME / "similar.db"
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._db = sqlite3.connect(str(self.path), timeout=5)
+        if self._db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self._db.executescript(
+                "DROP TABLE IF EXISTS entries; DROP TABLE IF EXISTS postings; DROP TABLE IF EXISTS meta;"
+                + SCHEMA + f"PRAGMA user_version = {SCHEMA_VERSION};"
+            )
+
+    def _cutoff(self) -> float:
+        """
+        Get the creation time before which entries are expired.
+
+        Returns:
+            float: Unix time, 0 when entries never expire
+        """
+        return time.time() - self.ttl if self.ttl > 0 else 0.0
+
+    def _insert(self, question: str, answer: str, model: str, source: str) -> None:
+        """
+        Index one question (caller handles the transaction).
+
+        Args:
+            question: Question text
+            answer: Answer given to it
+            model: Model that gave the answer, with its backends.cache_scope prefix
+            source: Where it comes from, "cache" or "history"
+        """
+        terms = tokenize(question)
+        if not terms:
+            return
+        normalized = " ".join(question.split()).casefold()
+        row = self._db.execute(
+            "SELECT id FROM entries WHERE model = ? AND normalized = ?", (model, normalized)
+        ).fetchone()
+        if row is not None:
+            # Same question asked again, keep the newest answer
+            self._db.execute(
+                "UPDATE entries SET answer = ?, source = ?, created = ? WHERE id = ?",
+                (answer, source, time.time(), row[0])
+            )
+            return
+        entry_id = self._db.execute(
+            "INSERT INTO entries (model, question, normalized, answer, source, created) VALUES (?, ?, ?, ?, ?, ?)",
+            (model, question, normalized, answer, source, time.time())
+        ).lastrowid
+        self._db.executemany(
+            "INSERT INTO postings (term, entry_id, count) VALUES (?, ?, ?)",
+            [(term, entry_id, count) for term, count in terms.items()]
+        )
+
+    def _evict(self) -> None:
+        """
+        Drop expired questions and the oldest ones beyond max_entries (caller handles the transaction).
+        """
+        if self.ttl > 0:
+            cutoff = self._cutoff()
+            self._db.execute(
+                "DELETE FROM postings WHERE entry_id IN (SELECT id FROM entries WHERE created < ?)", (cutoff,)
+            )
+            self._db.execute("DELETE FROM entries WHERE created < ?", (cutoff,))
+        row = self._db.execute(
+            "SELECT id FROM entries ORDER BY id DESC LIMIT 1 OFFSET ?", (max(self.max_entries, 0),)
+        ).fetchone()
+        if row is not None:
+            self._db.execute("DELETE FROM postings WHERE entry_id <= ?", (row[0],))
+            self._db.execute("DELETE FROM entries WHERE id <= ?", (row[0],))
+
+    def add(self, question: str, answer: str, model: str, source: str = "cache") -> None:
+        """
+        Index an answered question.
+
+        Args:
+            question: Question text
+            answer: Answer given to it
+            model: Model that gave the answer, with its backends.cache_scope prefix
+            source: Where it comes from, "cache" or "history"
+        """
+        with self._db:
+            self._insert(question, answer, model, source)
+            self._evict()
+
+    def add_history(self, exchanges: Iterable[Tuple[int, str, str, str]]) -> int:
+        """
+        Index stored conversation exchanges newer than the last indexed one.
+
+        Args:
+            exchanges: (exchange id, model, user, basho) tuples in id order, usually from
+                ConversationHandler.iter_exchanges_since(self.history_position()) with the
+                model prefixed by its backends.cache_scope
+
+        Returns:
+            int: Number of exchanges indexed
+        """
+        added = 0
+        first_id = last_id = None
+        with self._db:
+            for exchange_id, model, user, basho in exchanges:
+                self._insert(user, basho, model, "history")
+                first_id = first_id or exchange_id
+                last_id = exchange_id
+                added += 1
+            if last_id is not None:
+                if not self.history_start():
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES ('history_start', ?)", (first_id,)
+                    )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('history_position', ?)", (last_id,)
+                )
+                self._evict()
+        return added
+
+    def remove_history(self) -> None:
+        """
+        Drop every question indexed from the conversation history and start
+        over, after exchanges were deleted from the history or evicted from it.
+        """
+        with self._db:
+            self._db.execute(
+                "DELETE FROM postings WHERE entry_id IN (SELECT id FROM entries WHERE source = 'history')"
+            )
+            self._db.execute("DELETE FROM entries WHERE source = 'history'")
+            self._db.execute("DELETE FROM meta WHERE key IN ('history_start', 'history_position')")
+
+    def history_position(self) -> int:
+        """
+        Get the id of the last indexed history exchange.
+
+        Returns:
+            int: Exchange id, 0 when no history was indexed yet
+        """
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'history_position'").fetchone()
+        return row[0] if row else 0
+
+    def history_start(self) -> int:
+        """
+        Get the id of the first indexed history exchange.
+
+        Returns:
+            int: Exchange id, 0 when no history was indexed yet
+        """
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'history_start'").fetchone()
+        return row[0] if row else 0
+
+    def find(self, question: str, model: str, threshold: float = 0.8,
+             candidates: int = 20) -> Optional[MatchType]:
+        """
+        Find the most similar unexpired question answered by a model.
+
+        Args:
+            question: Question to look up
+            model: Model the question goes to, with its backends.cache_scope prefix
+            threshold: Minimum cosine similarity (0 to 1) of a match
+            candidates: Number of best partial matches that are scored fully
+
+        Returns:
+            Optional[MatchType]: question, answer, source and score of the best match, None if below threshold
+        """
+        query = tokenize(question)
+        if not query:
+            return None
+        total = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        if not total:
+            return None
+
+        def idf(terms: Iterable[str]) -> Dict[str, float]:
+            terms = list(terms)
+            placeholders = ",".join("?" * len(terms))
+            frequencies = dict(self._db.execute(
+                f"SELECT term, COUNT(*) FROM postings WHERE term IN ({placeholders}) GROUP BY term", terms
+            ))
+            return {term: math.log((total + 1) / (frequencies.get(term, 0) + 1)) + 1 for term in terms}
+
+        weights = idf(query)
+        query_vector = {term: count * weights[term] for term, count in query.items()}
+        query_norm = math.sqrt(sum(value * value for value in query_vector.values()))
+
+        # Rank entries of the model by the overlap with the query, then score the best ones fully
+        placeholders = ",".join("?" * len(query))
+        partial: Dict[int, float] = {}
+        for term, entry_id, count in self._db.execute(
+                "SELECT postings.term, postings.entry_id, postings.count FROM postings"
+                " JOIN entries ON entries.id = postings.entry_id"
+                f" WHERE postings.term IN ({placeholders}) AND entries.model = ? AND entries.created >= ?",
+                [*query, model, self._cutoff()]):
+            partial[entry_id] = partial.get(entry_id, 0.0) + count * weights[term] * query_vector[term]
+        best_ids = sorted(partial, key=partial.get, reverse=True)[:candidates]
+        if not best_ids:
+            return None
+
+        placeholders = ",".join("?" * len(best_ids))
+        documents: Dict[int, Dict[str, int]] = {}
+        for entry_id, term, count in self._db.execute(
+                f"SELECT entry_id, term, count FROM postings WHERE entry_id IN ({placeholders})", best_ids):
+            documents.setdefault(entry_id, {})[term] = count
+        all_weights = idf({term for terms in documents.values() for term in terms})
+
+        best: Tuple[float, int] = (0.0, 0)
+        for entry_id, terms in documents.items():
+            norm = math.sqrt(sum((count * all_weights[term]) ** 2 for term, count in terms.items()))
+            score = partial[entry_id] / (norm * query_norm) if norm and query_norm else 0.0
+            best = max(best, (score, entry_id))
+        if best[0] < threshold:
+            return None
+
+        row = self._db.execute("SELECT question, answer, source FROM entries WHERE id = ?", (best[1],)).fetchone()
+        return {"question": row[0], "answer": row[1], "source": row[2], "score": round(min(best[0], 1.0), 3)}
+
+    def close(self) -> None:
+        """
+        Close the underlying database connection.
+        """
+        self._db.close()
@@ -0,0 +1,50 @@
+import fcntl
+import json
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+
+def read_state(path: Path) -> Dict[str, Any]:
+    """
+    Read a JSON state file without locking (locked_state replaces it atomically).
+
+    Args:
+        path: Path of the state file
+
+    Returns:
+        Dict[str, Any]: Stored state, empty when the file is missing or unreadable
+    """
+    try:
+        state = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+@contextmanager
+def locked_state(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Lock, read and (on exit) write back a JSON state file shared by
+    concurrent bsho processes.
+
+    The lock is an flock on a ".lock" file next to the state file, and the
+    state is written to a temporary file that replaces the old one, so
+    read_state never sees a partial write.
+
+    Args:
+        path: Path of the state file
+
+    Yields:
+        Dict[str, Any]: Mutable state, written back unless the block raises
+    """
+    with open(path.with_name(path.name + ".lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            state = read_state(path)
+            yield state
+            tmp_path = path.with_name(path.name + ".tmp")
+            tmp_path.write_text(json.dumps(state))
+            tmp_path.replace(path)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
@@ -0,0 +1,90 @@
+import sys
+import time
+from typing import Iterator, Optional, TextIO
+
+import timings
+
+
+def reset_chat(ddgs) -> None:
+    """
+    Make the next chat request on a DDGS client start a fresh conversation.
+
+    DDGS keeps every message of its chat session and resends them with
+    each request, so callers that manage their own context reset it first.
+
+    Args:
+        ddgs: DDGS instance or chat backend to reset
+    """
+    reset = getattr(ddgs, "reset_chat", None)
+    if reset is not None:
+        reset()
+        return
+    for attr, value in (("_chat_messages", []), ("_chat_tokens_count", 0),
+                        ("_chat_vqd", ""), ("_chat_vqd_hash", "")):
+        if hasattr(ddgs, attr):
+            setattr(ddgs, attr, value)
+
+
+def iter_chat(ddgs, prompt: str, model: str) -> Iterator[str]:
+    """
+    Yield response chunks from the DDGS chat endpoint as they arrive.
+
+    Falls back to a single chunk from ddgs.chat() when the installed
+    duckduckgo_search has no streaming support (chat_yield).
+
+    Args:
+        ddgs: DDGS instance to send the prompt with
+        prompt: Full prompt to send
+        model: Name of the model to use
+
+    Yields:
+        str: Response chunks in order
+    """
+    chat_yield = getattr(ddgs, "chat_yield", None)
+    if chat_yield is None:
+        yield ddgs.chat(prompt, model=model)
+        return
+    yield from chat_yield(prompt, model=model)
+
+
+def stream_chat(ddgs, prompt: str, model: str, prefix: str = "BASHō: ",
+                out: Optional[TextIO] = None) -> str:
+    """
+    Write a chat response to the terminal while it is being generated.
+
+    The first-token and total time are printed to stderr afterwards.
+
+    Args:
+        ddgs: DDGS instance to send the prompt with
+        prompt: Full prompt to send
+        model: Name of the model to use
+        prefix: Text written before the first chunk
+        out: Stream to write the response to (defaults to the current sys.stdout)
+
+    Returns:
+        str: The complete response text
+    """
+    out = out or sys.stdout
+    start = time.perf_counter()
+    first_chunk = None
+    chunks = []
+
+    out.write(prefix)
+    out.flush()
+    try:
+        for chunk in iter_chat(ddgs, prompt, model):
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - start
+            chunks.append(chunk)
+            out.write(chunk)
+            out.flush()
+    finally:
+        out.write("\n")
+
+    total = time.perf_counter() - start
+    # First byte includes connection and TLS setup of the first request
+    timings.record("first_byte", first_chunk or total)
+    timings.record("stream", total - (first_chunk or total))
+    # Timing goes to stderr so piped or captured answers stay clean
+    print(f"[first token {first_chunk or total:.2f}s, total {total:.2f}s]", file=sys.stderr, flush=True)
+    return "".join(chunks)
@@ -0,0 +1,149 @@
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, TextIO
+
+# Taken when this module is first imported, which bsho does before anything else
+STARTED = time.perf_counter()
+
+# Phase name -> [total seconds, number of times it ran], in first-seen order
+_phases: Dict[str, List[float]] = {}
+_lock = threading.Lock()
+
+
+def reset() -> None:
+    """
+    Forget recorded phases, e.g. before the daemon runs the next command.
+    """
+    global STARTED
+    with _lock:
+        _phases.clear()
+    STARTED = time.perf_counter()
+
+
+def record(name: str, seconds: float) -> None:
+    """
+    Add time spent in a phase. Phases that run several times (or in several
+    threads, like the searches of -a) are summed up.
+
+    Args:
+        name: Phase name
+        seconds: Time spent
+    """
+    with _lock:
+        phase = _phases.setdefault(name, [0.0, 0])
+        phase[0] += seconds
+        phase[1] += 1
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Time the enclosed block as a phase.
+
+    Args:
+        name: Phase name
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def elapsed() -> float:
+    """
+    Time since bsho started (or since the last reset).
+
+    Returns:
+        float: Seconds
+    """
+    return time.perf_counter() - STARTED
+
+
+def snapshot() -> Dict[str, float]:
+    """
+    Recorded phases in milliseconds, plus the total time so far.
+
+    Returns:
+        Dict[str, float]: Phase name to milliseconds
+    """
+    with _lock:
+        result = {name: round(seconds * 1000, 2) for name, (seconds, _) in _phases.items()}
+    result["total"] = round(elapsed() * 1000, 2)
+    return result
+
+
+def report(out: Optional[TextIO] = None) -> None:
+    """
+    Print the recorded phases as a small table.
+
+    Args:
+        out: Stream to print to (defaults to stderr, so output stays pipeable)
+    """
+    out = out or sys.stderr
+    # Keep the table after the command's own output
+    sys.stdout.flush()
+    with _lock:
+        phases = [(name, seconds, count) for name, (seconds, count) in _phases.items()]
+    print("\nTimings:", file=out)
+    for name, seconds, count in phases:
+        runs = f"  ({count}x)" if count > 1 else ""
+        print(f"  {name:<14} {seconds * 1000:9.1f} ms{runs}", file=out)
+    print(f"  {'total':<14} {elapsed() * 1000:9.1f} ms", file=out)
+
+
+def log_metrics(path: Path, command: str) -> None:
+    """
+    Append the recorded phases of this command to a JSONL metrics log.
+
+    Only the kind of command is logged, never the question or search query.
+
+    Args:
+        path: Metrics log file
+        command: Kind of command, e.g. "question" or "-t"
+    """
+    entry = {"time": round(time.time(), 3), "command": command, "phases_ms": snapshot()}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a") as file:
+            file.write(json.dumps(entry) + "\n")
+    except OSError:
+        pass
+
+
+def summarize_log(path: Path) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Compute p50/p95 of every phase per command from a metrics log.
+
+    Args:
+        path: Metrics log file
+
+    Returns:
+        Dict: command -> phase -> {"count", "p50", "p95"} in milliseconds
+    """
+    samples: Dict[str, Dict[str, List[float]]] = {}
+    with path.open("r") as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            phases = samples.setdefault(entry.get("command", "?"), {})
+            for name, value in entry.get("phases_ms", {}).items():
+                phases.setdefault(name, []).append(value)
+
+    summary: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for command, phases in samples.items():
+        summary[command] = {}
+        for name, values in phases.items():
+            values.sort()
+            summary[command][name] = {
+                "count": len(values),
+                "p50": values[len(values) // 2],
+                "p95": values[int(0.95 * (len(values) - 1))]
+            }
+    return summary